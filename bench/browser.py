@@ -0,0 +1,163 @@
+# ===============================
+# 基准测试用的 browser 模块替身
+# 只实现游戏用到的接口：画布、2D 上下文（所有绘制调用都是空操作）、
+# 音频元素、事件绑定和 requestAnimationFrame（只记录回调，不自动执行）。
+# 仅供 bench/ 下的脚本在 CPython 中导入 src/main.py 使用。
+# ===============================
+import time
+
+
+class _TextMetrics:
+    def __init__(self, width):
+        self.width = width
+
+
+class Context2D:
+    """CanvasRenderingContext2D 替身：记录调用次数，不做任何绘制"""
+
+    def __init__(self):
+        self.calls = 0
+        self.fillStyle = ""
+        self.strokeStyle = ""
+        self.lineWidth = 1
+        self.font = ""
+        self.globalAlpha = 1.0
+        self.imageSmoothingEnabled = True
+
+    def _noop(self, *args):
+        self.calls += 1
+
+    beginPath = closePath = arc = moveTo = lineTo = fill = stroke = _noop
+    fillRect = clearRect = strokeRect = fillText = drawImage = _noop
+    save = restore = setTransform = scale = translate = rect = clip = _noop
+
+    def measureText(self, text):
+        self.calls += 1
+        return _TextMetrics(len(text) * 10)
+
+
+class _Rect:
+    def __init__(self, left, top, width, height):
+        self.left = left
+        self.top = top
+        self.width = width
+        self.height = height
+
+
+class Element:
+    def __init__(self, tag, width=800, height=600):
+        self.tag = tag
+        self.width = width
+        self.height = height
+        self.style = _Style()
+        self.volume = 1.0
+        self.currentTime = 0
+        self._context = None
+
+    def getContext(self, kind):
+        if self._context is None:
+            self._context = Context2D()
+        return self._context
+
+    def getBoundingClientRect(self):
+        return _Rect(0, 0, self.width, self.height)
+
+    def bind(self, event, handler):
+        pass
+
+    def unbind(self, event, handler=None):
+        pass
+
+    def play(self):
+        pass
+
+    def pause(self):
+        pass
+
+
+class _Style:
+    pass
+
+
+class Document:
+    def __init__(self):
+        self.elements = {}
+        self.handlers = {}
+
+    def __getitem__(self, element_id):
+        if element_id not in self.elements:
+            tag = "canvas" if element_id.endswith("canvas") else "audio"
+            self.elements[element_id] = Element(tag)
+        return self.elements[element_id]
+
+    def createElement(self, tag):
+        return Element(tag)
+
+    def bind(self, event, handler):
+        self.handlers.setdefault(event, []).append(handler)
+
+    def unbind(self, event, handler=None):
+        handlers = self.handlers.get(event, [])
+        if handler is None:
+            handlers.clear()
+        elif handler in handlers:
+            handlers.remove(handler)
+
+
+class _Date:
+    @staticmethod
+    def now():
+        return time.time() * 1000
+
+
+class _Location:
+    search = ""
+
+    def reload(self):
+        pass
+
+
+class _Performance:
+    @staticmethod
+    def now():
+        return time.perf_counter() * 1000
+
+    @staticmethod
+    def mark(name):
+        pass
+
+
+class Window:
+    def __init__(self):
+        self.Date = _Date()
+        self.location = _Location()
+        self.performance = _Performance()
+        self.devicePixelRatio = 1
+        self.innerWidth = 800
+        self.innerHeight = 600
+        self.pending_frames = []
+        self.pending_timers = []  # setTimeout 的回调，基准测试不会执行它们
+        self._frame_handles = {}
+        self._next_handle = 0
+
+    def requestAnimationFrame(self, callback):
+        self._next_handle += 1
+        self._frame_handles[self._next_handle] = callback
+        self.pending_frames.append(callback)
+        return self._next_handle
+
+    def cancelAnimationFrame(self, handle):
+        callback = self._frame_handles.pop(handle, None)
+        if callback in self.pending_frames:
+            self.pending_frames.remove(callback)
+
+    def setTimeout(self, callback, delay=0):
+        self.pending_timers.append(callback)
+        return len(self.pending_timers)
+
+    def bind(self, event, handler):
+        pass
+
+
+document = Document()
+window = Window()
@@ -0,0 +1,293 @@
+"""猫捉老鼠游戏热点函数的基准测试（CPython，使用 bench/browser.py 替身）。
+
+用法：
+    python bench/run.py                          # 默认场景：标准关卡 + 放大地图
+    python bench/run.py --obstacles 1000,5000 --cheeses 3,200 --canvas 800x600,3840x2160
+    python bench/run.py --save bench/baseline.json
+    python bench/run.py --compare bench/baseline.json
+    python bench/run.py --obstacles= --cheeses 5000 --only step,main_loop     # 只测标准关卡的奶酪压力
+    python bench/run.py --arena 1,16,100 --only step,main_loop                  # 大地图：面积为屏幕的 N 倍
+
+每项结果给出 ns/op；整帧类基准（world.step、main_loop）额外给出帧率，
+超出 --budget-ms（默认 60 Hz 一帧）时标出。
+
+基线场景（standard）就是游戏里的关卡：设计分辨率 800x600、OBSTACLE_COUNT 个障碍物。
+--obstacles 给出的数量另外各成一个放大地图场景（scaled），地图按障碍物数等比放大
+（每个窗口面积 SCENARIO_DENSITY 个），障碍物没能全部放下时直接报错，不拿少放的地图充数。
+每个场景里所有基准（包括 main_loop）用的都是同一张地图，--canvas 只表示浏览器窗口的大小。
+"""
+import argparse, json, os, random, sys, time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)  # browser 替身优先
+sys.path.insert(1, os.path.join(os.path.dirname(BENCH_DIR), "src"))
+
+import engine
+from levels import LevelCache
+from arena import ArenaWorld
+from engine import (World, GameInput, Rect, is_colliding, generate_safe_position, generate_cheese_position, RAT_SIZE,
+                    CAT_SIZE, OBSTACLE_COUNT, DESIGN_WIDTH, DESIGN_HEIGHT)
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+SCENARIO_DENSITY = 8  # 热点函数场景每个窗口面积放的障碍物数（比一屏实际放得下的少一些，保证全部放下）
+FRAME_BENCHMARKS = ("world.step", "main_loop")
+
+
+# ===============================
+# 计时
+# ===============================
+def measure(op, min_time=0.2, repeat=3):
+    """自动确定循环次数，使每轮至少运行 min_time 秒，返回多轮中最好的 ns/op"""
+    loops = 1
+    while True:
+        start = time.perf_counter_ns()
+        for _ in range(loops):
+            op()
+        elapsed = time.perf_counter_ns() - start
+        if elapsed >= min_time * 1e9:
+            break
+        loops *= 2 if elapsed == 0 else max(2, min(10, int(min_time * 1e9 / elapsed) + 1))
+    best = elapsed / loops
+    for _ in range(repeat - 1):
+        start = time.perf_counter_ns()
+        for _ in range(loops):
+            op()
+        best = min(best, (time.perf_counter_ns() - start) / loops)
+    return best
+
+
+# ===============================
+# 场景
+# ===============================
+def build_world(obstacles, cheeses, width, height, seed=0):
+    # 带关卡缓存：整帧基准里一局结束后重新开局不再重新生成关卡，不把 World.reset 算进每帧耗时
+    world = World(width, height, num_obstacles=obstacles, seed=seed, levels=LevelCache())
+    while len(world.cheeses) < cheeses and world.cheese_spots:
+        world.add_cheese()
+    return world
+
+
+def scenario_size(obstacles, width=DESIGN_WIDTH, height=DESIGN_HEIGHT):
+    """放得下 obstacles 个障碍物的地图尺寸（不小于设计分辨率）"""
+    scale = max(1.0, (obstacles / SCENARIO_DENSITY) ** 0.5)
+    return round(width * scale), round(height * scale)
+
+
+def scenarios(args):
+    """返回 [(场景名, 障碍物数, 地图尺寸)]：先是标准关卡，再是各个放大地图"""
+    result = [("standard", OBSTACLE_COUNT, (DESIGN_WIDTH, DESIGN_HEIGHT))]
+    for obstacles in args.obstacles:
+        size = scenario_size(obstacles)
+        result.append(("scaled obstacles={} map={}x{}".format(obstacles, *size), obstacles, size))
+    return result
+
+
+def scenario_benchmarks(world):
+    """返回 {名称: 无参函数}，每次调用执行一次被测操作"""
+    rng = random.Random(1)
+    width, height = world.width, world.height
+    rat, cat, obstacles = world.rat, world.cat, world.obstacles
+    free_space, spots = world.free_space, world.cheese_spots
+    points = [(rng.uniform(0, width), rng.uniform(0, height)) for _ in range(1024)]
+    counter = [0]
+
+    def next_point():
+        counter[0] = (counter[0] + 1) & 1023
+        return points[counter[0]]
+
+    a = Rect(100, 100, 60, 60)
+    b = Rect(130, 130, 60, 60)
+
+    def rat_track():
+        x, y = next_point()
+        rat.track(x, y, obstacles=obstacles, bounds=(width, height), delta_time=engine.FRAME_TIME)
+
+    # 目标固定在老鼠处：只测猫的移动本身，流场重建单独计时
+    flow_field = world.flow_field
+    if flow_field is not None:
+        flow_field.update(rat.x, rat.y)
+
+    def cat_track():
+        cat.track(rat.x, rat.y, cat.speed or 200, obstacles=obstacles, delta_time=engine.FRAME_TIME,
+                  flow_field=flow_field)
+
+    def flow_rebuild():
+        # 目标换到随机位置后猫查一次路点：一个 tick 内流场的全部开销（展开受 FLOW_CELLS_PER_TICK 限制）
+        x, y = next_point()
+        flow_field.update(x, y)
+        flow_field.waypoint_at(cat.x, cat.y)
+
+    # 重新开局：每次重新生成关卡 vs. 从关卡缓存取用同一个种子的关卡
+    fresh = World(width, height, num_obstacles=world.num_obstacles, seed=world.seed)
+    cached = World(width, height, num_obstacles=world.num_obstacles, seed=world.seed, levels=LevelCache())
+
+    def step_world():
+        x, y = next_point()
+        world.step(engine.FRAME_TIME, GameInput(x, y))
+        if world.game_over:
+            world.reset(seed=world.seed)
+
+    benchmarks = {
+        "Rect.colliderect": lambda: a.colliderect(b),
+        "Rat.track": rat_track,
+        "Cat.track": cat_track,
+        "Cat.adjust_direction": lambda: cat.adjust_direction(rat.x, rat.y, obstacles),
+        "is_colliding": lambda: is_colliding(*next_point(), obstacles, CAT_SIZE),
+        "is_colliding[free_space]": lambda: is_colliding(*next_point(), obstacles, CAT_SIZE, free_space),
+        "generate_safe_position": lambda: generate_safe_position(RAT_SIZE, obstacles, width, height, free_space),
+        "generate_cheese_position": lambda: generate_cheese_position(obstacles, width, height, world.cheese_size, spots),
+        "world.step": step_world,
+        "World.reset": lambda: fresh.reset(seed=fresh.seed),
+        "World.reset[level_cache]": lambda: cached.reset(seed=cached.seed),
+    }
+    if flow_field is not None:
+        benchmarks["FlowField.update"] = flow_rebuild
+    return benchmarks
+
+
+def arena_benchmarks(world):
+    """大地图：老鼠朝随机方向一路跑下去（目标点相对老鼠），不断加载新块、淘汰旧块"""
+    rng = random.Random(1)
+    offsets = [(rng.uniform(-300, 300), rng.uniform(-300, 300)) for _ in range(64)]
+    counter = [0]
+
+    def step_world():
+        counter[0] += 1
+        dx, dy = offsets[(counter[0] >> 7) & 63]  # 每 128 个 tick 换一次方向
+        rat = world.rat
+        world.step(engine.FRAME_TIME, GameInput(rat.x + dx, rat.y + dy, 1 if counter[0] % 8 == 0 else 0))
+        if world.game_over:
+            world.reset(seed=world.seed)
+
+    return {"world.step": step_world}
+
+
+def main_loop_benchmark(world, width, height):
+    """导入前端（使用 browser 替身），在 width x height 的窗口中用 world 跑完整的一帧：模拟 + 绘制"""
+    import browser
+    browser.window.innerWidth, browser.window.innerHeight = width, height
+    import main as frontend
+    frontend.resolution.dirty = True
+    frontend.sync_canvas()
+    frontend.world = world
+    frontend.game_running = True
+    frontend.is_paused = False
+    frontend.scheduler.reset()
+    clock = [0.0]
+
+    def frame():
+        clock[0] += 1000 / 60
+        frontend.main_loop(clock[0])
+        browser.window.pending_frames.clear()
+        browser.window.pending_timers.clear()
+        if world.game_over:
+            world.reset(seed=world.seed)
+            frontend.game_running = True
+
+    return frame
+
+
+# ===============================
+# 运行与对比
+# ===============================
+def parse_list(text, convert):
+    return [convert(item) for item in text.split(",") if item]
+
+
+def parse_canvas(text):
+    w, h = text.lower().split("x")
+    return int(w), int(h)
+
+
+def run(args):
+    results = {}
+    for width, height in args.canvas:
+        for label, obstacles, map_size in scenarios(args):
+            for cheeses in args.cheeses:
+                key = "{} cheeses={} canvas={}x{}".format(label, cheeses, width, height)
+                print("== {}（地图 {}x{}）".format(key, *map_size), flush=True)
+                world = build_world(obstacles, cheeses, *map_size)
+                placed = len(world.obstacles)
+                if label == "standard":
+                    # 标准关卡原样测量，没能全部放下时也照常测（游戏里就是这样）
+                    print("  （放下 {}/{} 个障碍物）".format(placed, obstacles), flush=True)
+                elif placed < obstacles:
+                    sys.exit("{}：地图 {}x{} 只放下 {} 个障碍物".format(key, *map_size, placed))
+                benchmarks = scenario_benchmarks(world)
+                # main_loop 用同一组参数另建一个世界（两边各自推进，互不影响计时）
+                benchmarks["main_loop"] = main_loop_benchmark(build_world(obstacles, cheeses, *map_size), width, height)
+                scenario = results[key] = {}
+                for name, op in benchmarks.items():
+                    if args.only and not any(part in name for part in args.only):
+                        continue
+                    ns = measure(op, args.min_time, args.repeat)
+                    scenario[name] = ns
+                    extra = ""
+                    if name in FRAME_BENCHMARKS:
+                        extra = "  {:10.1f} frames/s".format(1e9 / ns)
+                        if ns > args.budget_ms * 1e6:
+                            extra += "  <-- 超出 {:.1f}ms 帧预算".format(args.budget_ms)
+                    print("  {:28s} {:14.0f} ns/op{}".format(name, ns, extra), flush=True)
+    for area in args.arena:
+        width, height = args.canvas[0]
+        size = (round(engine.DESIGN_WIDTH * area ** 0.5), round(engine.DESIGN_HEIGHT * area ** 0.5))
+        key = "arena={} canvas={}x{}".format(area, width, height)
+        print("== {}（地图 {}x{}）".format(key, *size), flush=True)
+        world = ArenaWorld(*size, seed=0)
+        benchmarks = arena_benchmarks(world)
+        benchmarks["main_loop"] = main_loop_benchmark(ArenaWorld(*size, seed=0), width, height)
+        scenario = results[key] = {}
+        for name, op in benchmarks.items():
+            if args.only and not any(part in name for part in args.only):
+                continue
+            ns = measure(op, args.min_time, args.repeat)
+            scenario[name] = ns
+            print("  {:28s} {:14.0f} ns/op  {:10.1f} frames/s".format(name, ns, 1e9 / ns), flush=True)
+        chunks = world.obstacles
+        print("  （已加载 {} 块 / 共 {} 块，累计生成 {}、淘汰 {}）".format(
+            len(chunks.chunks), chunks.cols * chunks.rows, chunks.generated, chunks.evicted), flush=True)
+    return results
+
+
+def compare(results, baseline):
+    print("\n== 与基线对比（>1 表示变慢）")
+    for key, scenario in results.items():
+        base = baseline.get(key)
+        if not base:
+            continue
+        print(key)
+        for name, ns in scenario.items():
+            if name in base:
+                ratio = ns / base[name]
+                flag = "  <-- 变慢" if ratio > 1.1 else ("  <-- 变快" if ratio < 0.9 else "")
+                print("  {:28s} {:14.0f} -> {:14.0f} ns/op  x{:.2f}{}".format(name, base[name], ns, ratio, flag))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--obstacles", type=lambda t: parse_list(t, int), default=[200, 1000],
+                        help="放大地图场景的障碍物数（标准关卡总会测量，留空则只测标准关卡）")
+    parser.add_argument("--cheeses", type=lambda t: parse_list(t, int), default=[3])
+    parser.add_argument("--canvas", type=lambda t: parse_list(t, parse_canvas), default=[(800, 600), (3840, 2160)])
+    parser.add_argument("--arena", type=lambda t: parse_list(t, int), default=[],
+                        help="大地图基准：地图面积为屏幕的这些倍数（使用 --canvas 的第一个窗口尺寸）")
+    parser.add_argument("--only", type=lambda t: parse_list(t, str), default=None, help="只运行名称包含这些子串的基准")
+    parser.add_argument("--budget-ms", type=float, default=1000 / 60, help="整帧基准的帧预算（毫秒）")
+    parser.add_argument("--min-time", type=float, default=0.2)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--save", nargs="?", const=DEFAULT_BASELINE, help="把结果保存为基线 JSON")
+    parser.add_argument("--compare", nargs="?", const=DEFAULT_BASELINE, help="与基线 JSON 对比")
+    args = parser.parse_args()
+
+    results = run(args)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print("\n基线已保存到 " + args.save)
+
+
+if __name__ == "__main__":
+    main()
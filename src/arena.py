@@ -0,0 +1,291 @@
+# ===============================
+# 大地图（竞技场）：分块生成、按需加载的障碍物与奶酪
+# 地图可以是屏幕面积的几十上百倍，但不会一次生成整张地图：地图按 CHUNK_SIZE 分块，
+# 每块的障碍物和初始奶酪只由 (种子, 块坐标) 决定，第一次被查询到时才生成。
+# 碰撞检测（Rat.track / Cat.track 中的 move_and_slide、出生点检测）和绘制只会用到
+# 查询区域覆盖的那几块；老鼠或猫跨进另一块时，预先生成老鼠周围的块，淘汰离两者都远的块，
+# 被淘汰块上剩下的奶酪位置记下来，下次加载时恢复。
+# 所以内存和每帧耗时只与老鼠、猫附近的块数有关，与地图大小无关。
+# 距离场、导航网格和奶酪空位表都要覆盖整张地图，大地图上不使用：
+# 出生点和新奶酪在附近随机采样（老鼠出生点与猫至少相隔 SPAWN_CAT_DISTANCE），猫直线追击并沿障碍物滑动（同 World(cat_navigation=False)）。
+# ===============================
+import math, random
+from geometry import Rect
+from engine import (World, Obstacle, DESIGN_WIDTH, DESIGN_HEIGHT, OBSTACLE_COUNT, OBSTACLE_GAP,
+                    MAX_PLACEMENT_ATTEMPTS, STEP_SIZE, RAT_SIZE, is_colliding)
+
+CHUNK_SIZE = 400
+CHEESES_PER_CHUNK = 1  # 每块初始的奶酪数
+PREFETCH_CHUNKS = 2  # 预先生成老鼠所在块周围这么多圈的块（覆盖视口），绘制时不用临时生成
+KEEP_CHUNKS = 3  # 离老鼠和猫所在块都超过这么多圈的块被淘汰（比预先生成多一圈，在块边界来回走时不会反复生成）
+SPAWN_SPAN = 400  # 出生点与新奶酪在中心点周围这个范围内采样
+SPAWN_CAT_DISTANCE = 300  # 老鼠的出生点离猫至少这么远（被抓后在原地附近重生，不能落在猫身边）
+MAX_SPAWN_SAMPLES = 200
+
+_EMPTY = ()
+
+
+def chunk_seed(seed, col, row):
+    """块的随机种子：只由地图种子和块坐标决定，与生成顺序无关"""
+    return (seed * 0x9e3779b1 + col * 0x85ebca6b + row * 0xc2b2ae35) & 0xffffffff
+
+
+class Chunk:
+    __slots__ = ("key", "x", "y", "width", "height", "obstacles", "styles", "cheese_spots")
+
+    def __init__(self, key, x, y, width, height, obstacles, cheese_spots):
+        self.key = key
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.obstacles = obstacles
+        self.styles = tuple("rgb({}, {}, {})".format(*obs.color) for obs in obstacles)
+        self.cheese_spots = cheese_spots
+
+
+def generate_chunk(seed, col, row, x, y, width, height, density, size_low, size_high, cheese_size,
+                   gap=OBSTACLE_GAP):
+    """生成一块：障碍物完全落在块内并与块边缘留出半个间隙，所以跨块的障碍物之间也至少相隔 gap"""
+    rng = random.Random(chunk_seed(seed, col, row))
+    expected = density * width * height
+    count = int(expected) + (1 if rng.random() < expected - int(expected) else 0)
+    half = gap // 2
+    obstacles = []
+    for _ in range(count):
+        for _ in range(MAX_PLACEMENT_ATTEMPTS):
+            length = rng.randint(size_low, size_high)
+            obstacle_width = rng.randint(size_low, size_high)
+            if length + gap > width or obstacle_width + gap > height:
+                continue
+            ox = rng.randint(x + half, x + width - half - length)
+            oy = rng.randint(y + half, y + height - half - obstacle_width)
+            probe = Rect(ox - gap, oy - gap, length + gap * 2, obstacle_width + gap * 2)
+            if not any(probe.colliderect(obs.rect) for obs in obstacles):
+                color = (rng.randint(0,255), rng.randint(0,255), rng.randint(0,255))
+                obstacles.append(Obstacle(ox, oy, length, obstacle_width, color))
+                break
+    spots = []
+    col0, col1 = x // STEP_SIZE + 1, (x + width) // STEP_SIZE - 1  # 奶酪锚点严格落在块内
+    row0, row1 = y // STEP_SIZE + 1, (y + height) // STEP_SIZE - 1
+    for _ in range(CHEESES_PER_CHUNK if col0 <= col1 and row0 <= row1 else 0):
+        for _ in range(MAX_PLACEMENT_ATTEMPTS):
+            sx = rng.randint(col0, col1) * STEP_SIZE
+            sy = rng.randint(row0, row1) * STEP_SIZE
+            rect = Rect(sx - cheese_size // 2, sy, cheese_size, cheese_size)
+            if not any(rect.colliderect(obs.rect) for obs in obstacles):
+                spots.append((sx, sy))
+                break
+    return Chunk((col, row), x, y, width, height, obstacles, tuple(spots))
+
+
+class ChunkedObstacles:
+    """与 spatial.ObstacleGrid 相同的查询接口；查询到的块如果还没加载就当场生成。
+
+    块只在 keep_near 中淘汰，查询过程中不会淘汰，返回的障碍物在本次查询期间一直有效。
+    """
+
+    def __init__(self, seed, width, height, num_obstacles, size_low, size_high, cheese_size,
+                 chunk_size=CHUNK_SIZE):
+        self.seed = seed
+        self.width = width
+        self.height = height
+        self.density = num_obstacles / (DESIGN_WIDTH * DESIGN_HEIGHT)  # 与标准地图相同的障碍物密度
+        self.size_low = size_low
+        self.size_high = size_high
+        self.cheese_size = cheese_size
+        self.chunk_size = chunk_size
+        self.cols = int(math.ceil(width / chunk_size))
+        self.rows = int(math.ceil(height / chunk_size))
+        self.chunks = {}  # (列, 行) -> Chunk，只包含已加载的块
+        self.on_load = None  # 可选回调 on_load(chunk)
+        self.on_evict = None  # 可选回调 on_evict(chunk)
+        self.generated = 0
+        self.evicted = 0
+        self._found = []
+
+    def chunk(self, col, row):
+        chunk = self.chunks.get((col, row))
+        if chunk is None:
+            cs = self.chunk_size
+            x, y = col * cs, row * cs
+            chunk = generate_chunk(self.seed, col, row, x, y, min(cs, self.width - x), min(cs, self.height - y),
+                                   self.density, self.size_low, self.size_high, self.cheese_size)
+            self.chunks[(col, row)] = chunk
+            self.generated += 1
+            if self.on_load is not None:
+                self.on_load(chunk)
+        return chunk
+
+    def chunks_in(self, x, y, width, height, load=True):
+        """与区域相交的块；load 为 False 时只返回已加载的，不生成新块"""
+        cs = self.chunk_size
+        col0, col1 = max(int(x // cs), 0), min(int((x + width) // cs), self.cols - 1)
+        row0, row1 = max(int(y // cs), 0), min(int((y + height) // cs), self.rows - 1)
+        keys = [(col, row) for row in range(row0, row1 + 1) for col in range(col0, col1 + 1)]
+        if load:
+            return [self.chunk(col, row) for col, row in keys]
+        chunks = self.chunks
+        return [chunks[key] for key in keys if key in chunks]
+
+    def __iter__(self):
+        """已加载块中的障碍物"""
+        for chunk in list(self.chunks.values()):
+            yield from chunk.obstacles
+
+    def __len__(self):
+        return sum(len(chunk.obstacles) for chunk in self.chunks.values())
+
+    def query(self, x, y, width, height):
+        """返回区域覆盖的块中的障碍物（可能包含不相交的），返回的序列会被下一次 query 复用"""
+        cs = self.chunk_size
+        col0, col1 = max(int(x // cs), 0), min(int((x + width) // cs), self.cols - 1)
+        row0, row1 = max(int(y // cs), 0), min(int((y + height) // cs), self.rows - 1)
+        if col0 > col1 or row0 > row1:
+            return _EMPTY
+        if col0 == col1 and row0 == row1:
+            return self.chunk(col0, row0).obstacles
+        found = self._found
+        found.clear()
+        for row in range(row0, row1 + 1):
+            for col in range(col0, col1 + 1):
+                found.extend(self.chunk(col, row).obstacles)
+        return found
+
+    def collides(self, rect):
+        for obs in self.query(rect.x, rect.y, rect.width, rect.height):
+            if rect.colliderect(obs.rect):
+                return True
+        return False
+
+    def key_of(self, x, y):
+        """(x, y) 所在块的 (列, 行)"""
+        cs = self.chunk_size
+        return int(x // cs), int(y // cs)
+
+    def prefetch(self, key, rings):
+        """生成块 key 周围 rings 圈内的块"""
+        col, row = key
+        for r in range(max(row - rings, 0), min(row + rings, self.rows - 1) + 1):
+            for c in range(max(col - rings, 0), min(col + rings, self.cols - 1) + 1):
+                self.chunk(c, r)
+
+    def keep_near(self, keys, rings):
+        """淘汰离 keys 中每一块都超过 rings 圈的块"""
+        for key, chunk in list(self.chunks.items()):
+            col, row = key
+            if all(max(abs(col - c), abs(row - r)) > rings for c, r in keys):
+                del self.chunks[key]
+                self.evicted += 1
+                if self.on_evict is not None:
+                    self.on_evict(chunk)
+
+
+class ArenaLevel:
+    """大地图的关卡：只有分块障碍物，没有整张地图的预计算数据（接口同 engine.Level）"""
+    streamed = True
+
+    def __init__(self, seed, width, height, num_obstacles, size_low, size_high, cheese_size, navigation=False):
+        self.key = (seed, width, height, num_obstacles, size_low, size_high, cheese_size, navigation)
+        self.seed = seed
+        self.obstacles = ChunkedObstacles(seed, width, height, num_obstacles, size_low, size_high, cheese_size)
+        self.styles = ()
+        self.free_space = None
+        self.cheese_spots = None
+        self.nav_grid = None
+        self.bitmap = None
+
+
+class ArenaWorld(World):
+    """规则与 World 相同，只是地图分块加载。num_obstacles 表示每个屏幕面积内的障碍物数"""
+
+    def __init__(self, width, height, num_obstacles=OBSTACLE_COUNT, seed=None, initial_cheeses=3, difficulty=None):
+        super().__init__(width, height, num_obstacles=num_obstacles, cat_navigation=False, seed=seed,
+                         initial_cheeses=initial_cheeses, difficulty=difficulty)
+
+    def make_level(self, key):
+        return ArenaLevel(*key)
+
+    def reset(self, initial_cheeses=3, seed=None):
+        self.rat = None  # 出生点以地图中心为准
+        self.cat = None  # 猫还没出生，出生点不用避开
+        self.saved_cheeses = {}  # 被淘汰的块 -> 块上剩下的奶酪位置
+        self.loaded_chunk_keys = None  # 上次整理块时老鼠和猫所在的块
+        super().reset(initial_cheeses, seed)
+        # 开局时老鼠的出生点是在猫出生之前采样的，离猫太近就按猫的位置重新采样
+        rat, cat = self.rat, self.cat
+        if (rat.x - cat.x) ** 2 + (rat.y - cat.y) ** 2 < SPAWN_CAT_DISTANCE ** 2:
+            rat.move_to(*self.spawn_position(RAT_SIZE))
+            rat.prev_x, rat.prev_y = rat.x, rat.y
+        chunks = self.obstacles
+        for chunk in list(chunks.chunks.values()):
+            self._load_cheeses(chunk)
+        chunks.on_load = self._load_cheeses
+        chunks.on_evict = self._save_cheeses
+        self.stream()
+
+    def spawn_center(self):
+        """出生点和新奶酪的采样中心：老鼠所在位置，开局时为地图中心"""
+        if self.rat is not None:
+            return self.rat.x, self.rat.y
+        return self.width / 2, self.height / 2
+
+    def _spawn_box(self, margin):
+        cx, cy = self.spawn_center()
+        x0 = int(max(margin, cx - SPAWN_SPAN))
+        x1 = int(min(self.width - margin, cx + SPAWN_SPAN))
+        y0 = int(max(margin, cy - SPAWN_SPAN))
+        y1 = int(min(self.height - margin, cy + SPAWN_SPAN))
+        return x0, x1, y0, y1
+
+    def spawn_position(self, radius):
+        """spawn_center 附近的安全出生点；猫已经出生时离猫至少 SPAWN_CAT_DISTANCE"""
+        x0, x1, y0, y1 = self._spawn_box(radius)
+        rng = self.rng
+        cat = self.cat
+        for _ in range(MAX_SPAWN_SAMPLES):
+            x, y = rng.randint(x0, x1), rng.randint(y0, y1)
+            if cat is not None and (x - cat.x) ** 2 + (y - cat.y) ** 2 < SPAWN_CAT_DISTANCE ** 2:
+                continue
+            if not is_colliding(x, y, self.obstacles, radius):
+                break
+        return x, y
+
+    def add_cheese(self):
+        """在老鼠附近放一块新奶酪（对齐到奶酪网格）"""
+        size = self.cheese_size
+        x0, x1, y0, y1 = self._spawn_box(STEP_SIZE)
+        rng = self.rng
+        for _ in range(MAX_SPAWN_SAMPLES):
+            x = rng.randint(x0 // STEP_SIZE, x1 // STEP_SIZE) * STEP_SIZE
+            y = rng.randint(y0 // STEP_SIZE, y1 // STEP_SIZE) * STEP_SIZE
+            if not self.obstacles.collides(Rect(x - size // 2, y, size, size)):
+                self.cheeses.spawn(x, y)
+                return
+
+    def _load_cheeses(self, chunk):
+        for x, y in self.saved_cheeses.pop(chunk.key, chunk.cheese_spots):
+            self.cheeses.spawn(x, y)
+
+    def _save_cheeses(self, chunk):
+        cheeses = self.cheeses
+        found = cheeses.in_area(chunk.x, chunk.y, chunk.width, chunk.height)
+        self.saved_cheeses[chunk.key] = tuple((cheese.x, cheese.y) for cheese in found)
+        for cheese in found:
+            cheeses.remove(cheese)
+
+    def stream(self):
+        """老鼠或猫换了块时：预先生成老鼠周围的块，淘汰离两者都远的块"""
+        chunks = self.obstacles
+        keys = (chunks.key_of(self.rat.x, self.rat.y), chunks.key_of(self.cat.x, self.cat.y))
+        if keys == self.loaded_chunk_keys:
+            return
+        self.loaded_chunk_keys = keys
+        chunks.prefetch(keys[0], PREFETCH_CHUNKS)
+        chunks.keep_near(keys, KEEP_CHUNKS)
+
+    def step(self, dt, inp):
+        events = super().step(dt, inp)
+        if not self.game_over:
+            self.stream()
+        return events
@@ -0,0 +1,219 @@
+# ===============================
+# 音频子系统（Web Audio）
+# 启动时按 AUDIO_MANIFEST 把 resources/ 下的音频一次性下载并解码成 AudioBuffer，
+# 之后播放只是从缓冲区新建一个 source 节点，不再读取文件或等待加载。
+# 音效从固定数量的声部（voice）中分配：每个声部是一个常驻的 GainNode，
+# 所有声部都在播放时抢占最早开始的那个，连续吃到奶酪时不会互相打断或被丢掉，同时发声数也有上限。
+# 模拟只调用 request() 把音效放进队列，main_loop 每帧结束时 flush() 一次真正发声，
+# 同一帧内重复的同名请求合并为一次，音频调用不会夹在模拟步进之间。
+# 页面加载时就要播的界面音效（开始界面的音乐）用 play_when_ready()：浏览器在第一次点击之前
+# 不允许发声、音频也还没解码完，先记下来，等解码完成并且解锁之后再播。
+# 浏览器不支持 Web Audio（或基准测试的替身环境）时所有接口都是空操作。
+# ===============================
+
+# 名称 -> (路径, 音量, 是否循环)
+AUDIO_MANIFEST = {
+    "bg": ("resources/bg.mp3", 0.2, True),
+    "eat": ("resources/eat.mp3", 0.2, False),
+    "hit": ("resources/hit.mp3", 0.2, False),
+    "cat": ("resources/cat.mp3", 0.2, False),
+    "loser": ("resources/loser.mp3", 0.2, False),
+    "winner": ("resources/winner.mp3", 0.5, False),
+}
+VOICE_COUNT = 8  # 同时发声的音效数上限（背景音乐单独占一个通道）
+
+
+def _audio_context(window):
+    for name in ("AudioContext", "webkitAudioContext"):
+        try:
+            return getattr(window, name).new()
+        except AttributeError:
+            continue
+    return None
+
+
+class Voice:
+    """一个声部：常驻的 GainNode 加上当前正在播放的 source"""
+    def __init__(self, context, output):
+        self.gain = context.createGain()
+        self.gain.connect(output)
+        self.source = None
+        self.name = None
+        self.started = 0.0
+        self.ends = 0.0  # 预计播放结束的时间（AudioContext.currentTime）
+
+    def stop(self):
+        if self.source is not None:
+            self.source.stop()
+            self.source.disconnect()
+            self.source = None
+        self.name = None
+        self.ends = 0.0
+
+
+class AudioEngine:
+    def __init__(self, window, manifest=AUDIO_MANIFEST, voices=VOICE_COUNT):
+        self.window = window
+        self.manifest = manifest
+        self.context = _audio_context(window)
+        self.buffers = {}  # 名称 -> 解码后的 AudioBuffer
+        self.failed = []
+        self.queue = []  # 本帧请求的音效名（按请求顺序，已去重）
+        self.voices = []
+        self.music = None  # 背景音乐的 Voice
+        self.music_name = None  # 想要播放的背景音乐（可能还没解码完）
+        self.pending = []  # 等解码完成并解锁后再播的界面音效
+        self.played = 0
+        self.dropped = 0  # 因尚未解码完成而丢弃的请求数
+        self.stolen = 0  # 抢占正在播放的声部的次数
+        if self.context is not None:
+            self.master = self.context.createGain()
+            self.master.connect(self.context.destination)
+            self.voices = [Voice(self.context, self.master) for _ in range(voices)]
+            self.music = Voice(self.context, self.master)
+
+    @property
+    def enabled(self):
+        return self.context is not None
+
+    @property
+    def ready(self):
+        """清单中的音频是否都已处理完（解码成功或失败）"""
+        return len(self.buffers) + len(self.failed) == len(self.manifest)
+
+    # -------------------------------
+    # 预加载
+    # -------------------------------
+    def preload(self):
+        """下载并解码清单中的全部音频（异步，只需调用一次）"""
+        if self.context is None:
+            return
+        for name, (path, _, _) in self.manifest.items():
+            self._load(name, path)
+
+    def _load(self, name, path):
+        context = self.context
+
+        def decode(response):
+            if not response.ok:
+                raise IOError("{} {}".format(path, response.status))
+            return response.arrayBuffer()
+
+        def store(buffer):
+            self.buffers[name] = buffer
+            if name == self.music_name:
+                self._start_music()
+            self._play_pending()
+
+        def fail(error):
+            self.failed.append(name)
+            print("音频加载失败：{}（{}）".format(path, error))
+
+        self.window.fetch(path).then(decode).then(lambda data: context.decodeAudioData(data)).then(store).catch(fail)
+
+    def unlock(self):
+        """浏览器要求在用户操作之后才能发声：在点击事件里调用"""
+        if self.context is None:
+            return
+        if self.context.state == "suspended":
+            self.context.resume().then(lambda _: self._play_pending())
+        else:
+            self._play_pending()
+
+    # -------------------------------
+    # 音效
+    # -------------------------------
+    def request(self, name):
+        """请求播放一个音效，下一次 flush 时才发声；同一帧内的重复请求只播一次"""
+        if name not in self.queue:
+            self.queue.append(name)
+
+    def flush(self):
+        """每帧调用一次：把队列里的音效分配到声部上播放"""
+        if not self.queue:
+            return
+        queue, self.queue = self.queue, []
+        if self.context is None:
+            return
+        for name in queue:
+            self.play(name)
+
+    def play(self, name):
+        """立即播放（界面按钮等非模拟触发的音效直接调用）"""
+        if self.context is None:
+            return
+        buffer = self.buffers.get(name)
+        if buffer is None:
+            self.dropped += 1
+            return
+        now = self.context.currentTime
+        voice = self._free_voice(now)
+        self._start(voice, name, buffer, now)
+        self.played += 1
+
+    def play_when_ready(self, name):
+        """已解码且已解锁时立即播放，否则等解码完成并解锁后再播（stop 会取消等待）"""
+        if self.context is None:
+            return
+        if name not in self.pending:
+            self.pending.append(name)
+        self._play_pending()
+
+    def _play_pending(self):
+        if not self.pending or self.context.state != "running":
+            return
+        for name in [name for name in self.pending if name in self.buffers]:
+            self.pending.remove(name)
+            self.play(name)
+
+    def stop(self, name):
+        """停止所有正在播放 name 的声部，还在等待播放的也一并取消"""
+        if name in self.pending:
+            self.pending.remove(name)
+        for voice in self.voices:
+            if voice.name == name:
+                voice.stop()
+
+    def _free_voice(self, now):
+        oldest = None
+        for voice in self.voices:
+            if voice.ends <= now:
+                return voice
+            if oldest is None or voice.started < oldest.started:
+                oldest = voice
+        self.stolen += 1
+        return oldest
+
+    def _start(self, voice, name, buffer, now):
+        _, volume, loop = self.manifest[name]
+        voice.stop()
+        source = self.context.createBufferSource()
+        source.buffer = buffer
+        source.loop = loop
+        source.connect(voice.gain)
+        voice.gain.gain.value = volume
+        source.start()
+        voice.source = source
+        voice.name = name
+        voice.started = now
+        voice.ends = float("inf") if loop else now + buffer.duration
+
+    # -------------------------------
+    # 背景音乐
+    # -------------------------------
+    def play_music(self, name):
+        """循环播放背景音乐；还没解码完时记下来，解码完成后自动开始"""
+        self.music_name = name
+        self._start_music()
+
+    def stop_music(self):
+        self.music_name = None
+        if self.music is not None:
+            self.music.stop()
+
+    def _start_music(self):
+        if self.context is None or self.music.name == self.music_name:
+            return
+        buffer = self.buffers.get(self.music_name)
+        if buffer is not None:
+            self._start(self.music, self.music_name, buffer, self.context.currentTime)
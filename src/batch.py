@@ -0,0 +1,710 @@
+# ===============================
+# 批量模拟核心（仅 CPython + NumPy，可离线评估难度）
+# 把 N 局独立游戏的状态放进扁平数组（结构体数组 → 数组结构体），
+# 每次 step 同时推进所有对局。规则与 engine.World(cat_navigation=False).step 相同：
+#   - 障碍物按 engine.initialize_obstacles 的方式布置：对齐导航格子、两两之间至少相隔 OBSTACLE_GAP；
+#   - 老鼠和猫的位移按 TRACK_SEGMENT_LENGTH 分段、每段重新瞄准，每段都做扫掠碰撞并沿障碍物滑动
+#     （collision.move_and_slide），猫追的是老鼠在这一段结束时刻的插值位置；
+#   - 猫在时间窗内几乎没有前进时按 Cat.adjust_direction 选脱困方向走 CAT_ESCAPE_TIME 秒；
+#   - 奶酪拾取看本 tick 扫过的整段路径，抓捕看猫鼠相对轨迹是否进入抓捕范围（collision.segment_hits_box）。
+# 猫不按流场寻路（World 默认开导航，导航的影响用 sweep.py 逐局评估）；出生点和奶酪用拒绝采样，
+# 与 World 从距离场/空位表采样的分布相同，但随机序列不同，所以同一个种子不会得到同一局。
+# 逐局一致性见 tests/test_batch.py：从 World 复制状态（from_worlds）后，在出现随机事件之前两者逐 tick 相同。
+# 前端（Brython）不会导入本模块。
+# ===============================
+import numpy as np
+
+from engine import (DESIGN_WIDTH, DESIGN_HEIGHT, STEP_SIZE, RAT_SIZE, CAT_SIZE,
+                    BASE_CHEESE_SIZE, BASE_OBSTACLE_SIZE_LOW, BASE_OBSTACLE_SIZE_HIGH,
+                    OBSTACLE_COUNT, OBSTACLE_GAP, OBSTACLE_SLACK, MAX_PLACEMENT_ATTEMPTS,
+                    GAME_DURATION, START_LIVES, CATCH_COOLDOWN, CATCH_DISTANCE, CHEESE_SPAWN_COUNTS,
+                    RAT_SPEED_DECAY, RAT_BOOST, RAT_SLOWDOWN_DISTANCE, TRACK_SEGMENT_LENGTH, MAX_TRACK_WAYPOINTS,
+                    TIME_EPSILON, CAT_STUCK_TIME, CAT_STUCK_PROGRESS, CAT_ESCAPE_TIME, CAT_ESCAPE_INERTIA,
+                    PID_GAINS, FRAME_TIME, Difficulty)
+from geometry import ADJUST_DIRECTIONS
+from navigation import NAV_CELL_SIZE
+from collision import SKIN, MAX_SLIDES
+
+CHEESE_CAPACITY = 16  # 每局奶酪槽位的初始数量，不够时整体加倍
+SPAWN_TRIES = 64  # 向量化拒绝采样的最大轮数
+RAT_MAX_SPEED, RAT_MIN_SPEED = 400, 20
+CLEARANCE_MARGIN = 1e-6  # 间隙预算留出的余量，超过“预算减余量”的位移才做精确检测
+COMPACT_FRACTION = 0.25  # run 中已结束的对局超过这个比例时把它们从数组中移除
+_FAR = -1e9  # 没有放下的障碍物槽位：移到远处的零大小矩形，不会与任何东西接触
+_DIRECTIONS = np.array(ADJUST_DIRECTIONS, dtype=np.float64)
+
+
+# -------------------------------
+# 向量化的几何判定（与 collision.py 中的标量版本逐项对应）
+# -------------------------------
+def _box_gap(left, top, size, ol, ot, orr, ob):
+    """左上角 (left, top)、边长 size 的方框与矩形之间沿最佳轴的间隙（参数按 NumPy 规则广播）。
+
+    小于 0 表示相交（与 Rect.colliderect 一致，刚好接触不算碰撞）；
+    大于 0 时，方框在每个轴上移动不超过该值都不可能碰到矩形。
+    """
+    return np.maximum(np.maximum(ol - (left + size), left - orr), np.maximum(ot - (top + size), top - ob))
+
+
+def _edges(rects):
+    """(..., 4) 的矩形数组拆成左、上、右、下四个视图"""
+    return rects[..., 0], rects[..., 1], rects[..., 2], rects[..., 3]
+
+
+def _min_gap(gap):
+    return gap.min(axis=1) if gap.shape[1] else np.full(gap.shape[0], np.inf)
+
+
+def _sweep_times(left, top, size, dx, dy, ol, ot, orr, ob):
+    """collision.sweep_box 的向量化版本（参数按 NumPy 规则广播，调用方负责屏蔽除零警告），
+    返回 (接触时刻, x 轴进入时刻, y 轴进入时刻)，不接触的接触时刻为 inf"""
+    still_x, still_y = dx == 0, dy == 0
+    a, b = (ol - (left + size)) / dx, (orr - left) / dx
+    # 某个轴上不动时：在这个轴上重叠就一直重叠（进入时刻 -inf），不重叠就永远碰不到（inf）
+    x_entry = np.where(still_x, np.where((left + size <= ol) | (left >= orr), np.inf, -np.inf), np.minimum(a, b))
+    x_exit = np.where(still_x, np.inf, np.maximum(a, b))
+    a, b = (ot - (top + size)) / dy, (ob - top) / dy
+    y_entry = np.where(still_y, np.where((top + size <= ot) | (top >= ob), np.inf, -np.inf), np.minimum(a, b))
+    y_exit = np.where(still_y, np.inf, np.maximum(a, b))
+    entry = np.maximum(x_entry, y_entry)
+    hit = (entry >= 0) & (entry <= 1) & (entry < np.minimum(x_exit, y_exit))
+    return np.where(hit, entry, np.inf), x_entry, y_entry
+
+
+def _move_and_slide(left, top, size, dx, dy, near, count):
+    """collision.move_and_slide 的向量化版本：就地移动 (m,) 的 left/top。
+
+    near 为 (J, 4, m) 的障碍物表（第 j 层是每行第 j 个障碍物的左、上、右、下），每行只有前 count 个有效；
+    一层层检测，每层只算还有障碍物的行。
+    """
+    pos = np.nonzero((dx != 0) | (dy != 0))[0]
+    x, y, mx, my = left[pos], top[pos], dx[pos], dy[pos]
+    for _ in range(MAX_SLIDES):
+        if not len(pos):
+            break
+        t, x_entry, y_entry = _sweep_times(x, y, size, mx, my, *near[0][:, pos])
+        x_axis = x_entry > y_entry
+        sub = np.arange(len(pos))
+        for j in range(1, len(near)):
+            sub = sub[count[pos[sub]] > j]
+            if not len(sub):
+                break
+            times, x_entry, y_entry = _sweep_times(x[sub], y[sub], size, mx[sub], my[sub], *near[j][:, pos[sub]])
+            # 时刻相同时取前面的，与 first_contact 一样
+            better = np.nonzero(times < t[sub])[0]
+            t[sub[better]] = times[better]
+            x_axis[sub[better]] = x_entry[better] > y_entry[better]
+        free = np.nonzero(t == np.inf)[0]
+        done = pos[free]
+        left[done] = x[free] + mx[free]
+        top[done] = y[free] + my[free]
+        hit = np.nonzero(t != np.inf)[0]
+        pos, x, y, mx, my, t, x_axis = pos[hit], x[hit], y[hit], mx[hit], my[hit], t[hit], x_axis[hit]
+        x = x + (mx * t + np.where(x_axis, np.where(mx > 0, -SKIN, SKIN), 0.0))
+        y = y + (my * t + np.where(x_axis, 0.0, np.where(my > 0, -SKIN, SKIN)))
+        left[pos] = x
+        top[pos] = y
+        # 剩余位移去掉法向分量，沿接触面继续滑动
+        mx = np.where(x_axis, 0.0, mx * (1 - t))
+        my = np.where(x_axis, my * (1 - t), 0.0)
+        going = np.nonzero((mx != 0) | (my != 0))[0]
+        pos, x, y, mx, my = pos[going], x[going], y[going], mx[going], my[going]
+
+
+def _segment_hits_box(x0, y0, x1, y1, half):
+    """collision.segment_hits_box 的向量化版本"""
+    t0 = np.zeros(len(x0))
+    t1 = np.ones(len(x0))
+    inside = np.ones(len(x0), dtype=bool)
+    for start, delta in ((x0, x1 - x0), (y0, y1 - y0)):
+        still = delta == 0
+        inside &= ~still | ((-half < start) & (start < half))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            a = (-half - start) / delta
+            b = (half - start) / delta
+        t0 = np.where(still, t0, np.maximum(t0, np.minimum(a, b)))
+        t1 = np.where(still, t1, np.minimum(t1, np.maximum(a, b)))
+    return inside & (t0 < t1)
+
+
+def _travel_speed(speed, min_speed, dt):
+    """engine.rat_travel_speed 的向量化版本"""
+    if dt <= 0:
+        return speed
+    decay_time = np.minimum((speed - min_speed) / RAT_SPEED_DECAY, dt)
+    distance = (speed - RAT_SPEED_DECAY * decay_time / 2) * decay_time + min_speed * (dt - decay_time)
+    return np.where(speed <= min_speed, speed, distance / dt)
+
+
+class _Mover:
+    """一个 tick 内一批实体（rows）的分段移动。
+
+    位置先拷贝到局部数组，每一段都在局部数组上移动，finish 时写回。开始时按本 tick 最多走的距离 reach
+    找出每个实体可能碰到的障碍物（滑动不会离开整段位移的外接矩形）：间隙预算大于 reach 的实体
+    这个 tick 碰不到任何障碍物。其余的实体再记一个到这几个障碍物的间隙，每一段的位移不超过它时直接移动，
+    超过时只对这几个障碍物做扫掠检测。
+    """
+
+    def __init__(self, rects, rows, left, top, clear, size, reach):
+        self.rows = rows
+        self.size = size
+        self.reach = reach
+        self.left = left[rows]
+        self.top = top[rows]
+        self.budget = clear[rows]
+        self.check = check = np.nonzero(reach >= self.budget - CLEARANCE_MARGIN)[0]
+        rects = rects[rows[check]]
+        gap = _box_gap(self.left[check, None], self.top[check, None], size, *_edges(rects))
+        near = gap < (reach[check] + CLEARANCE_MARGIN)[:, None]
+        self.far = _min_gap(np.where(near, np.inf, gap))  # 够不着的障碍物中最近的间隙
+        # 每行够得着的障碍物按原顺序排在前面，只保留最多的那一行需要的列数
+        count = near.sum(axis=1)
+        row, column = np.nonzero(near)
+        position = np.cumsum(near, axis=1)[row, column] - 1
+        self.near = np.full((int(count.max()) if len(count) else 0, 4, len(check)), _FAR)
+        self.near[position, :, row] = rects[row, column]
+        self.count = count
+        touching = count > 0
+        self.slot = np.full(len(rows), -1)  # 行在 near 中的位置
+        self.slot[check[touching]] = np.nonzero(touching)[0]
+        self.clear = np.full(len(rows), np.inf)  # 到够得着的障碍物的间隙，没有这样的障碍物时为 inf
+        self.clear[check[touching]] = np.where(near, gap, np.inf)[touching].min(axis=1)
+
+    def slide(self, idx, dx, dy):
+        """局部下标 idx 的实体沿 (dx, dy) 移动并沿障碍物滑动（Rat.slide / Cat.slide）"""
+        reach = np.maximum(np.abs(dx), np.abs(dy))
+        contact = reach >= self.clear[idx] - CLEARANCE_MARGIN
+        free = ~contact
+        moved = idx[free]
+        self.left[moved] += dx[free]
+        self.top[moved] += dy[free]
+        self.clear[moved] -= reach[free]
+        slow = idx[contact]
+        if not len(slow):
+            return
+        x, y = self.left[slow], self.top[slow]
+        slot = self.slot[slow]
+        near, count = self.near[:, :, slot], self.count[slot]
+        _move_and_slide(x, y, self.size, dx[contact], dy[contact], near, count)
+        self.left[slow], self.top[slow] = x, y
+        self.clear[slow] = np.maximum(_box_gap(x, y, self.size, *near.transpose(1, 0, 2)).min(axis=0), 0)
+
+    def finish(self, left, top, clear):
+        """位置写回 left/top，并更新间隙预算 clear"""
+        rows, check = self.rows, self.check
+        left[rows], top[rows] = self.left, self.top
+        # 没有检测的实体预算减去本 tick 最多走的距离；检测过的：够不着的障碍物至少还隔着“原间隙减 reach”，
+        # 够得着的就是一路维护下来的间隙
+        budget = self.budget - self.reach
+        budget[check] = np.minimum(self.far - self.reach[check] - CLEARANCE_MARGIN, self.clear[check])
+        clear[rows] = np.maximum(budget, 0)
+
+
+class BatchSimulation:
+    """N 局独立游戏的向量化模拟。
+
+    每个实体额外维护一个“间隙预算”（与最近障碍物/奶酪的最小间隙减去之后的位移），
+    预算耗尽前不可能发生接触，所以扫掠检测只在少数靠近障碍物的对局上进行。
+    按对局记录的数组（rat_x、cat_speed 等）只包含还没从数组中移除的对局，game 是它们的编号；
+    结果（lives、scores、catches、survival_time、obstacles）按编号记录全部 N 局。
+    """
+
+    # 按对局记录、随对局一起移除的数组
+    LIVE_FIELDS = ("game", "done", "obstacle_rects",
+                   "rat_x", "rat_y", "rat_left", "rat_top", "rat_speed", "rat_invincible", "rat_invincible_start",
+                   "cat_x", "cat_y", "cat_left", "cat_top", "cat_speed",
+                   "cat_stuck_time", "cat_stuck_planned", "cat_stuck_x", "cat_stuck_y",
+                   "cat_escaping", "cat_escape_x", "cat_escape_y", "cat_escape_time", "cat_last_escape_x",
+                   "cat_last_escape_y", "pid_integral", "pid_previous_error", "last_catch_time",
+                   "cheese_left", "cheese_top", "cheese_alive",
+                   "rat_obstacle_clear", "cat_obstacle_clear", "rat_cheese_clear", "cat_cheese_clear")
+
+    def __init__(self, n_games, width=DESIGN_WIDTH, height=DESIGN_HEIGHT,
+                 num_obstacles=OBSTACLE_COUNT, seed=None, pid_gains=PID_GAINS,
+                 initial_cheeses=3, difficulty=None):
+        self.n = n_games
+        self.width = width
+        self.height = height
+        self.num_obstacles = num_obstacles
+        self.difficulty = difficulty if difficulty is not None else Difficulty(pid_gains=pid_gains)
+        self.kp, self.ki, self.kd = self.difficulty.pid_gains
+        self.rng = np.random.default_rng(seed)
+        self.reset(initial_cheeses)
+
+    def _allocate(self, n, k):
+        """所有状态清零（障碍物槽位全空），出生点、速度和奶酪由调用方填写"""
+        self.clock = 0.0
+        self.game = np.arange(n)
+        self.done = np.zeros(n, dtype=bool)
+        self.obstacle_rects = np.full((n, k, 4), _FAR)  # 每局 K 个障碍物的 (左, 上, 右, 下)
+        for name in ("rat_x", "rat_y", "rat_left", "rat_top", "rat_speed", "rat_invincible_start",
+                     "cat_x", "cat_y", "cat_left", "cat_top", "cat_speed",
+                     "cat_stuck_time", "cat_stuck_planned", "cat_stuck_x", "cat_stuck_y",
+                     "cat_escape_x", "cat_escape_y", "cat_escape_time", "cat_last_escape_x", "cat_last_escape_y",
+                     "pid_integral", "pid_previous_error",
+                     "rat_obstacle_clear", "cat_obstacle_clear", "rat_cheese_clear", "cat_cheese_clear"):
+            setattr(self, name, np.zeros(n))
+        self.rat_invincible = np.zeros(n, dtype=bool)
+        self.cat_escaping = np.zeros(n, dtype=bool)
+        self.last_catch_time = np.full(n, -CATCH_COOLDOWN)
+        # 奶酪：槽位 + 存活标记，坐标为碰撞矩形左上角
+        self.cheese_left = np.zeros((n, CHEESE_CAPACITY))
+        self.cheese_top = np.zeros((n, CHEESE_CAPACITY))
+        self.cheese_alive = np.zeros((n, CHEESE_CAPACITY), dtype=bool)
+        # 结果（按对局编号）
+        self.lives = np.full(n, START_LIVES, dtype=np.int64)
+        self.scores = np.zeros(n, dtype=np.int64)
+        self.catches = np.zeros(n, dtype=np.int64)
+        self.survival_time = np.full(n, float(GAME_DURATION))
+        self.obstacles = np.zeros(n, dtype=np.int64)  # 实际放下的障碍物数
+
+    def reset(self, initial_cheeses=3):
+        n, rng = self.n, self.rng
+        self._allocate(n, self.num_obstacles)
+        self._place_obstacles()
+        rows = np.arange(n)
+        self._place_cat(rows, *self._safe_positions(rows, CAT_SIZE))
+        self._place_rat(rows, *self._safe_positions(rows, RAT_SIZE))
+        for _ in range(initial_cheeses):
+            self._spawn_cheese(rows)
+        low, high = self.difficulty.start_speed_range
+        self.cat_speed = rng.integers(low, high, size=n, endpoint=True).astype(np.float64)
+        self.rat_speed = rng.integers(low, high, size=n, endpoint=True).astype(np.float64)
+        self._restart_stuck_window(rows)
+
+    @classmethod
+    def from_worlds(cls, worlds, seed=None):
+        """复制若干局 World(cat_navigation=False) 当前的状态；之后的随机事件（奶酪、重生）用 seed 的随机序列"""
+        first = worlds[0]
+        sim = cls(len(worlds), first.width, first.height, num_obstacles=0, seed=seed, initial_cheeses=0,
+                  difficulty=first.difficulty)
+        n = len(worlds)
+        sim.num_obstacles = max(len(world.obstacles) for world in worlds)
+        sim._allocate(n, sim.num_obstacles)
+        sim.clock = first.clock
+        for i, world in enumerate(worlds):
+            for k, obs in enumerate(world.obstacles):
+                rect = obs.rect
+                sim.obstacle_rects[i, k] = rect.x, rect.y, rect.x + rect.width, rect.y + rect.height
+            sim.obstacles[i] = len(world.obstacles)
+            rat, cat = world.rat, world.cat
+            sim.rat_x[i], sim.rat_y[i], sim.rat_left[i], sim.rat_top[i] = rat.x, rat.y, rat.rect.x, rat.rect.y
+            sim.rat_speed[i] = rat.speed
+            sim.rat_invincible[i], sim.rat_invincible_start[i] = rat.invincible, rat.invincible_start
+            sim.cat_x[i], sim.cat_y[i], sim.cat_left[i], sim.cat_top[i] = cat.x, cat.y, cat.rect.x, cat.rect.y
+            sim.cat_speed[i] = cat.speed
+            sim.cat_stuck_time[i], sim.cat_stuck_planned[i] = cat.stuck_time, cat.stuck_planned
+            sim.cat_stuck_x[i], sim.cat_stuck_y[i] = cat.stuck_x, cat.stuck_y
+            sim.cat_escaping[i] = cat.escape is not None
+            if cat.escape is not None:
+                sim.cat_escape_x[i], sim.cat_escape_y[i] = cat.escape
+            sim.cat_escape_time[i] = cat.escape_time
+            sim.cat_last_escape_x[i], sim.cat_last_escape_y[i] = cat.last_escape
+            pid = world.pid_controller
+            sim.pid_integral[i], sim.pid_previous_error[i] = pid.integral, pid.previous_error
+            sim.last_catch_time[i] = world.last_catch_time
+            sim.lives[i], sim.scores[i] = world.lives_count, world.scores
+            sim.done[i] = world.game_over
+            while len(world.cheeses) > sim.cheese_alive.shape[1]:
+                sim._grow_cheeses()
+            for slot, cheese in enumerate(world.cheeses):
+                sim.cheese_left[i, slot], sim.cheese_top[i, slot] = cheese.rect.x, cheese.rect.y
+                sim.cheese_alive[i, slot] = True
+        return sim
+
+    def _place_rat(self, rows, x, y):
+        self.rat_x[rows], self.rat_y[rows] = x, y
+        self.rat_left[rows], self.rat_top[rows] = x - RAT_SIZE, y - RAT_SIZE
+        self.rat_obstacle_clear[rows] = 0
+        self.rat_cheese_clear[rows] = 0
+
+    def _place_cat(self, rows, x, y):
+        self.cat_x[rows], self.cat_y[rows] = x, y
+        self.cat_left[rows], self.cat_top[rows] = x - CAT_SIZE, y - CAT_SIZE
+        self.cat_obstacle_clear[rows] = 0
+        self.cat_cheese_clear[rows] = 0
+
+    def _compact(self):
+        """把已结束的对局从按对局记录的数组中移除，之后的 step 不再为它们付出任何开销"""
+        keep = ~self.done
+        for name in self.LIVE_FIELDS:
+            setattr(self, name, getattr(self, name)[keep])
+
+    # -------------------------------
+    # 生成（向量化的拒绝采样）
+    # -------------------------------
+    def _place_obstacles(self):
+        """与 engine.initialize_obstacles 相同的布置：左上角对齐导航格子，两两之间至少相隔 OBSTACLE_GAP，
+        某个障碍物 MAX_PLACEMENT_ATTEMPTS 次都放不下时这个槽位留空"""
+        n, rng, gap = self.n, self.rng, OBSTACLE_GAP
+        low, high = BASE_OBSTACLE_SIZE_LOW, BASE_OBSTACLE_SIZE_HIGH
+        left, top, right, bottom = _edges(self.obstacle_rects)
+        cols = (self.width - 80) // NAV_CELL_SIZE
+        rows_ = (self.height - 80) // NAV_CELL_SIZE
+        for k in range(self.num_obstacles):
+            pending = np.arange(n)
+            for _ in range(MAX_PLACEMENT_ATTEMPTS):
+                m = len(pending)
+                x = (rng.integers(0, cols, size=m, endpoint=True) * NAV_CELL_SIZE + OBSTACLE_SLACK).astype(np.float64)
+                y = (rng.integers(0, rows_, size=m, endpoint=True) * NAV_CELL_SIZE + OBSTACLE_SLACK).astype(np.float64)
+                length = rng.integers(low, high, size=m, endpoint=True)
+                width = rng.integers(low, high, size=m, endpoint=True)
+                # 向外扩 gap 的矩形与已放下的障碍物相交（刚好接触不算）
+                ex, ey = (x - gap)[:, None], (y - gap)[:, None]
+                blocked = ((ex < right[pending, :k]) & (ex + (length + gap * 2)[:, None] > left[pending, :k]) &
+                           (ey < bottom[pending, :k]) & (ey + (width + gap * 2)[:, None] > top[pending, :k])).any(axis=1)
+                placed, ok = pending[~blocked], ~blocked
+                left[placed, k], top[placed, k] = x[ok], y[ok]
+                right[placed, k], bottom[placed, k] = x[ok] + length[ok], y[ok] + width[ok]
+                pending = pending[blocked]
+                if not len(pending):
+                    break
+        self.obstacles[:] = (left > _FAR).sum(axis=1)
+
+    def _circle_hits(self, rows, x, y, radius):
+        ol, ot, orr, ob = _edges(self.obstacle_rects[rows])
+        closest_x = np.clip(x[:, None], ol, orr)
+        closest_y = np.clip(y[:, None], ot, ob)
+        return (np.hypot(x[:, None] - closest_x, y[:, None] - closest_y) < radius).any(axis=1)
+
+    def _safe_positions(self, rows, radius):
+        """与 generate_safe_position 相同的分布；多轮后仍失败的对局保留最后一次采样"""
+        x = np.zeros(len(rows))
+        y = np.zeros(len(rows))
+        pending = np.arange(len(rows))
+        for _ in range(SPAWN_TRIES):
+            cx = self.rng.integers(radius, self.width - radius, size=len(pending), endpoint=True).astype(np.float64)
+            cy = self.rng.integers(radius, self.height - radius, size=len(pending), endpoint=True).astype(np.float64)
+            x[pending] = cx
+            y[pending] = cy
+            bad = self._circle_hits(rows[pending], cx, cy, radius)
+            pending = pending[bad]
+            if not len(pending):
+                break
+        return x, y
+
+    def _cheese_positions(self, rows):
+        """与 pick_cheese_spot 相同的网格分布，返回碰撞矩形左上角"""
+        left = np.zeros(len(rows))
+        top = np.zeros(len(rows))
+        size = BASE_CHEESE_SIZE
+        pending = np.arange(len(rows))
+        for _ in range(SPAWN_TRIES):
+            cx = self.rng.integers(1, (self.width - 20) // STEP_SIZE - 1, size=len(pending), endpoint=True) * STEP_SIZE
+            cy = self.rng.integers(1, (self.height - 20) // STEP_SIZE - 1, size=len(pending), endpoint=True) * STEP_SIZE
+            left[pending] = cx - size // 2
+            top[pending] = cy
+            r = rows[pending]
+            gap = _box_gap(left[pending, None], top[pending, None], size,
+                           *_edges(self.obstacle_rects[r]))
+            pending = pending[(gap < 0).any(axis=1)]
+            if not len(pending):
+                break
+        return left, top
+
+    def _grow_cheeses(self):
+        n, capacity = self.cheese_alive.shape
+        self.cheese_left = np.concatenate([self.cheese_left, np.zeros((n, capacity))], axis=1)
+        self.cheese_top = np.concatenate([self.cheese_top, np.zeros((n, capacity))], axis=1)
+        self.cheese_alive = np.concatenate([self.cheese_alive, np.zeros((n, capacity), dtype=bool)], axis=1)
+
+    def _spawn_cheese(self, rows):
+        """给 rows 中每局各加一块奶酪（World 中奶酪没有数量上限，槽位用完时加倍）"""
+        free = ~self.cheese_alive[rows]
+        if not free.any(axis=1).all():
+            self._grow_cheeses()
+            free = ~self.cheese_alive[rows]
+        slot = free.argmax(axis=1)
+        left, top = self._cheese_positions(rows)
+        self.cheese_left[rows, slot] = left
+        self.cheese_top[rows, slot] = top
+        self.cheese_alive[rows, slot] = True
+        self.rat_cheese_clear[rows] = 0
+        self.cat_cheese_clear[rows] = 0
+
+    # -------------------------------
+    # 实体运动
+    # -------------------------------
+    def _rat_track(self, rows, speed, target_x, target_y, dt):
+        """Rat.track：朝目标点移动，最后 RAT_SLOWDOWN_DISTANCE 内减速，位移分段、每段重新瞄准"""
+        target_x = np.clip(target_x, 0, self.width)
+        target_y = np.clip(target_y, 0, self.height)
+        dx = target_x - self.rat_x[rows]
+        dy = target_y - self.rat_y[rows]
+        m_ab = np.maximum(np.sqrt(dx * dx + dy * dy), 0.001)
+        step = speed * dt
+        slow = m_ab - step < RAT_SLOWDOWN_DISTANCE
+        if slow.any():
+            slow_time = np.where(speed > 0, dt - np.maximum(m_ab - RAT_SLOWDOWN_DISTANCE, 0) / speed, 0)
+            left = np.minimum(m_ab, RAT_SLOWDOWN_DISTANCE) * np.exp(-speed * slow_time / RAT_SLOWDOWN_DISTANCE)
+            step = np.where(slow, m_ab - np.maximum(left, np.minimum(m_ab, 1)), step)
+        go = (m_ab >= 1) & (step > 0)
+        rows, step, m_ab, dx, dy = rows[go], step[go], m_ab[go], dx[go], dy[go]
+        target_x, target_y = target_x[go], target_y[go]
+        if not len(rows):
+            return
+        mover = _Mover(self.obstacle_rects, rows, self.rat_left, self.rat_top, self.rat_obstacle_clear,
+                       RAT_SIZE * 2, step)
+        live = np.arange(len(rows))  # 还在分段移动的行（rows 中的下标）
+        while len(live):
+            segment = np.minimum(np.minimum(step, TRACK_SEGMENT_LENGTH), m_ab)
+            mover.slide(live, segment * (dx / m_ab), segment * (dy / m_ab))
+            step = step - segment
+            dx = target_x[live] - (mover.left[live] + RAT_SIZE)
+            dy = target_y[live] - (mover.top[live] + RAT_SIZE)
+            m_ab = np.sqrt(dx * dx + dy * dy)
+            go = (step > 0) & (m_ab >= 1)
+            live, step, m_ab, dx, dy = live[go], step[go], m_ab[go], dx[go], dy[go]
+        mover.finish(self.rat_left, self.rat_top, self.rat_obstacle_clear)
+        self.rat_x[rows] = self.rat_left[rows] + RAT_SIZE
+        self.rat_y[rows] = self.rat_top[rows] + RAT_SIZE
+
+    def _cat_track(self, rows, from_x, from_y, dt):
+        """Cat.track（不按流场寻路）：追老鼠在每段结束时刻的插值位置，卡住时脱困"""
+        escaping = self.cat_escaping[rows]
+        speed = self.cat_speed[rows]
+        escape_time = self.cat_escape_time[rows]
+        duration = np.where(escaping, np.minimum(dt, escape_time), dt)
+        total = speed * duration
+        mover = _Mover(self.obstacle_rects, rows, self.cat_left, self.cat_top, self.cat_obstacle_clear,
+                       CAT_SIZE * 2, total)
+
+        # 脱困中：沿脱困方向走，最后一个 tick 只走到脱困时间用完为止
+        esc = np.nonzero(escaping)[0]
+        if len(esc):
+            step = total[esc]
+            mover.slide(esc, self.cat_escape_x[rows[esc]] * step, self.cat_escape_y[rows[esc]] * step)
+
+        # 追击：每段追目标在这一段结束时刻的位置
+        chase = np.nonzero(~escaping)[0]
+        target_x, target_y = self.rat_x[rows], self.rat_y[rows]
+        remaining = total.copy()
+        planned = np.zeros(len(rows))
+        segments = (total / TRACK_SEGMENT_LENGTH).astype(np.int64) + 1 + MAX_TRACK_WAYPOINTS
+        live = chase
+        count = 0
+        while len(live):
+            t = total[live]
+            alpha = np.where(t > 0, np.minimum(planned[live] + TRACK_SEGMENT_LENGTH, t) / t, 1.0)
+            fx, fy = from_x[live], from_y[live]
+            dir_x = fx + (target_x[live] - fx) * alpha - (mover.left[live] + CAT_SIZE)
+            dir_y = fy + (target_y[live] - fy) * alpha - (mover.top[live] + CAT_SIZE)
+            length = np.sqrt(dir_x * dir_x + dir_y * dir_y)
+            moving = length != 0
+            live, length = live[moving], length[moving]
+            dir_x, dir_y = dir_x[moving] / length, dir_y[moving] / length
+            step = np.minimum(np.minimum(remaining[live], length), TRACK_SEGMENT_LENGTH)
+            mover.slide(live, dir_x * step, dir_y * step)
+            planned[live] += step
+            remaining[live] -= step
+            count += 1
+            live = live[(remaining[live] > 0) & (segments[live] > count)]
+        mover.finish(self.cat_left, self.cat_top, self.cat_obstacle_clear)
+        self.cat_x[rows] = self.cat_left[rows] + CAT_SIZE
+        self.cat_y[rows] = self.cat_top[rows] + CAT_SIZE
+
+        if len(esc):
+            escape_time = self.cat_escape_time[rows[esc]] = escape_time[esc] - duration[esc]
+            over = rows[esc[escape_time <= TIME_EPSILON]]
+            self.cat_escaping[over] = False
+            self._restart_stuck_window(over)
+
+        # 卡住检测：时间窗内的净位移不到应走距离的 CAT_STUCK_PROGRESS 就算卡住
+        rows, planned = rows[chase], planned[chase]
+        self.cat_stuck_time[rows] += dt
+        self.cat_stuck_planned[rows] += planned
+        window = rows[self.cat_stuck_time[rows] >= CAT_STUCK_TIME - TIME_EPSILON]
+        if not len(window):
+            return
+        moved = np.sqrt((self.cat_x[window] - self.cat_stuck_x[window]) ** 2 +
+                        (self.cat_y[window] - self.cat_stuck_y[window]) ** 2)
+        stuck = window[moved < self.cat_stuck_planned[window] * CAT_STUCK_PROGRESS]
+        self._restart_stuck_window(window)
+        if len(stuck):
+            self._adjust_direction(stuck)
+            self.cat_escape_time[stuck] = CAT_ESCAPE_TIME
+
+    def _restart_stuck_window(self, rows):
+        self.cat_stuck_time[rows] = 0.0
+        self.cat_stuck_planned[rows] = 0.0
+        self.cat_stuck_x[rows] = self.cat_x[rows]
+        self.cat_stuck_y[rows] = self.cat_y[rows]
+
+    def _adjust_direction(self, rows):
+        """Cat.adjust_direction：在一个半径远处试探 ADJUST_DIRECTIONS，取不碰障碍物的方向中
+        最朝向老鼠、其次最接近上一次脱困方向的；都不行时不脱困"""
+        x, y = self.cat_x[rows], self.cat_y[rows]
+        probe_left = (x[:, None] + _DIRECTIONS[:, 0] * CAT_SIZE) - CAT_SIZE
+        probe_top = (y[:, None] + _DIRECTIONS[:, 1] * CAT_SIZE) - CAT_SIZE
+        size = CAT_SIZE * 2
+        ol, ot, orr, ob = _edges(self.obstacle_rects[rows][:, None, :, :])
+        pl, pt = probe_left[:, :, None], probe_top[:, :, None]
+        blocked = ((pl + size > ol) & (pl < orr) & (pt + size > ot) & (pt < ob)).any(axis=2)
+        to_x, to_y = self.rat_x[rows] - x, self.rat_y[rows] - y
+        distance = np.sqrt(to_x * to_x + to_y * to_y)
+        distance = np.where(distance == 0, 1, distance)
+        dx, dy = _DIRECTIONS[:, 0], _DIRECTIONS[:, 1]
+        score = ((dx * to_x[:, None] + dy * to_y[:, None]) / distance[:, None] +
+                 CAT_ESCAPE_INERTIA * (dx * self.cat_last_escape_x[rows, None] + dy * self.cat_last_escape_y[rows, None]))
+        score = np.where(blocked, -np.inf, score)
+        best = score.argmax(axis=1)
+        found = ~blocked.all(axis=1)
+        self.cat_escaping[rows] = found
+        rows, best = rows[found], best[found]
+        self.cat_escape_x[rows] = self.cat_last_escape_x[rows] = _DIRECTIONS[best, 0]
+        self.cat_escape_y[rows] = self.cat_last_escape_y[rows] = _DIRECTIONS[best, 1]
+
+    # -------------------------------
+    # 单步推进
+    # -------------------------------
+    def step(self, dt, target_x, target_y, boosts=None):
+        """推进所有未结束对局 dt 秒；target_x/target_y/boosts 为与 rat_x 同形的输入数组"""
+        self.clock += dt
+        rows = np.nonzero(~self.done)[0]
+        if not len(rows):
+            return
+        difficulty = self.difficulty
+        invincible = rows[self.rat_invincible[rows]]
+        over = self.clock - self.rat_invincible_start[invincible] >= difficulty.invincibility_time
+        self.rat_invincible[invincible[over]] = False
+
+        # 倒计时结束
+        if GAME_DURATION - int(self.clock) <= 0:
+            self.done[:] = True
+            return
+
+        rat_px, rat_py = self.rat_x[rows], self.rat_y[rows]
+        cat_px, cat_py = self.cat_x[rows], self.cat_y[rows]
+        rat_speed = self.rat_speed[rows]
+        if boosts is not None:
+            rat_speed = np.minimum(rat_speed + RAT_BOOST * np.asarray(boosts)[rows], RAT_MAX_SPEED)
+
+        # PID：误差为猫鼠距离
+        dx, dy = rat_px - cat_px, rat_py - cat_py
+        error = np.sqrt(dx * dx + dy * dy)
+        pid_dt = max(dt, 0.001)
+        derivative = (error - self.pid_previous_error[rows]) / pid_dt
+        integral = self.pid_integral[rows] = self.pid_integral[rows] + error * pid_dt
+        pid_speed = np.maximum(self.kp * error + self.ki * integral + self.kd * derivative, 0)
+        self.pid_previous_error[rows] = error
+
+        travel = _travel_speed(rat_speed, RAT_MIN_SPEED, dt)
+        self.rat_speed[rows] = np.maximum(RAT_MIN_SPEED, rat_speed - RAT_SPEED_DECAY * dt)
+        self.cat_speed[rows] = np.clip(pid_speed, difficulty.cat_min_speed, difficulty.cat_max_speed) * \
+            difficulty.cat_decay_rate
+
+        # 扫掠检测里静止轴的除零由 np.where 挑掉，整段只进出一次 errstate
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self._rat_track(rows, travel, np.asarray(target_x, dtype=np.float64)[rows],
+                            np.asarray(target_y, dtype=np.float64)[rows], dt)
+            self._cat_track(rows, rat_px, rat_py, dt)
+            self._update_cheeses(rows, rat_px, rat_py, cat_px, cat_py)
+        self._check_catch(rows, rat_px, rat_py, cat_px, cat_py)
+
+    def _cheese_hits(self, rows, left, top, size, dx, dy, clear):
+        """CheeseField.colliding：终点矩形碰到的，加上从起点扫过来的路上碰到的奶酪。
+        返回 (做了检测的行, (m, C) 的命中表)，间隙预算够的行跳过"""
+        reach = np.maximum(np.abs(dx), np.abs(dy))
+        check = reach >= clear[rows] - CLEARANCE_MARGIN
+        skip = rows[~check]
+        clear[skip] -= reach[~check]
+        rows, left, top, dx, dy = rows[check], left[check], top[check], dx[check], dy[check]
+        cheese = BASE_CHEESE_SIZE
+        cl, ct = self.cheese_left[rows], self.cheese_top[rows]
+        alive = self.cheese_alive[rows]
+        left, top, dx, dy = left[:, None], top[:, None], dx[:, None], dy[:, None]
+        gap = _box_gap(left, top, size, cl, ct, cl + cheese, ct + cheese)
+        times = _sweep_times(left - dx, top - dy, size, dx, dy, cl, ct, cl + cheese, ct + cheese)[0]
+        hit = alive & ((gap < 0) | np.isfinite(times))
+        clear[rows] = np.maximum(np.where(alive & ~hit, gap, np.inf).min(axis=1), 0)
+        return rows, hit
+
+    def _update_cheeses(self, rows, rat_px, rat_py, cat_px, cat_py):
+        # 先结算老鼠吃到的，猫就碰不到这些奶酪了；老鼠碰到的每一块都算吃到，猫碰到的直接消失
+        eater, eaten = self._cheese_hits(rows, self.rat_left[rows], self.rat_top[rows], RAT_SIZE * 2,
+                                         self.rat_x[rows] - rat_px, self.rat_y[rows] - rat_py, self.rat_cheese_clear)
+        self.cheese_alive[eater] &= ~eaten
+        cat, touched = self._cheese_hits(rows, self.cat_left[rows], self.cat_top[rows], CAT_SIZE * 2,
+                                         self.cat_x[rows] - cat_px, self.cat_y[rows] - cat_py, self.cat_cheese_clear)
+        self.cheese_alive[cat] &= ~touched
+
+        eat_count = eaten.sum(axis=1)
+        eating = np.nonzero(eat_count)[0]
+        if not len(eating):
+            return
+        eat_count = eat_count[eating]
+        eater = eater[eating]
+        self.scores[self.game[eater]] += eat_count
+        # 每吃一块随机补 CHEESE_SPAWN_COUNTS 中的块数
+        draws = self.rng.choice(CHEESE_SPAWN_COUNTS, size=(len(eater), eat_count.max()))
+        spawn_count = np.where(np.arange(draws.shape[1])[None, :] < eat_count[:, None], draws, 0).sum(axis=1)
+        for i in range(1, spawn_count.max() + 1):
+            self._spawn_cheese(eater[spawn_count >= i])
+
+    def _check_catch(self, rows, rat_px, rat_py, cat_px, cat_py):
+        # 本 tick 内猫鼠的相对轨迹进入抓捕范围就算抓到
+        close = _segment_hits_box(cat_px - rat_px, cat_py - rat_py, self.cat_x[rows] - self.rat_x[rows],
+                                  self.cat_y[rows] - self.rat_y[rows], CATCH_DISTANCE)
+        caught = close & ~self.rat_invincible[rows] & (self.clock - self.last_catch_time[rows] >= CATCH_COOLDOWN)
+        rows = rows[caught]
+        if not len(rows):
+            return
+        games = self.game[rows]
+        self.last_catch_time[rows] = self.clock
+        self.lives[games] -= 1
+        self.catches[games] += 1
+        dead = self.lives[games] == 0
+        self.done[rows[dead]] = True
+        self.survival_time[games[dead]] = self.clock
+        alive = rows[~dead]
+        if len(alive):
+            self._place_rat(alive, *self._safe_positions(alive, RAT_SIZE))
+            self.rat_invincible[alive] = True
+            self.rat_invincible_start[alive] = self.clock
+
+    def run(self, policy, dt=FRAME_TIME):
+        """用脚本化的老鼠策略跑完所有对局；policy(sim) 返回 (target_x, target_y, boosts)"""
+        while len(self.game):
+            target_x, target_y, boosts = policy(self)
+            self.step(dt, target_x, target_y, boosts)
+            if self.done.sum() > len(self.done) * COMPACT_FRACTION or self.done.all():
+                self._compact()
+        return self
+
+
+# -------------------------------
+# 脚本化老鼠策略
+# -------------------------------
+def flee_policy(sim, distance=100):
+    """朝远离猫的方向跑"""
+    dx = sim.rat_x - sim.cat_x
+    dy = sim.rat_y - sim.cat_y
+    length = np.maximum(np.hypot(dx, dy), 0.001)
+    return sim.rat_x + dx / length * distance, sim.rat_y + dy / length * distance, None
+
+def idle_policy(sim):
+    """原地不动"""
+    return sim.rat_x, sim.rat_y, None
+
+
+def evaluate_difficulty(n_games, policy=flee_policy, seed=None, tick_rate=None, **kwargs):
+    """蒙特卡洛评估猫的难度，返回各项统计的均值；tick_rate 默认与游戏相同（规则与步长无关，可以调低来加速）"""
+    dt = 1 / tick_rate if tick_rate else FRAME_TIME
+    sim = BatchSimulation(n_games, seed=seed, **kwargs).run(policy, dt)
+    return {
+        "games": n_games,
+        "survival_time": float(sim.survival_time.mean()),
+        "catches": float(sim.catches.mean()),
+        "cheese": float(sim.scores.mean()),
+        "loss_rate": float((sim.lives == 0).mean()),
+    }
+
+
+if __name__ == "__main__":
+    import sys, time
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    tick_rate = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    start = time.perf_counter()
+    result = evaluate_difficulty(games, seed=0, tick_rate=tick_rate)
+    result["seconds"] = round(time.perf_counter() - start, 2)
+    print(result)
@@ -0,0 +1,152 @@
+# ===============================
+# 奶酪存储：对象池 + 交换删除 + 空间分桶
+# 奶酪只会被生成和吃掉，不会移动。存活的奶酪放在紧凑列表里，每块记住自己的下标，
+# 删除时把最后一块换过来，O(1)；被吃掉的对象放进空闲列表，下次生成时复用。
+# 另外按 cell_size 的格子分桶，拾取检测只看老鼠/猫所在格子里的奶酪。
+# ===============================
+from geometry import Rect
+from collision import sweep_box
+
+CHEESE_CELL_SIZE = 40
+BASE_CHEESE_SIZE = 20  # 设计分辨率下的基础大小
+
+class Cheese:
+    __slots__ = ("x", "y", "size", "rect", "index", "_stamp")
+
+    def __init__(self, x, y, size=BASE_CHEESE_SIZE):
+        self.size = size
+        self.rect = Rect(0, 0, size, size)
+        self.index = -1  # 在 CheeseField.items 中的位置，不在场上时为 -1
+        self._stamp = 0
+        self.place(x, y)
+
+    def place(self, x, y):
+        self.x = x
+        self.y = y
+        self.rect.x = x - self.size // 2
+        self.rect.y = y
+
+class CheeseField:
+    def __init__(self, size=BASE_CHEESE_SIZE, cell_size=CHEESE_CELL_SIZE):
+        self.size = size
+        self.cell_size = cell_size
+        self.items = []  # 场上的奶酪（紧凑存储，顺序不固定）
+        self.free = []  # 对象池
+        self.cells = {}
+        self.version = 0  # 每次增删加一，渲染据此判断缓存图层是否过期
+        self._stamp = 0
+        self._area = Rect(0, 0, 0, 0)  # colliding 的扫掠区域
+        self._found = []  # colliding 的结果，每次调用复用
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __getitem__(self, index):
+        return self.items[index]
+
+    def _cells_of(self, rect):
+        cs = self.cell_size
+        for cx in range(int(rect.x // cs), int((rect.x + rect.width) // cs) + 1):
+            for cy in range(int(rect.y // cs), int((rect.y + rect.height) // cs) + 1):
+                yield (cx, cy)
+
+    def spawn(self, x, y):
+        """在 (x, y) 放一块奶酪（优先复用对象池），返回该奶酪"""
+        if self.free:
+            cheese = self.free.pop()
+            cheese.place(x, y)
+        else:
+            cheese = Cheese(x, y, self.size)
+        cheese.index = len(self.items)
+        self.items.append(cheese)
+        for key in self._cells_of(cheese.rect):
+            bucket = self.cells.get(key)
+            if bucket is None:
+                self.cells[key] = [cheese]
+            else:
+                bucket.append(cheese)
+        self.version += 1
+        return cheese
+
+    def remove(self, cheese):
+        """O(1) 移除：最后一块奶酪填到被移除的位置"""
+        items = self.items
+        index = cheese.index
+        last = items.pop()
+        if last is not cheese:
+            items[index] = last
+            last.index = index
+        cheese.index = -1
+        for key in self._cells_of(cheese.rect):
+            bucket = self.cells[key]
+            bucket.remove(cheese)
+            if not bucket:
+                del self.cells[key]
+        self.free.append(cheese)
+        self.version += 1
+
+    def clear(self):
+        for cheese in self.items:
+            cheese.index = -1
+        self.free.extend(self.items)
+        self.items = []
+        self.cells = {}
+        self.version += 1
+
+    def in_area(self, x, y, width, height):
+        """锚点 (x, y) 落在给定区域内的奶酪（新列表），用于视口裁剪和按区域整体移除"""
+        cs = self.cell_size
+        cells = self.cells
+        self._stamp += 1
+        stamp = self._stamp
+        found = []
+        right, bottom = x + width, y + height
+        # 奶酪矩形覆盖锚点，锚点所在格子的桶里一定有它
+        for cx in range(int(x // cs), int(right // cs) + 1):
+            for cy in range(int(y // cs), int(bottom // cs) + 1):
+                bucket = cells.get((cx, cy))
+                if bucket is None:
+                    continue
+                for cheese in bucket:
+                    if cheese._stamp != stamp:
+                        cheese._stamp = stamp
+                        if x <= cheese.x < right and y <= cheese.y < bottom:
+                            found.append(cheese)
+        return found
+
+    def colliding(self, rect, dx=0, dy=0):
+        """返回与 rect 相交的所有奶酪。
+
+        (dx, dy) 是 rect 本 tick 的位移，非零时还包括从 rect 减去位移的起点扫过来的路上碰到的奶酪。
+        返回的列表会被下一次 colliding 复用；调用方可以在遍历时删除奶酪。
+        """
+        self._stamp += 1
+        stamp = self._stamp
+        found = self._found
+        found.clear()
+        cells = self.cells
+        area = rect
+        if dx or dy:
+            start_x, start_y = rect.x - dx, rect.y - dy
+            area = self._area
+            area.x = min(start_x, rect.x)
+            area.y = min(start_y, rect.y)
+            area.width = rect.width + abs(dx)
+            area.height = rect.height + abs(dy)
+        cs = self.cell_size
+        for cx in range(int(area.x // cs), int((area.x + area.width) // cs) + 1):
+            for cy in range(int(area.y // cs), int((area.y + area.height) // cs) + 1):
+                bucket = cells.get((cx, cy))
+                if bucket is None:
+                    continue
+                for cheese in bucket:
+                    if cheese._stamp != stamp:
+                        cheese._stamp = stamp
+                        if rect.colliderect(cheese.rect) or (
+                                area is not rect and
+                                sweep_box(start_x, start_y, rect.width, rect.height, dx, dy, cheese.rect) is not None):
+                            found.append(cheese)
+        return found
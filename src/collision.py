@@ -0,0 +1,100 @@
+# ===============================
+# 连续碰撞检测（扫掠 AABB）
+# 只检测终点位置时，一步走得太远就会穿过薄障碍物；这里沿整段位移求最早的接触时刻（TOI），
+# 停在接触点，再把剩余位移去掉法向分量后继续滑动。与 Rect.colliderect 一样，
+# 刚好贴边不算碰撞，所以贴着障碍物边缘滑动是允许的。
+# 这样模拟在 10~20 Hz 的大步长下走出的路线与 60 Hz 基本一致。
+# ===============================
+
+SKIN = 1e-6  # 接触后沿法向留出的间隙，避免浮点误差导致下一次检测时已经重叠
+MAX_SLIDES = 3  # 单次移动最多处理的接触次数
+
+_INF = float("inf")
+
+def sweep_box(x, y, width, height, dx, dy, other):
+    """左上角 (x, y) 的方框沿 (dx, dy) 移动时与矩形 other 最早的接触。
+
+    返回 (t, nx, ny)：t 为 0~1 的接触时刻，(nx, ny) 为接触面的法向；不接触时返回 None。
+    起点已经与 other 重叠的不算接触（允许从重叠中移出）。
+    """
+    left, top = other.x, other.y
+    right, bottom = left + other.width, top + other.height
+    if dx > 0:
+        x_entry = (left - (x + width)) / dx
+        x_exit = (right - x) / dx
+    elif dx < 0:
+        x_entry = (right - x) / dx
+        x_exit = (left - (x + width)) / dx
+    elif x + width <= left or x >= right:
+        return None
+    else:
+        x_entry, x_exit = -_INF, _INF
+    if dy > 0:
+        y_entry = (top - (y + height)) / dy
+        y_exit = (bottom - y) / dy
+    elif dy < 0:
+        y_entry = (bottom - y) / dy
+        y_exit = (top - (y + height)) / dy
+    elif y + height <= top or y >= bottom:
+        return None
+    else:
+        y_entry, y_exit = -_INF, _INF
+    entry = max(x_entry, y_entry)
+    if entry < 0 or entry > 1 or entry >= min(x_exit, y_exit):
+        return None
+    if x_entry > y_entry:
+        return entry, (-1 if dx > 0 else 1), 0
+    return entry, 0, (-1 if dy > 0 else 1)
+
+def first_contact(x, y, width, height, dx, dy, obstacles):
+    """沿位移扫过的区域内最早的接触 (t, nx, ny)，没有则返回 None"""
+    qx = x + dx if dx < 0 else x
+    qy = y + dy if dy < 0 else y
+    best = None
+    for obs in obstacles.query(qx, qy, width + abs(dx), height + abs(dy)):
+        hit = sweep_box(x, y, width, height, dx, dy, obs.rect)
+        if hit is not None and (best is None or hit[0] < best[0]):
+            best = hit
+    return best
+
+def move_and_slide(rect, dx, dy, obstacles):
+    """把 rect 沿 (dx, dy) 就地移动，碰到障碍物时停在接触点并沿表面滑动"""
+    x, y, width, height = rect.x, rect.y, rect.width, rect.height
+    for _ in range(MAX_SLIDES):
+        if dx == 0 and dy == 0:
+            break
+        hit = first_contact(x, y, width, height, dx, dy, obstacles)
+        if hit is None:
+            x += dx
+            y += dy
+            break
+        t, nx, ny = hit
+        x += dx * t + nx * SKIN
+        y += dy * t + ny * SKIN
+        # 剩余位移去掉法向分量，沿接触面继续滑动
+        dx *= 1 - t
+        dy *= 1 - t
+        if nx:
+            dx = 0
+        if ny:
+            dy = 0
+    rect.x = x
+    rect.y = y
+
+def segment_hits_box(x0, y0, x1, y1, half):
+    """线段 (x0, y0)→(x1, y1) 是否经过开区间方框 |x| < half, |y| < half"""
+    t0, t1 = 0.0, 1.0
+    for start, delta in ((x0, x1 - x0), (y0, y1 - y0)):
+        if delta == 0:
+            if not -half < start < half:
+                return False
+            continue
+        a = (-half - start) / delta
+        b = (half - start) / delta
+        if a > b:
+            a, b = b, a
+        t0 = max(t0, a)
+        t1 = min(t1, b)
+        if t0 >= t1:
+            return False
+    return True
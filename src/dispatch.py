@@ -0,0 +1,75 @@
+# ===============================
+# 集中式输入分发
+# 每种事件只在 document 上绑定一个监听函数，收到事件后只转发给
+# 全局处理函数和当前激活界面（scope）的处理函数。界面退出时调用 release，
+# 它注册的处理函数会被一次性清掉，不会在 document 上越积越多。
+# 指针事件的坐标在这里统一计算一次，处理函数签名为 handler(event, pos)，
+# 非指针事件的 pos 为 None。传入 transform（pointer.CanvasTransform）时 pos 是设计坐标，
+# 且不会每个事件都调用 getBoundingClientRect；否则是画布上的 CSS 像素坐标。
+# ===============================
+
+GLOBAL_SCOPE = "global"  # 始终接收事件的作用域（鼠标位置跟踪、调试快捷键等）
+EVENT_TYPES = ("pointermove", "click", "keydown")
+POINTER_EVENTS = ("pointermove", "click")
+
+class InputDispatcher:
+    def __init__(self, document, canvas, event_types=EVENT_TYPES, transform=None):
+        self.canvas = canvas
+        self.transform = transform
+        self.scopes = {}  # scope -> {事件类型: [处理函数, ...]}
+        self.active = None
+        self.dispatched = 0  # 累计转发的事件数（调试用）
+        for event_type in event_types:
+            document.bind(event_type, self._router(event_type))
+
+    def _router(self, event_type):
+        def route(event):
+            self.dispatch(event_type, event)
+        return route
+
+    def on(self, scope, event_type, handler):
+        """为 scope 注册一个处理函数"""
+        self.scopes.setdefault(scope, {}).setdefault(event_type, []).append(handler)
+
+    def activate(self, scope):
+        """之后的事件转发给 scope（以及全局作用域）"""
+        self.active = scope
+
+    def release(self, scope):
+        """界面退出：注销 scope 的全部处理函数"""
+        self.scopes.pop(scope, None)
+        if self.active == scope:
+            self.active = None
+
+    def _handlers(self, scope, event_type):
+        table = self.scopes.get(scope)
+        return table.get(event_type, ()) if table else ()
+
+    def dispatch(self, event_type, event):
+        pos = None
+        if event_type in POINTER_EVENTS:
+            if self.transform is not None:
+                pos = self.transform.to_design(event.clientX, event.clientY)
+            else:
+                rect = self.canvas.getBoundingClientRect()
+                pos = (event.clientX - rect.left, event.clientY - rect.top)
+        # 先复制列表：处理函数里可能切换界面或注销自己
+        handlers = list(self._handlers(GLOBAL_SCOPE, event_type))
+        if self.active is not None and self.active != GLOBAL_SCOPE:
+            handlers.extend(self._handlers(self.active, event_type))
+        self.dispatched += 1
+        for handler in handlers:
+            handler(event, pos)
+
+    @property
+    def active_handlers(self):
+        """当前会收到事件的处理函数个数（全局 + 激活界面）"""
+        count = sum(len(h) for h in self.scopes.get(GLOBAL_SCOPE, {}).values())
+        if self.active is not None and self.active != GLOBAL_SCOPE:
+            count += sum(len(h) for h in self.scopes.get(self.active, {}).values())
+        return count
+
+    @property
+    def registered_handlers(self):
+        """所有作用域中已注册的处理函数总数"""
+        return sum(len(h) for table in self.scopes.values() for h in table.values())
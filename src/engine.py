@@ -0,0 +1,634 @@
+import math, random
+from geometry import Rect, ADJUST_DIRECTIONS
+from spatial import ObstacleGrid
+from navigation import NavGrid, FlowField, NAV_CELL_SIZE
+from freespace import FreeSpace
+from cheese import Cheese, CheeseField, BASE_CHEESE_SIZE
+from collision import move_and_slide, segment_hits_box
+
+# ===============================
+# 无浏览器依赖的游戏模拟核心
+# 前端（main.py）只负责输入采集与绘制，所有游戏规则都在这里。
+# ===============================
+
+# 设计分辨率
+DESIGN_WIDTH = 800
+DESIGN_HEIGHT = 600
+# 常量
+STEP_SIZE = 20
+RAT_SIZE = 10
+CAT_SIZE = 30
+BASE_OBSTACLE_SIZE_LOW = 40  # 设计分辨率下的基础大小
+BASE_OBSTACLE_SIZE_HIGH = 100  # 设计分辨率下的基础大小
+OBSTACLE_COUNT = 12  # 按 OBSTACLE_GAP 随机布置时 800x600 的地图约九成种子能全部放下，其余少放一两个
+INVINCIBILITY_TIME = 3  # 无敌时间（秒）
+GAME_DURATION = 60  # 每局时长（秒）
+START_LIVES = 3
+CATCH_COOLDOWN = 2.0  # 被抓后的冷却时间（秒）
+CATCH_DISTANCE = 10
+CHEESE_SPAWN_COUNTS = (1, 2, 3)  # 每吃到一块奶酪，随机补上这么多块
+RAT_SPEED_DECAY = 60  # 老鼠每秒衰减的速度
+RAT_BOOST = 50  # 每次点击增加的速度
+RAT_SLOWDOWN_DISTANCE = 10  # 老鼠离目标点不到这个距离时开始减速
+PID_GAINS = (0.9, 0.1, 0.01)
+START_SPEED_RANGE = (60, 300)  # 猫和老鼠的初始速度在此范围内随机
+CAT_MAX_SPEED = 500
+CAT_MIN_SPEED = 10
+CAT_DECAY_RATE = 0.6
+FRAME_TIME = 1 / 60
+TIME_EPSILON = 1e-9  # 累加 dt 的浮点误差，比较时间时留出的余量
+MAX_SPAWN_ATTEMPTS = 1000  # 没有距离场可用时拒绝采样的次数上限
+TRACK_SEGMENT_LENGTH = 5  # 一个 tick 的位移按这个长度分段，每段重新瞄准（约为 60 Hz 下一个 tick 走的距离）
+MAX_TRACK_WAYPOINTS = 4  # 猫一个 tick 内除分段外最多再因路点多走的段数
+CAT_STUCK_TIME = 0.25  # 卡住检测的时间窗（秒）
+CAT_STUCK_PROGRESS = 0.1  # 时间窗内的净位移不到这段时间应走距离的这个比例就算卡住
+CAT_ESCAPE_TIME = 0.5  # 卡住后沿脱困方向走这么久（秒），再回到流场/直线追击
+CAT_ESCAPE_INERTIA = 0.5  # 选脱困方向时偏向上一次的方向，沿长墙脱困时不会来回折返
+OBSTACLE_SLACK = 5  # 障碍物左上角相对导航格子的偏移，也是猫在最窄通道里的余量
+OBSTACLE_GAP = CAT_SIZE * 2 + OBSTACLE_SLACK  # 障碍物之间至少留出的间隙：猫的碰撞矩形边长再加余量，猫和老鼠都能从中间穿过
+MAX_PLACEMENT_ATTEMPTS = 50  # 每个障碍物的采样次数，都放不下时这个障碍物就不放了
+MAX_LAYOUT_ATTEMPTS = 20  # 布局把猫的导航网格分成几片时重新布置，最多这么多次
+LEVEL_SEED_MASK = 0x9e3779b9  # 关卡布局的随机序列与 World.rng 错开
+
+# -------------------------------
+# 实体类
+# track 对整段位移做连续碰撞检测（见 collision.py）：停在接触点并沿障碍物滑动，
+# 步长再大也不会穿过障碍物。正对障碍物表面时滑动分量为零，猫会停在原地：
+# 连续 CAT_STUCK_TIME 秒几乎没有前进时，用 adjust_direction（在预分配的试探矩形 _probe 上试探）
+# 选一个脱困方向走 CAT_ESCAPE_TIME 秒。
+# -------------------------------
+class Rat:
+    def __init__(self, speed, r, x, y, max_speed=400, min_speed=20):
+        self.speed = speed
+        self.max_speed = max_speed
+        self.min_speed = min_speed
+        self.r = r
+        self.x = x
+        self.y = y
+        self.prev_x = x  # 上一 tick 的位置，用于渲染插值
+        self.prev_y = y
+        self.rect = Rect(x - r, y - r, r * 2, r * 2)
+        self.color = (0, 255, 0)
+        self.invincible = False
+        self.invincible_start = 0
+
+    def move_to(self, x, y):
+        self.x = x
+        self.y = y
+        self.rect.move_to(x, y)
+
+    def slide(self, dx, dy, obstacles):
+        """沿 (dx, dy) 移动并沿障碍物表面滑动，中心跟着碰撞矩形走"""
+        rect = self.rect
+        move_and_slide(rect, dx, dy, obstacles)
+        self.x = rect.x + self.r
+        self.y = rect.y + self.r
+
+    def track(self, target_x, target_y, speed=None, obstacles=None, bounds=(DESIGN_WIDTH, DESIGN_HEIGHT), delta_time=None):
+        if speed is None:
+            speed = self.speed
+        if delta_time is None:
+            delta_time = FRAME_TIME
+        target_x = max(0, min(bounds[0], target_x))
+        target_y = max(0, min(bounds[1], target_y))
+        m_ab = max(math.sqrt((target_x - self.x) ** 2 + (target_y - self.y) ** 2), 0.001)
+        if m_ab < 1:
+            return
+        sin_angle = (target_x - self.x) / m_ab
+        cos_angle = (target_y - self.y) / m_ab
+        step = speed * delta_time
+        if m_ab - step < RAT_SLOWDOWN_DISTANCE:
+            # 进入 RAT_SLOWDOWN_DISTANCE 以内后速度与剩余距离成正比（指数逼近目标，不越过目标点），
+            # 按这段时间精确积分，走出的位置与步长无关
+            slow_time = delta_time - max(m_ab - RAT_SLOWDOWN_DISTANCE, 0) / speed if speed > 0 else 0
+            left = min(m_ab, RAT_SLOWDOWN_DISTANCE) * math.exp(-speed * slow_time / RAT_SLOWDOWN_DISTANCE)
+            step = m_ab - max(left, min(m_ab, 1))
+        if obstacles is None:
+            self.move_to(self.x + step * sin_angle, self.y + step * cos_angle)
+            return
+        # 位移按 TRACK_SEGMENT_LENGTH 分段，每段重新瞄准目标：贴着障碍物滑过拐角后会转向目标，
+        # 而不是沿障碍物表面把整步滑完，大步长与小步长走出的轨迹相同
+        while step > 0:
+            segment = min(step, TRACK_SEGMENT_LENGTH, m_ab)
+            self.slide(segment * sin_angle, segment * cos_angle, obstacles)
+            step -= segment
+            m_ab = math.sqrt((target_x - self.x) ** 2 + (target_y - self.y) ** 2)
+            if m_ab < 1:
+                break
+            sin_angle = (target_x - self.x) / m_ab
+            cos_angle = (target_y - self.y) / m_ab
+
+class Cat:
+    def __init__(self, speed, r, x, y, max_speed=CAT_MAX_SPEED, decay_rate=CAT_DECAY_RATE, min_speed=CAT_MIN_SPEED):
+        self.speed = speed
+        self.max_speed = max_speed
+        self.min_speed = min_speed
+        self.decay_rate = decay_rate
+        self.r = r
+        self.x = x
+        self.y = y
+        self.prev_x = x  # 上一 tick 的位置，用于渲染插值
+        self.prev_y = y
+        self.rect = Rect(x - r, y - r, r * 2, r * 2)
+        self._probe = self.rect.copy()
+        self.color = (255, 0, 0)
+        self.stuck_time = 0.0  # 卡住检测时间窗已经过去的时间
+        self.stuck_planned = 0.0  # 时间窗内应走的距离
+        self.stuck_x = x  # 时间窗开始时的位置
+        self.stuck_y = y
+        self.escape = None  # 正在脱困时的单位方向 (dx, dy)
+        self.escape_time = 0.0
+        self.last_escape = (0.0, 0.0)
+
+    def move_to(self, x, y):
+        self.x = x
+        self.y = y
+        self.rect.move_to(x, y)
+
+    def slide(self, dx, dy, obstacles):
+        """沿 (dx, dy) 移动并沿障碍物表面滑动，中心跟着碰撞矩形走"""
+        rect = self.rect
+        move_and_slide(rect, dx, dy, obstacles)
+        self.x = rect.x + self.r
+        self.y = rect.y + self.r
+
+    def update_speed(self, pid_speed):
+        self.speed = min(self.max_speed, max(self.min_speed, pid_speed))
+        self.speed *= self.decay_rate
+
+    def adjust_direction(self, target_x, target_y, obstacles):
+        """脱困方向：ADJUST_DIRECTIONS 中试探位置不碰障碍物的方向 (dx, dy)，都不行时返回 None。
+
+        优先朝向目标，其次沿上一次脱困的方向继续走。
+        """
+        step = self.r  # 试探一个半径远的位置，与步长无关
+        to_x, to_y = target_x - self.x, target_y - self.y
+        distance = math.sqrt(to_x * to_x + to_y * to_y) or 1
+        last_x, last_y = self.last_escape
+        probe = self._probe
+        best, best_score = None, None
+        for dx, dy in ADJUST_DIRECTIONS:
+            probe.move_to(self.x + dx * step, self.y + dy * step)
+            if obstacles.collides(probe):
+                continue
+            score = (dx * to_x + dy * to_y) / distance + CAT_ESCAPE_INERTIA * (dx * last_x + dy * last_y)
+            if best_score is None or score > best_score:
+                best, best_score = (dx, dy), score
+        if best is not None:
+            self.last_escape = best
+        return best
+
+    def track(self, target_x, target_y, speed=None, obstacles=None, delta_time=None, flow_field=None,
+              target_from=None):
+        """追向 (target_x, target_y)；target_from 是目标在本 tick 开始时的位置，
+        给出时每段位移追的是目标在这一段结束时刻的插值位置，而不是 tick 末的位置"""
+        # 如果没有指定 speed，就使用对象的默认速度
+        if speed is None:
+            speed = self.speed
+
+        # 如果没有传入 delta_time，则采用默认值（例如 1/60 秒）
+        if delta_time is None:
+            delta_time = FRAME_TIME
+
+        # 脱困中：沿脱困方向走，不看流场；最后一个 tick 只走到脱困时间用完为止
+        if self.escape is not None and obstacles is not None:
+            duration = min(delta_time, self.escape_time)
+            step = speed * duration
+            self.slide(self.escape[0] * step, self.escape[1] * step, obstacles)
+            self.escape_time -= duration
+            if self.escape_time <= TIME_EPSILON:
+                self.escape = None
+                self._restart_stuck_window()
+            return
+
+        # 本 tick 的位移分段走：每段不超过 TRACK_SEGMENT_LENGTH，也不越过流场的下一个路点，
+        # 步长很大时也会沿流场拐弯，而不是直线冲过路点撞上障碍物；
+        # 每段追目标在这一段结束时刻的位置，大步长不会因为提前看到目标 tick 末的位置而占便宜
+        total = remaining = speed * delta_time
+        planned = 0.0
+        if target_from is None:
+            target_from = (target_x, target_y)
+        from_x, from_y = target_from
+        for _ in range(int(total / TRACK_SEGMENT_LENGTH) + 1 + MAX_TRACK_WAYPOINTS):
+            # 本段结束时刻目标的位置（按已走的比例在 tick 首末位置之间插值）
+            alpha = min(planned + TRACK_SEGMENT_LENGTH, total) / total if total > 0 else 1.0
+            aim_x = from_x + (target_x - from_x) * alpha
+            aim_y = from_y + (target_y - from_y) * alpha
+            # 计算目标方向（标量运算，不构造向量对象）
+            dir_x = aim_x - self.x
+            dir_y = aim_y - self.y
+            length = math.sqrt(dir_x * dir_x + dir_y * dir_y)
+            if length == 0:
+                break
+            # 将方向归一化，保证它的长度为1
+            dir_x /= length
+            dir_y /= length
+            step = min(remaining, length, TRACK_SEGMENT_LENGTH)
+            # 有流场时沿流场绕开障碍物；与目标同格或无路可走时仍直接冲向目标
+            if flow_field is not None:
+                waypoint = flow_field.waypoint_at(self.x, self.y)
+                if waypoint is not None:
+                    toward_x = waypoint[0] - self.x
+                    toward_y = waypoint[1] - self.y
+                    toward = math.sqrt(toward_x * toward_x + toward_y * toward_y)
+                    if toward > 0:
+                        dir_x = toward_x / toward
+                        dir_y = toward_y / toward
+                        step = min(remaining, toward, TRACK_SEGMENT_LENGTH)
+
+            # 运动 = 方向 * 距离；碰到障碍物时停在接触点并沿表面滑动
+            if obstacles is None:
+                self.move_to(self.x + dir_x * step, self.y + dir_y * step)
+            else:
+                self.slide(dir_x * step, dir_y * step, obstacles)
+            planned += step
+            remaining -= step
+            if remaining <= 0:
+                break
+
+        # 卡住检测：看一个时间窗内的净位移，而不是逐 tick 比较。应走的距离大多被障碍物挡掉
+        # （正对障碍物表面），或在两个格子之间来回抖动，都会被发现；判断结果与步长无关
+        if obstacles is None:
+            return
+        self.stuck_time += delta_time
+        self.stuck_planned += planned
+        if self.stuck_time < CAT_STUCK_TIME - TIME_EPSILON:
+            return
+        moved = math.sqrt((self.x - self.stuck_x) ** 2 + (self.y - self.stuck_y) ** 2)
+        stuck = moved < self.stuck_planned * CAT_STUCK_PROGRESS
+        self._restart_stuck_window()
+        if stuck:
+            self.escape = self.adjust_direction(target_x, target_y, obstacles)
+            self.escape_time = CAT_ESCAPE_TIME
+
+    def _restart_stuck_window(self):
+        self.stuck_time = 0.0
+        self.stuck_planned = 0.0
+        self.stuck_x = self.x
+        self.stuck_y = self.y
+
+
+class Obstacle:
+    def __init__(self, x, y, length, width, color):
+        self.x = x
+        self.y = y
+        self.length = length
+        self.width = width
+        self.color = color
+        self.rect = Rect(x, y, self.length, self.width)
+
+# -------------------------------
+# 工具函数
+# -------------------------------
+class PID:
+    def __init__(self, kp, ki, kd):
+        self.kp = kp
+        self.ki = ki
+        self.kd = kd
+        self.previous_error = 0
+        self.integral = 0
+
+    def control(self, error, delta_time):
+        delta_time = max(delta_time, 0.001)
+        derivative = (error - self.previous_error) / delta_time
+        self.integral += error * delta_time
+        output = self.kp * error + self.ki * self.integral + self.kd * derivative
+        self.previous_error = error
+        return output
+
+def interpolated_position(entity, alpha):
+    """在上一 tick 与当前 tick 的位置之间插值，alpha 取 0~1"""
+    return (entity.prev_x + (entity.x - entity.prev_x) * alpha,
+            entity.prev_y + (entity.y - entity.prev_y) * alpha)
+
+def rat_travel_speed(speed, min_speed, dt):
+    """老鼠在 dt 内的平均速度：速度从 speed 线性衰减到 min_speed 为止，按这段时间精确积分，
+    走出的距离与步长无关（用 tick 末的速度会让大步长每 tick 少走 RAT_SPEED_DECAY * dt² / 2）"""
+    if speed <= min_speed or dt <= 0:
+        return speed
+    decay_time = min((speed - min_speed) / RAT_SPEED_DECAY, dt)
+    distance = (speed - RAT_SPEED_DECAY * decay_time / 2) * decay_time + min_speed * (dt - decay_time)
+    return distance / dt
+
+def read_distance_sensor(a, b):
+    return math.sqrt((a.x - b.x)**2 + (a.y - b.y)**2)
+
+def is_colliding(x, y, obstacles, radius, free_space=None):
+    # 有距离场时查表，只有误差带内才做精确检测
+    if free_space is not None:
+        return not free_space.circle_is_free(x, y, radius)
+    # 应实现圆形与矩形的真实碰撞检测
+    for obs in obstacles.query(x - radius, y - radius, radius * 2, radius * 2):
+        # 计算最近点
+        closest_x = max(obs.rect.x, min(x, obs.rect.x + obs.rect.width))
+        closest_y = max(obs.rect.y, min(y, obs.rect.y + obs.rect.height))
+        distance = math.hypot(x - closest_x, y - closest_y)
+        if distance < radius:
+            return True
+    return False
+
+def generate_safe_position(radius, obstacles, width, height, free_space=None, rng=random):
+    # 优先直接从距离场的空闲格子中采样，一次即可得到安全位置
+    if free_space is not None:
+        pos = free_space.sample_position(radius, rng)
+        if pos is not None:
+            return pos
+    # 没有空闲格子时退回有限次数的拒绝采样，全部失败则返回最后一次采样的位置
+    for _ in range(MAX_SPAWN_ATTEMPTS):
+        x = rng.randint(radius, width - radius)
+        y = rng.randint(radius, height - radius)
+        if not is_colliding(x, y, obstacles, radius, free_space):
+            break
+    return x, y
+
+def find_cheese_spots(obstacles, width, height, size=BASE_CHEESE_SIZE):
+    """列出奶酪网格上所有不与障碍物相交的位置，每套障碍物布局计算一次"""
+    spots = []
+    for i in range(1, (width - 20) // STEP_SIZE):
+        for j in range(1, (height - 20) // STEP_SIZE):
+            x, y = i * STEP_SIZE, j * STEP_SIZE
+            if not obstacles.collides(Rect(x - size // 2, y, size, size)):
+                spots.append((x, y))
+    return spots
+
+def pick_cheese_spot(obstacles, width, height, size=BASE_CHEESE_SIZE, spots=None, rng=random):
+    """返回新奶酪的位置 (x, y)；地图上已没有空位时返回 None"""
+    if spots is not None:
+        if not spots:
+            return None
+        return rng.choice(spots)
+    for _ in range(MAX_SPAWN_ATTEMPTS):
+        x = rng.randint(1, (width - 20) // STEP_SIZE - 1) * STEP_SIZE
+        y = rng.randint(1, (height - 20) // STEP_SIZE - 1) * STEP_SIZE
+        if not obstacles.collides(Rect(x - size // 2, y, size, size)):
+            return x, y
+    return None
+
+def generate_cheese_position(obstacles, width, height, size=BASE_CHEESE_SIZE, spots=None, rng=random):
+    """返回一块新奶酪；地图上已没有空位时返回 None"""
+    spot = pick_cheese_spot(obstacles, width, height, size, spots, rng)
+    return Cheese(spot[0], spot[1], size) if spot is not None else None
+
+def initialize_obstacles(num_obstacles, width, height, size_low=BASE_OBSTACLE_SIZE_LOW, size_high=BASE_OBSTACLE_SIZE_HIGH,
+                         rng=random, gap=OBSTACLE_GAP):
+    """布置互不重叠的障碍物（两两之间至少相隔 gap），地图太挤时实际数量可能少于 num_obstacles"""
+    # 边布置边建立空间索引：重叠检测和之后的碰撞查询都走索引
+    # 左上角对齐到导航格子（偏移 OBSTACLE_SLACK）：障碍物之间的通道不窄于 gap 时，
+    # 通道里就有一列格子中心放得下猫，而且两边都留有余量。余量为 0 时猫要正好站在格子中心才过得去，
+    # 朝格子中心逼近却永远差一点，会被当成卡住
+    obstacles = ObstacleGrid([])
+    for _ in range(num_obstacles):
+        for _ in range(MAX_PLACEMENT_ATTEMPTS):
+            x = rng.randint(0, (width - 80) // NAV_CELL_SIZE) * NAV_CELL_SIZE + OBSTACLE_SLACK
+            y = rng.randint(0, (height - 80) // NAV_CELL_SIZE) * NAV_CELL_SIZE + OBSTACLE_SLACK
+            length = rng.randint(size_low, size_high)
+            obstacle_width = rng.randint(size_low, size_high)
+            if not obstacles.collides(Rect(x - gap, y - gap, length + gap * 2, obstacle_width + gap * 2)):
+                color = (rng.randint(0,255), rng.randint(0,255), rng.randint(0,255))
+                obstacles.add(Obstacle(x, y, length, obstacle_width, color))
+                break
+    return obstacles
+
+def layout_is_connected(obstacles, width, height, cat_grid):
+    """猫能站的格子连成一片，并且老鼠能去的每一片区域里都有猫能站的格子（老鼠躲不进猫到不了的地方）。
+
+    initialize_obstacles 的布置方式保证了这一点，这里再检查一次，万一不满足就重新布置。
+    """
+    cat_labels, cat_regions = cat_grid.label_regions()
+    if cat_regions != 1:
+        return False
+    rat_labels, rat_regions = NavGrid(obstacles, width, height, RAT_SIZE).label_regions()
+    # 猫能站的格子老鼠一定也能站，所以它们都在老鼠的某片区域里
+    return len({rat_labels[i] for i, label in enumerate(cat_labels) if label != -1}) == rat_regions
+
+# ===============================
+# 关卡：种子决定的障碍物布局及只依赖布局的预计算数据
+# ===============================
+class Level:
+    """同一组参数总是生成同一个关卡，创建后不再修改，可以在多局之间共享（见 levels.LevelCache）。
+
+    构造参数就是缓存键，见 World.level_key。
+    """
+    streamed = False  # 障碍物是否按块加载（arena.ArenaLevel），是的话没有整张地图的位图，渲染器按镜头逐帧绘制
+
+    def __init__(self, seed, width, height, num_obstacles, size_low, size_high, cheese_size, navigation=True):
+        self.key = (seed, width, height, num_obstacles, size_low, size_high, cheese_size, navigation)
+        self.seed = seed
+        rng = random.Random(seed ^ LEVEL_SEED_MASK)
+        # 布局与 navigation 无关：不开导航时也要保证猫追得到老鼠（猫直线追击时靠卡住脱困绕过障碍物）
+        for _ in range(MAX_LAYOUT_ATTEMPTS):
+            self.obstacles = initialize_obstacles(num_obstacles, width, height, size_low, size_high, rng)
+            cat_grid = NavGrid(self.obstacles, width, height, CAT_SIZE)
+            if layout_is_connected(self.obstacles, width, height, cat_grid):
+                break
+        self.styles = tuple("rgb({}, {}, {})".format(*obs.color) for obs in self.obstacles)  # 绘制用的颜色字符串
+        # 距离场、出生格子表和奶酪空位表：出生点与奶酪都直接从表中采样
+        self.free_space = FreeSpace(self.obstacles, width, height)
+        self.free_space.spawn_cells(CAT_SIZE)
+        self.free_space.spawn_cells(RAT_SIZE)
+        self.cheese_spots = tuple(find_cheese_spots(self.obstacles, width, height, cheese_size))
+        self.nav_grid = cat_grid if navigation else None
+        self.bitmap = None  # 前端预渲染的障碍物图层（render.GameRenderer.prerender_level 填充）
+
+# ===============================
+# 游戏世界
+# ===============================
+class GameInput:
+    """单次 step 的输入快照（创建后不可修改）：鼠标目标位置与这个 tick 的加速点击次数"""
+    __slots__ = ("target_x", "target_y", "boosts")
+
+    def __init__(self, target_x=0, target_y=0, boosts=0):
+        object.__setattr__(self, "target_x", target_x)
+        object.__setattr__(self, "target_y", target_y)
+        object.__setattr__(self, "boosts", boosts)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("GameInput 是不可变的输入快照")
+
+class Difficulty:
+    """影响难度的可调参数，默认值就是游戏的正式设定（供 sweep.py 等离线调参使用）"""
+    def __init__(self, pid_gains=PID_GAINS, cat_decay_rate=CAT_DECAY_RATE, cat_max_speed=CAT_MAX_SPEED,
+                 cat_min_speed=CAT_MIN_SPEED, start_speed_range=START_SPEED_RANGE,
+                 invincibility_time=INVINCIBILITY_TIME):
+        self.pid_gains = tuple(pid_gains)
+        self.cat_decay_rate = cat_decay_rate
+        self.cat_max_speed = cat_max_speed
+        self.cat_min_speed = cat_min_speed
+        self.start_speed_range = tuple(start_speed_range)
+        self.invincibility_time = invincibility_time
+
+class World:
+    def __init__(self, width=DESIGN_WIDTH, height=DESIGN_HEIGHT, scale_factor=1.0, num_obstacles=OBSTACLE_COUNT,
+                 cat_navigation=True, seed=None, initial_cheeses=3, difficulty=None, levels=None):
+        self.width = width
+        self.height = height
+        self.scale_factor = scale_factor
+        self.num_obstacles = num_obstacles  # 要求布置的数量（关卡缓存键的一部分），实际放下的是 len(self.obstacles)
+        self.cat_navigation = cat_navigation  # False 时猫直线追击（与 batch.BatchSimulation 一致）
+        self.difficulty = difficulty if difficulty is not None else Difficulty()
+        self.cheese_size = int(BASE_CHEESE_SIZE * scale_factor)
+        self.obstacle_size_low = int(BASE_OBSTACLE_SIZE_LOW * scale_factor)
+        self.obstacle_size_high = int(BASE_OBSTACLE_SIZE_HIGH * scale_factor)
+        self.profiler = None  # 可选的 profiler.FrameProfiler，按阶段记录 step 的耗时
+        self.levels = levels  # 可选的 levels.LevelCache，为 None 时每次重置都重新生成关卡
+        self.reset(initial_cheeses, seed)
+
+    def level_key(self, seed):
+        """seed 对应关卡的缓存键（也是 Level 的构造参数）"""
+        return (seed, self.width, self.height, self.num_obstacles, self.obstacle_size_low,
+                self.obstacle_size_high, self.cheese_size, self.cat_navigation)
+
+    def reset(self, initial_cheeses=3, seed=None):
+        """换成 seed 对应的关卡，重新布置猫、老鼠与奶酪，并清零计分。
+
+        障碍物布局只由 seed 决定（见 Level），一局中其余的随机数都来自以 seed 初始化的 self.rng；
+        seed 为 None 时随机选取，记录下 self.seed 和每个 tick 的输入即可完整复现这一局（见 replay.py）。
+        """
+        if seed is None:
+            seed = random.getrandbits(32)
+        self.seed = seed
+        self.rng = rng = random.Random(seed)
+        self.initial_cheeses = initial_cheeses
+        self.clock = 0.0  # 模拟时钟（秒），只随 step 前进
+        self.start_time = 0.0
+        self.last_catch_time = -CATCH_COOLDOWN
+        self.lives_count = START_LIVES
+        self.scores = 0
+        self.game_over = False
+        self.events = []
+        self.level = level = self.make_level(self.level_key(seed))
+        self.obstacles = level.obstacles
+        self.free_space = level.free_space
+        self.cheese_spots = level.cheese_spots
+        self.flow_field = None
+        if level.nav_grid is not None:
+            self.flow_field = FlowField(level.nav_grid)
+        cat_x, cat_y = self.spawn_position(CAT_SIZE)
+        rat_x, rat_y = self.spawn_position(RAT_SIZE)
+        self.cheeses = CheeseField(self.cheese_size)
+        for _ in range(initial_cheeses):
+            self.add_cheese()
+        difficulty = self.difficulty
+        self.cat = Cat(rng.randint(*difficulty.start_speed_range), CAT_SIZE, cat_x, cat_y,
+                       difficulty.cat_max_speed, difficulty.cat_decay_rate, difficulty.cat_min_speed)
+        self.rat = Rat(rng.randint(*difficulty.start_speed_range), RAT_SIZE, rat_x, rat_y)
+        self.pid_controller = PID(*difficulty.pid_gains)
+
+    def make_level(self, key):
+        return self.levels.get(key) if self.levels is not None else Level(*key)
+
+    def spawn_position(self, radius):
+        """半径 radius 的实体的安全出生点"""
+        return generate_safe_position(radius, self.obstacles, self.width, self.height, self.free_space, self.rng)
+
+    def add_cheese(self):
+        spot = pick_cheese_spot(self.obstacles, self.width, self.height, self.cheese_size,
+                                self.cheese_spots, self.rng)
+        if spot is not None:
+            self.cheeses.spawn(*spot)
+
+    def time_left(self):
+        seconds = int(self.clock - self.start_time)
+        return max(GAME_DURATION - seconds, 0)
+
+    @property
+    def total_score(self):
+        return self.lives_count * self.scores if self.lives_count >= 1 else self.scores
+
+    def state_hash(self):
+        """当前模拟状态的 32 位摘要（FNV-1a），回放时用来核对结果是否一致。
+
+        浮点数按 6 位小数格式化后参与计算，CPython 与 Brython 得到的字符串相同。
+        """
+        rat, cat = self.rat, self.cat
+        parts = ["{:.6f}".format(v) for v in (self.clock, rat.x, rat.y, rat.speed, cat.x, cat.y, cat.speed,
+                                              self.pid_controller.integral, self.pid_controller.previous_error)]
+        parts.extend(str(v) for v in (self.scores, self.lives_count, self.game_over, rat.invincible))
+        parts.extend("{},{}".format(cheese.x, cheese.y) for cheese in self.cheeses)
+        h = 0x811c9dc5
+        for byte in "|".join(parts).encode("utf-8"):
+            h = ((h ^ byte) * 0x01000193) & 0xffffffff
+        return h
+
+    def regenerate_rat(self):
+        rat = self.rat
+        # 利用已有的 generate_safe_position 保证新位置安全
+        new_x, new_y = self.spawn_position(RAT_SIZE)
+        rat.move_to(new_x, new_y)
+        rat.prev_x, rat.prev_y = new_x, new_y  # 瞬移不做插值
+        # 设置无敌状态，记录开始时间
+        rat.invincible = True
+        rat.invincible_start = self.clock
+
+    def step(self, dt, inp):
+        """推进 dt 秒的模拟，返回本步产生的事件列表（"eat"、"hit"、"game_over"）"""
+        events = self.events = []
+        if self.game_over:
+            return events
+        rat, cat = self.rat, self.cat
+        rat.prev_x, rat.prev_y = rat.x, rat.y
+        cat.prev_x, cat.prev_y = cat.x, cat.y
+        self.clock += dt
+        if rat.invincible and (self.clock - rat.invincible_start >= self.difficulty.invincibility_time):
+            rat.invincible = False
+
+        # 检查游戏剩余时间
+        if self.time_left() <= 0:
+            self.game_over = True
+            events.append("game_over")
+            return events
+
+        for _ in range(inp.boosts):
+            rat.speed = min(rat.speed + RAT_BOOST, rat.max_speed)
+
+        error = read_distance_sensor(rat, cat)
+        pid_speed = max(self.pid_controller.control(error, dt), 0)
+        rat_speed = rat_travel_speed(rat.speed, rat.min_speed, dt)
+        rat.speed = max(rat.min_speed, rat.speed - RAT_SPEED_DECAY * dt)
+        cat.update_speed(pid_speed)
+        prof = self.profiler
+        if prof is not None:
+            prof.lap("pid")
+        rat.track(inp.target_x, inp.target_y, rat_speed, obstacles=self.obstacles,
+                  bounds=(self.width, self.height), delta_time=dt)
+        if self.flow_field is not None:
+            self.flow_field.update(rat.x, rat.y)
+        cat.track(rat.x, rat.y, cat.speed, obstacles=self.obstacles, delta_time=dt,
+                  flow_field=self.flow_field, target_from=(rat.prev_x, rat.prev_y))
+        if prof is not None:
+            prof.lap("move")
+
+        # 猫碰到的奶酪直接消失；老鼠碰到的每一块都算吃到（同一 tick 可以吃到多块）
+        # 检测的是本 tick 扫过的整段路径，大步长时不会跳过路上的奶酪
+        # 先结算老鼠吃到的，猫就碰不到这些奶酪了（colliding 的结果列表会被下一次调用复用）
+        cheeses = self.cheeses
+        eaten = 0
+        for cheese in cheeses.colliding(rat.rect, rat.x - rat.prev_x, rat.y - rat.prev_y):
+            cheeses.remove(cheese)
+            eaten += 1
+            self.scores += 1
+            events.append("eat")
+        for cheese in cheeses.colliding(cat.rect, cat.x - cat.prev_x, cat.y - cat.prev_y):
+            cheeses.remove(cheese)
+        for _ in range(eaten):
+            for _ in range(self.rng.choice(CHEESE_SPAWN_COUNTS)):
+                self.add_cheese()
+        if prof is not None:
+            prof.lap("cheese")
+
+        # 抓捕同样按整段位移判断：本 tick 内两者的相对轨迹进入抓捕范围就算抓到
+        if not rat.invincible and segment_hits_box(cat.prev_x - rat.prev_x, cat.prev_y - rat.prev_y,
+                                                   cat.x - rat.x, cat.y - rat.y, CATCH_DISTANCE):
+            if self.clock - self.last_catch_time >= CATCH_COOLDOWN:
+                self.last_catch_time = self.clock
+                events.append("hit")
+                self.lives_count -= 1
+                if self.lives_count == 0:
+                    self.game_over = True
+                    events.append("game_over")
+                else:
+                    # 重新生成鼠标，并进入无敌状态
+                    self.regenerate_rat()
+        if prof is not None:
+            prof.lap("catch")
+        return events
@@ -0,0 +1,103 @@
+# ===============================
+# 障碍物距离场（空闲空间查询与出生点采样）
+# 每套障碍物布局计算一次：把地图划分为小格，记录每个格子中心到最近障碍物的距离
+# （超过 MAX_CLEARANCE 的按 MAX_CLEARANCE 记）。距离是 1-Lipschitz 的，
+# 格子内任意一点的距离与中心相差不超过半条对角线，因此大多数“半径 r 的圆是否空闲”
+# 的判断查一次表即可，只有落在误差带内的才回退到精确检测。
+# ===============================
+import math, random
+
+CLEARANCE_CELL_SIZE = 8
+MAX_CLEARANCE = 64  # 需覆盖最大的实体半径（猫为 30）再加误差带
+
+class FreeSpace:
+    def __init__(self, obstacles, width, height, cell_size=CLEARANCE_CELL_SIZE, max_clearance=MAX_CLEARANCE):
+        self.obstacles = obstacles
+        self.width = width
+        self.height = height
+        self.cell_size = cell_size
+        self.max_clearance = max_clearance
+        self.cols = int(math.ceil(width / cell_size))
+        self.rows = int(math.ceil(height / cell_size))
+        self.half_diagonal = cell_size * math.sqrt(2) / 2
+        self.field = self._build_field()
+        self._spawn_cells = {}
+
+    def _build_field(self):
+        """只遍历每个障碍物膨胀 max_clearance 后覆盖的格子，代价与障碍物面积成正比"""
+        cs, cols, rows, reach = self.cell_size, self.cols, self.rows, self.max_clearance
+        field = [float(reach)] * (cols * rows)
+        for obs in self.obstacles:
+            rect = obs.rect
+            left, top = rect.x, rect.y
+            right, bottom = rect.x + rect.width, rect.y + rect.height
+            col0 = max(int((left - reach) // cs), 0)
+            col1 = min(int((right + reach) // cs), cols - 1)
+            row0 = max(int((top - reach) // cs), 0)
+            row1 = min(int((bottom + reach) // cs), rows - 1)
+            for row in range(row0, row1 + 1):
+                cy = (row + 0.5) * cs
+                dy = max(top - cy, 0, cy - bottom)
+                base = row * cols
+                for col in range(col0, col1 + 1):
+                    cx = (col + 0.5) * cs
+                    dx = max(left - cx, 0, cx - right)
+                    d = math.sqrt(dx * dx + dy * dy)
+                    if d < field[base + col]:
+                        field[base + col] = d
+        return field
+
+    def clearance_at(self, x, y):
+        """(x, y) 所在格子中心到最近障碍物的距离（上限 max_clearance）"""
+        col = min(max(int(x // self.cell_size), 0), self.cols - 1)
+        row = min(max(int(y // self.cell_size), 0), self.rows - 1)
+        return self.field[row * self.cols + col]
+
+    def circle_is_free(self, x, y, radius):
+        """半径为 radius 的圆放在 (x, y) 是否不碰任何障碍物，与 is_colliding 的判定一致"""
+        if 0 <= x < self.width and 0 <= y < self.height:
+            d = self.clearance_at(x, y)
+            if d - self.half_diagonal >= radius:
+                return True
+            if d + self.half_diagonal < radius and d < self.max_clearance:
+                return False
+        # 误差带内或在地图外：精确检测附近的障碍物
+        for obs in self.obstacles.query(x - radius, y - radius, radius * 2, radius * 2):
+            rect = obs.rect
+            closest_x = max(rect.x, min(x, rect.x + rect.width))
+            closest_y = max(rect.y, min(y, rect.y + rect.height))
+            if math.hypot(x - closest_x, y - closest_y) < radius:
+                return False
+        return True
+
+    def spawn_cells(self, radius):
+        """所有整格都能安全放下半径 radius 的圆的格子，按半径缓存。
+
+        每项为 (x0, x1, y0, y1)：格子内且在 [radius, 边长 - radius] 范围内的整数坐标区间。
+        """
+        cells = self._spawn_cells.get(radius)
+        if cells is not None:
+            return cells
+        cs, cols = self.cell_size, self.cols
+        need = radius + self.half_diagonal
+        cells = []
+        for index, d in enumerate(self.field):
+            if d < need:
+                continue
+            col, row = index % cols, index // cols
+            x0 = max(int(math.ceil(col * cs)), radius)
+            x1 = min(int(math.ceil((col + 1) * cs)) - 1, self.width - radius)
+            y0 = max(int(math.ceil(row * cs)), radius)
+            y1 = min(int(math.ceil((row + 1) * cs)) - 1, self.height - radius)
+            if x0 <= x1 and y0 <= y1:
+                cells.append((x0, x1, y0, y1))
+        self._spawn_cells[radius] = cells
+        return cells
+
+    def sample_position(self, radius, rng=random):
+        """直接从空闲格子中取一个安全出生点，没有空闲格子时返回 None"""
+        cells = self.spawn_cells(radius)
+        if not cells:
+            return None
+        x0, x1, y0, y1 = cells[rng.randrange(len(cells))]
+        return rng.randint(x0, x1), rng.randint(y0, y1)
@@ -0,0 +1,85 @@
+import math
+
+# ===============================
+# 几何类
+# 热路径上不分配新对象：Rect / Vector2 使用 __slots__，实体通过 Rect.move_to 就地移动，
+# 碰撞检测用的试探矩形预先分配好反复使用。Vector2 的运算符返回新对象，只供非热路径代码使用。
+# ===============================
+class Rect:
+    __slots__ = ("x", "y", "width", "height")
+
+    def __init__(self, x, y, width, height):
+        self.x      = x
+        self.y      = y
+        self.width  = width
+        self.height = height
+
+    def copy(self):
+        return Rect(self.x, self.y, self.width, self.height)
+
+    def copy_from(self, other):
+        self.x = other.x
+        self.y = other.y
+        self.width = other.width
+        self.height = other.height
+        return self
+
+    @property
+    def center(self):
+        return (self.x + self.width / 2, self.y + self.height / 2)
+
+    @center.setter
+    def center(self, pos):
+        cx, cy = pos
+        self.x = cx - self.width / 2
+        self.y = cy - self.height / 2
+
+    def move_to(self, cx, cy):
+        """就地把中心移动到 (cx, cy)，与 center 赋值等价但不构造元组"""
+        self.x = cx - self.width / 2
+        self.y = cy - self.height / 2
+        return self
+
+    def colliderect(self, other):
+        return not (
+            self.x + self.width <= other.x or
+            self.x >= other.x + other.width or
+            self.y + self.height <= other.y or
+            self.y >= other.y + other.height
+        )
+
+class Vector2:
+    __slots__ = ("x", "y")
+
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+    def __add__(self, other):
+        return Vector2(self.x + other.x, self.y + other.y)
+
+    def __sub__(self, other):
+        return Vector2(self.x - other.x, self.y - other.y)
+
+    def __mul__(self, scalar):
+        return Vector2(self.x * scalar, self.y * scalar)
+
+    def __truediv__(self, scalar):
+        return Vector2(self.x / scalar, self.y / scalar)
+
+    def length(self):
+        return math.sqrt(self.x ** 2 + self.y ** 2)
+
+    def normalize(self):
+        l = self.length()
+        return self if l == 0 else self / l
+
+    def copy(self):
+        return Vector2(self.x, self.y)
+
+# Cat.adjust_direction 的候选方向表（八个方向的单位向量），模块加载时构造一次
+_DIAGONAL = math.sqrt(0.5)
+ADJUST_DIRECTIONS = (
+    (1, 0), (-1, 0), (0, 1), (0, -1),
+    (_DIAGONAL, _DIAGONAL), (-_DIAGONAL, _DIAGONAL), (_DIAGONAL, -_DIAGONAL), (-_DIAGONAL, -_DIAGONAL)
+)
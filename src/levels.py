@@ -0,0 +1,50 @@
+# ===============================
+# 关卡缓存
+# 生成一个关卡（障碍物布局 + 距离场、出生格子表、奶酪空位表、导航网格）要花不少时间，
+# 而关卡只由 World.level_key 决定、创建后不再修改。LevelCache 按 LRU 保留最近用过的
+# 若干关卡，同一个种子再开一局时直接取用；prewarm 可以在空闲时提前生成下一局的关卡，
+# 点击“重新开始”时就不用再等。
+# ===============================
+from engine import Level
+
+LEVEL_CACHE_SIZE = 8
+
+
+class LevelCache:
+    def __init__(self, capacity=LEVEL_CACHE_SIZE):
+        self.capacity = capacity
+        self.levels = {}  # 缓存键 -> Level，按最近使用的先后排列（dict 保持插入顺序）
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.levels)
+
+    def __contains__(self, key):
+        return key in self.levels
+
+    def _store(self, key, level):
+        self.levels[key] = level
+        while len(self.levels) > self.capacity:
+            del self.levels[next(iter(self.levels))]
+            self.evictions += 1
+
+    def get(self, key):
+        """返回 key 对应的关卡，没有缓存时当场生成"""
+        level = self.levels.pop(key, None)
+        if level is None:
+            self.misses += 1
+            level = Level(*key)
+        else:
+            self.hits += 1
+        self._store(key, level)
+        return level
+
+    def prewarm(self, key):
+        """提前生成 key 对应的关卡（已缓存时只更新使用顺序），不计入命中统计"""
+        level = self.levels.pop(key, None)
+        if level is None:
+            level = Level(*key)
+        self._store(key, level)
+        return level
@@ -1,50 +1,60 @@
-import math, random, time
+import math, random
 from browser import document, window
+from engine import World, DESIGN_WIDTH, DESIGN_HEIGHT, START_LIVES
+from render import GameRenderer, pause_menu_hit, rgb_color, WHITE, BLACK, DARK_GREEN, BRIGHT_GREEN, GREY
+from timestep import FixedStepScheduler
+from profiler import FrameProfiler, TARGET_FRAME_MS
+from replay import InputRecorder
+from dispatch import InputDispatcher, GLOBAL_SCOPE
+from scenes import Scene, FrameScheduler
+from audio import AudioEngine
+from resolution import ResolutionManager, ScaleGovernor
+from pointer import CanvasTransform, PointerSampler
+from levels import LevelCache
+from telemetry import Telemetry
+from arena import ArenaWorld
 
 # ===============================
 # 全局变量与常量
 # ===============================
 canvas = document["game_canvas"]
 ctx = canvas.getContext("2d")
+# 所有坐标都在设计分辨率 DESIGN_WIDTH x DESIGN_HEIGHT 中，画布尺寸由 resolution 负责
+resolution = ResolutionManager(window, canvas)
+governor = ScaleGovernor(TARGET_FRAME_MS)  # 游戏中帧耗时超出预算时降低渲染分辨率
+renderer = GameRenderer(canvas, resolution)
+transform = CanvasTransform(window, canvas, resolution)  # 页面坐标 -> 设计坐标，缓存画布位置
+pointer = PointerSampler(transform)  # 指针采样，main_loop 每个 tick 取一份输入快照
+dispatcher = InputDispatcher(document, canvas, transform=transform)  # document 上唯一的事件监听入口
+frame_scheduler = FrameScheduler(window, dispatcher)  # 页面上唯一调用 requestAnimationFrame 的地方
 
-# Canvas 尺寸（初始时同步 HTML 中的 canvas 大小）
-HORIZONTAL_LENGTH = canvas.width
-VERTICAL_WIDTH = canvas.height
 is_paused = False
 game_running = True# 游戏是否正在运行
-# 设计分辨率
-DESIGN_WIDTH = 800
-DESIGN_HEIGHT = 600
-scale_factor = min(canvas.width / DESIGN_WIDTH, canvas.height / DESIGN_HEIGHT)
 # 常量
 BUTTON_WIDTH = 200
 BUTTON_HEIGHT = 50
-STEP_SIZE = 20
-BASE_RAT_SIZE = 10  # 设计分辨率下的基础大小
-RAT_SIZE = 10 #int(BASE_RAT_SIZE * scale_factor)
-BASE_CAT_SIZE = 30  # 设计分辨率下的基础大小
-CAT_SIZE = 30#int(BASE_CAT_SIZE * scale_factor)
-BASE_CHEESE_SIZE = 20  # 设计分辨率下的基础大小
-CHEESE_SIZE = int(BASE_CHEESE_SIZE * scale_factor)
-BASE_OBSTACLE_SIZE_LOW = 40  # 设计分辨率下的基础大小
-BASE_OBSTACLE_SIZE_HIGH = 100  # 设计分辨率下的基础大小
-OBSTACLE_SIZE_LOW = int(BASE_OBSTACLE_SIZE_LOW * scale_factor)
-OBSTACLE_SIZE_HIGH = int(BASE_OBSTACLE_SIZE_HIGH * scale_factor)
-INVINCIBILITY_TIME = 3  # 无敌时间（秒）
-# 颜色（RGB 格式）
-WHITE       = (255, 255, 255)
-BLACK       = (0, 0, 0)
-DARK_GREEN  = (0, 100, 0)
-BRIGHT_GREEN= (0, 155, 0)
-GREY        = (128, 128, 128)
-YELLOW      = (255, 255, 0)
-# 资源路径
+# 资源路径（音频见 audio.AUDIO_MANIFEST）
 ICON_PATH         = "resources/logo.png"
-BG_MUSIC_PATH     = "resources/bg.mp3"
-EAT_SOUND_PATH    = "resources/eat.mp3"
-HIT_SOUND_PATH    = "resources/hit.mp3"
-LOSER_SOUND_PATH  = "resources/loser.mp3"
-WINNER_SOUND_PATH = "resources/winer.mp3"
+LEVEL_PREWARM_DELAY_MS = 200  # 开始/结束界面显示后多久开始生成（预先生成）关卡
+
+# 性能分析：地址带 ?profile=1 时默认开启，F8 开关叠加层，F9 导出 JSON
+PROFILE_QUERY_KEY = "profile"
+PROFILE_TOGGLE_KEY = "F8"
+PROFILE_EXPORT_KEY = "F9"
+PROFILE_EXPORT_NAME = "cat_rat_profile.json"
+# 录像：每局自动录制输入，F7 下载当前这一局；?seed=N 固定随机种子
+RECORDING_EXPORT_KEY = "F7"
+RECORDING_EXPORT_NAME = "cat_rat_{}.crr"
+SEED_QUERY_KEY = "seed"
+# 遥测：?telemetry=收集地址（如 http://127.0.0.1:8765/events，见 tools/collector.py）
+TELEMETRY_QUERY_KEY = "telemetry"
+# 压力测试：?stress=N 开局就放 N 块奶酪（配合 ?profile=1 查看帧耗时）
+STRESS_QUERY_KEY = "stress"
+# 大地图：?arena=N 使用面积为屏幕 N 倍的分块地图（见 arena.py），镜头跟随老鼠
+ARENA_QUERY_KEY = "arena"
+# 冷启动：开始界面第一次绘制完成时打一个 performance mark，用于比较 CDN 与离线打包（tools/build.py）的首帧时间；
+# 耗时随遥测上报（first_frame 事件），开启性能分析（?profile=1）时也打印到控制台
+FIRST_FRAME_MARK = "first-frame"
 
 # 字体设置
 FONT_LARGE  = "50px SimHei"
@@ -54,229 +64,6 @@ FONT_SMALL  = "20px SimHei"
 # ===============================
 # 类定义
 # ===============================
-class Rect:
-    def __init__(self, x, y, width, height):
-        self.x      = x
-        self.y      = y
-        self.width  = width
-        self.height = height
-
-    def copy(self):
-        return Rect(self.x, self.y, self.width, self.height)
-
-    @property
-    def center(self):
-        return (self.x + self.width / 2, self.y + self.height / 2)
-
-    @center.setter
-    def center(self, pos):
-        cx, cy = pos
-        self.x = cx - self.width / 2
-        self.y = cy - self.height / 2
-
-    def colliderect(self, other):
-        return not (
-            self.x + self.width <= other.x or 
-            self.x >= other.x + other.width or
-            self.y + self.height <= other.y or 
-            self.y >= other.y + other.height
-        )
-
-class Vector2:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-
-    def __add__(self, other):
-        return Vector2(self.x + other.x, self.y + other.y)
-
-    def __sub__(self, other):
-        return Vector2(self.x - other.x, self.y - other.y)
-
-    def __mul__(self, scalar):
-        return Vector2(self.x * scalar, self.y * scalar)
-
-    def __truediv__(self, scalar):
-        return Vector2(self.x / scalar, self.y / scalar)
-
-    def length(self):
-        return math.sqrt(self.x ** 2 + self.y ** 2)
-
-    def normalize(self):
-        l = self.length()
-        return self if l == 0 else self / l
-
-    def copy(self):
-        return Vector2(self.x, self.y)
-
-def rgb_color(color):
-    """将RGB元组转换为 CSS 格式字符串"""
-    return "rgb({}, {}, {})".format(color[0], color[1], color[2])
-
-# -------------------------------
-# 实体类
-# -------------------------------
-class Rat:
-    def __init__(self, speed, r, x, y, max_speed=400, min_speed=20):
-        self.speed = speed
-        self.max_speed = max_speed
-        self.min_speed = min_speed
-        self.r = r
-        self.x = x
-        self.y = y
-        self.rect = Rect(x, y, r * 2, r * 2)
-        self.color = (0, 255, 0)
-        self.invincible = False
-        self.invincible_start = 0
-
-    def draw(self, ctx):
-        ctx.beginPath()
-        ctx.arc(self.x, self.y, self.r, 0, 2 * math.pi)
-        if self.invincible:
-            ctx.strokeStyle = rgb_color(YELLOW)
-            ctx.lineWidth = 10
-            ctx.stroke()
-        ctx.fillStyle = rgb_color(self.color)
-        ctx.fill()
-
-    def track(self, target_x, target_y, speed=None, obstacles=[]):
-        if speed is None:
-            speed = self.speed
-        target_x = max(0, min(HORIZONTAL_LENGTH, target_x))
-        target_y = max(0, min(VERTICAL_WIDTH, target_y))
-        m_ab = max(math.sqrt((target_x - self.x) ** 2 + (target_y - self.y) ** 2), 0.001)
-        if m_ab < 10:
-            speed *= m_ab / 10
-        if m_ab < 1:
-            return
-        sin_angle = (target_x - self.x) / m_ab
-        cos_angle = (target_y - self.y) / m_ab
-        new_x = self.x + speed / 60 * sin_angle
-        new_y = self.y + speed / 60 * cos_angle
-        new_rect = self.rect.copy()
-        new_rect.center = (new_x, new_y)
-        collision = any(new_rect.colliderect(obs.rect) for obs in obstacles)
-        if not collision:
-            self.x, self.y = new_x, new_y
-            self.rect = new_rect
-
-class Cat:
-    def __init__(self, speed, r, x, y, max_speed=500, decay_rate=0.6, min_speed=10):
-        self.speed = speed
-        self.max_speed = max_speed
-        self.min_speed = min_speed
-        self.decay_rate = decay_rate
-        self.r = r
-        self.x = x
-        self.y = y
-        self.rect = Rect(x, y, r * 2, r * 2)
-        self.color = (255, 0, 0)
-
-    def draw(self, ctx):
-        ctx.beginPath()
-        ctx.arc(self.x, self.y, self.r, 0, 2 * math.pi)
-        ctx.fillStyle = rgb_color(self.color)
-        ctx.fill()
-
-    def update_speed(self, pid_speed):
-        self.speed = min(self.max_speed, max(self.min_speed, pid_speed))
-        self.speed *= self.decay_rate
-
-    def adjust_direction(self, current_direction, obstacle_rect, force_random=False):
-        directions = [
-            Vector2(1, 0), Vector2(-1, 0), Vector2(0, 1), Vector2(0, -1),
-            Vector2(1, 1), Vector2(-1, 1), Vector2(1, -1), Vector2(-1, -1),
-            Vector2(2, 0), Vector2(0, 2), Vector2(-2, 0), Vector2(0, -2)
-        ]
-        if force_random:
-            random.shuffle(directions)
-        speed_boost = 1.3
-        for d in directions:
-            test_rect = self.rect.copy()
-            offset_x = d.x * self.speed * speed_boost / 60
-            offset_y = d.y * self.speed * speed_boost / 60
-            test_rect.center = (self.x + offset_x, self.y + offset_y)
-            if not test_rect.colliderect(obstacle_rect):
-                return d
-        return None
-
-    def track(self, target_x, target_y, speed=None, obstacles=[], delta_time=None):
-        # 如果没有指定 speed，就使用对象的默认速度
-        if speed is None:
-            speed = self.speed
-
-        # 如果没有传入 delta_time，则采用默认值（例如 1/60 秒）
-        if delta_time is None:
-            delta_time = 1 / 60
-
-        # 计算目标方向向量
-        direction = Vector2(target_x - self.x, target_y - self.y)
-        if direction.length() == 0:
-            return
-        # 将方向向量归一化，保证它的长度为1
-        direction = direction.normalize()
-
-        # 计算本次更新中应移动的向量：运动 = 方向 * 速度 * delta_time
-        movement = direction * speed * delta_time
-
-        # 计算新位置
-        new_x = self.x + movement.x
-        new_y = self.y + movement.y
-
-        # 复制当前矩形，并设置新的中心为新位置
-        new_rect = self.rect.copy()
-        new_rect.center = (new_x, new_y)
-
-        # 检查是否与障碍物碰撞。如果碰撞，则调整方向
-        for obs in obstacles:
-            if new_rect.colliderect(obs.rect):
-                # 调整方向以避免碰撞
-                adjusted_direction = self.adjust_direction(direction, obs.rect)
-                if adjusted_direction is not None:
-                    # 重新计算移动向量，采用调整后的方向
-                    movement = adjusted_direction * speed * delta_time
-                    new_x = self.x + movement.x
-                    new_y = self.y + movement.y
-                    new_rect.center = (new_x, new_y)
-                    # 如果调整后的方向可以避开障碍物，则退出检测
-                    if not new_rect.colliderect(obs.rect):
-                        break
-
-        # 更新对象的位置和对应的碰撞矩形
-        self.x = new_x
-        self.y = new_y
-        self.rect = new_rect
-
-
-class Cheese:
-    def __init__(self, x, y, size=CHEESE_SIZE):
-        self.x = x
-        self.y = y
-        self.size = size
-        self.rect = Rect(x - size // 2, y, size, size)
-
-    def draw(self, ctx):
-        ctx.beginPath()
-        ctx.moveTo(self.x, self.y)
-        ctx.lineTo(self.x + self.size / 2, self.y + self.size)
-        ctx.lineTo(self.x - self.size / 2, self.y + self.size)
-        ctx.closePath()
-        ctx.fillStyle = rgb_color(YELLOW)
-        ctx.fill()
-
-class Obstacle:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.length = random.randint(OBSTACLE_SIZE_LOW, OBSTACLE_SIZE_HIGH)
-        self.width = random.randint(OBSTACLE_SIZE_LOW, OBSTACLE_SIZE_HIGH)
-        self.color = (random.randint(0,255), random.randint(0,255), random.randint(0,255))
-        self.rect = Rect(x, y, self.length, self.width)
-
-    def draw(self, ctx):
-        ctx.fillStyle = rgb_color(self.color)
-        ctx.fillRect(self.x, self.y, self.length, self.width)
-
 class Button:
     def __init__(self, color, x, y, width, height, text=''):
         self.color = color
@@ -304,126 +91,180 @@ class Button:
         x, y = pos
         return self.x < x < self.x + self.width and self.y < y < self.y + self.height
 
-# -------------------------------
-# 工具函数
-# -------------------------------
-class PID:
-    def __init__(self, kp, ki, kd):
-        self.kp = kp
-        self.ki = ki
-        self.kd = kd
-        self.previous_error = 0
-        self.integral = 0
-        self.last_time = time.time()
-
-    def control(self, error):
-        current_time = time.time()
-        delta_time = max(current_time - self.last_time, 0.001)
-        derivative = (error - self.previous_error) / delta_time
-        self.integral += error * delta_time
-        output = self.kp * error + self.ki * self.integral + self.kd * derivative
-        self.previous_error = error
-        self.last_time = current_time
-        return output
-
-def read_distance_sensor(a, b):
-    return math.sqrt((a.x - b.x)**2 + (a.y - b.y)**2)
-
-def is_colliding(x, y, obstacles, radius):
-    # 应实现圆形与矩形的真实碰撞检测
-    for obs in obstacles:
-        # 计算最近点
-        closest_x = max(obs.rect.x, min(x, obs.rect.x + obs.rect.width))
-        closest_y = max(obs.rect.y, min(y, obs.rect.y + obs.rect.height))
-        distance = math.hypot(x - closest_x, y - closest_y)
-        if distance < radius:
-            return True
-    return False
-
-def generate_safe_position(radius, obstacles):
-    while True:
-        x = random.randint(radius, HORIZONTAL_LENGTH - radius)
-        y = random.randint(radius, VERTICAL_WIDTH - radius)
-        if not is_colliding(x, y, obstacles, radius):
-            return x, y
-
-def regenerate_rat():
-    global rat, obstacles
-    # 利用已有的 generate_safe_position 保证新位置安全
-    new_x, new_y = generate_safe_position(RAT_SIZE, obstacles)
-    rat.x = new_x
-    rat.y = new_y
-    rat.rect.center = (new_x, new_y)
-    # 设置无敌状态，记录开始时间
-    rat.invincible = True
-    rat.invincible_start = time.time()
-
-def generate_cheese_position(obstacles):
-    while True:
-        x = random.randint(1, (HORIZONTAL_LENGTH - 20) // STEP_SIZE - 1) * STEP_SIZE
-        y = random.randint(1, (VERTICAL_WIDTH - 20) // STEP_SIZE - 1) * STEP_SIZE
-        cheese = Cheese(x, y)
-        if not any(cheese.rect.colliderect(obs.rect) for obs in obstacles):
-            return cheese
-
-def initialize_obstacles(num_obstacles):
-    return [Obstacle(random.randint(0, HORIZONTAL_LENGTH - 80),
-                     random.randint(0, VERTICAL_WIDTH - 80))
-            for _ in range(num_obstacles)]
-
-def update_timer(start_time):
-    seconds = int(time.time() - start_time)
-    time_left = 60 - seconds
-    return max(time_left, 0)
+# ===============================
+# 音频：页面加载时一次性预加载并解码全部音频
+# ===============================
+audio = AudioEngine(window)
+audio.preload()
 
 # ===============================
-# 音频资源加载（需在 HTML 中预定义 <audio> 标签）
+# 全局变量（前端状态）
 # ===============================
-BG_MUSIC     = document["bg_music"]
-EAT_SOUND    = document["eat_sound"]
-HIT_SOUND    = document["hit_sound"]
-LOSER_SOUND  = document["loser_sound"]
-WINNER_SOUND = document["winner_sound"]
+pause_hover = None  # 暂停菜单中鼠标悬停的按钮（"resume" / "menu" / None）
+
+world = None
+scheduler = FixedStepScheduler()
+profiler = None  # 开启时为 FrameProfiler
+recorder = None  # 当前这一局的 InputRecorder
+levels = LevelCache()  # 最近用过的关卡，重新开局时直接取用
+next_seed = None  # 已预先生成好关卡的下一局种子（见 prewarm_next_level）
+first_frame_ms = None  # 页面开始加载到首帧绘制完成的毫秒数
+
+# 界面名（同时是 InputDispatcher 的作用域名）
+START_SCENE = "start"
+HELP_SCENE = "help"
+GAME_SCENE = "game"
+EXIT_SCENE = "exit"
 
 # ===============================
-# 全局变量（游戏状态）
+# 指针事件绑定（全局采样指针位置，模拟只读取 pointer.snapshots 给出的快照）
 # ===============================
-mouse_x = 0
-mouse_y = 0
-
-rat = None
-cat = None
-cheeses = []
-obstacles = []
-pid_controller = None
-last_catch_time = 0
-catch_cooldown = 2000  # 毫秒
-start_ticks = window.Date.now() / 1000  # 转换为秒
-scores = 0
-lives_count = 3
+dispatcher.on(GLOBAL_SCOPE, "pointermove", pointer.on_move)
+
+def unlock_audio(event, pos):
+    audio.unlock()
+
+dispatcher.on(GLOBAL_SCOPE, "click", unlock_audio)
+
+# ===============================
+# 地址参数、文件下载
+# ===============================
+def query_param(name):
+    """返回地址参数 name 的值，没有该参数时返回 None"""
+    for item in window.location.search.lstrip("?").split("&"):
+        key, _, value = item.partition("=")
+        if key == name:
+            return value
+    return None
+
+def query_int(name):
+    value = query_param(name)
+    return int(value) if value and value.isdigit() else None
+
+def query_seed():
+    return query_int(SEED_QUERY_KEY)
+
+def take_next_seed():
+    """下一局的种子：优先使用已预热的种子，其次是地址中的 ?seed=N，都没有时返回 None（随机）"""
+    global next_seed
+    seed = next_seed if next_seed is not None else query_seed()
+    next_seed = None
+    return seed
+
+def prewarm_next_level():
+    """提前选好下一局的种子，生成它的关卡并画好障碍物位图，点击“重新开始”时不再卡顿"""
+    global next_seed
+    if world is None or world.levels is None:  # 大地图按块生成，没有可预热的关卡
+        return
+    seed = query_seed()
+    next_seed = seed if seed is not None else random.getrandbits(32)
+    renderer.prerender_level(levels.prewarm(world.level_key(next_seed)))
+
+def telemetry_endpoint():
+    value = query_param(TELEMETRY_QUERY_KEY)
+    return window.decodeURIComponent(value) if value else None
+
+def initial_cheeses(default):
+    stress = query_int(STRESS_QUERY_KEY)
+    return stress if stress is not None else default
+
+def create_world():
+    """按地址参数创建这一局的世界：?arena=N 时为大地图，否则为一屏大小的标准地图"""
+    area = query_int(ARENA_QUERY_KEY)
+    if area is not None and area > 1:
+        scale = math.sqrt(area)
+        return ArenaWorld(round(DESIGN_WIDTH * scale), round(DESIGN_HEIGHT * scale), seed=take_next_seed(),
+                          initial_cheeses=initial_cheeses(3))
+    return World(DESIGN_WIDTH, DESIGN_HEIGHT, seed=take_next_seed(),
+                 initial_cheeses=initial_cheeses(3), levels=levels)
+
+def download(filename, content, mime):
+    blob = window.Blob.new([content], {"type": mime})
+    url = window.URL.createObjectURL(blob)
+    link = document.createElement("a")
+    link.href = url
+    link.download = filename
+    link.click()
+    window.URL.revokeObjectURL(url)
 
 # ===============================
-# 鼠标事件绑定（全局更新鼠标位置）
+# 性能分析开关与导出、录像下载
 # ===============================
-def update_mouse(event):
-    rect = canvas.getBoundingClientRect()
-    global mouse_x, mouse_y
-    mouse_x = event.clientX - rect.left
-    mouse_y = event.clientY - rect.top
+def profile_requested():
+    """地址参数中是否带 profile（如 ?profile=1）"""
+    value = query_param(PROFILE_QUERY_KEY)
+    return value is not None and value not in ("0", "false")
+
+def set_profiling(enabled):
+    global profiler
+    profiler = FrameProfiler(window.performance.now) if enabled else None
+    if world is not None:
+        world.profiler = profiler
+    if profiler is not None:
+        profiler.pause()  # 菜单停留的时间不算掉帧
+
+def export_profile():
+    """把性能数据作为 JSON 文件下载"""
+    if profiler is None:
+        return
+    download(PROFILE_EXPORT_NAME, profiler.export(), "application/json")
+
+def start_recording():
+    """world 刚重置时调用，开始录制新的一局（大地图的录像无法用 replay.py 重建，不录制）"""
+    global recorder
+    recorder = None if isinstance(world, ArenaWorld) else InputRecorder(world, scheduler.tick_rate)
+
+def export_recording():
+    """下载当前这一局的录像，可用 python src/replay.py 回放核对"""
+    if recorder is None or world is None:
+        return
+    data = recorder.to_bytes(world)
+    download(RECORDING_EXPORT_NAME.format(recorder.seed), window.Uint8Array.new(list(data)),
+             "application/octet-stream")
+
+def mark_first_frame():
+    global first_frame_ms
+    if first_frame_ms is not None:
+        return
+    window.performance.mark(FIRST_FRAME_MARK)
+    first_frame_ms = window.performance.now()
+    if profiler is not None:
+        print("首帧用时 {:.0f} ms".format(first_frame_ms))
+    telemetry.track("first_frame", ms=round(first_frame_ms))
+
+def on_debug_key(event, pos):
+    if event.key == PROFILE_TOGGLE_KEY:
+        set_profiling(profiler is None)
+    elif event.key == PROFILE_EXPORT_KEY:
+        export_profile()
+    elif event.key == RECORDING_EXPORT_KEY:
+        export_recording()
+
+dispatcher.on(GLOBAL_SCOPE, "keydown", on_debug_key)
 
-document.bind("mousemove", update_mouse)
+# ===============================
+# 界面：每帧先同步画布尺寸，再在设计坐标系下绘制
+# ===============================
+def sync_canvas():
+    """窗口尺寸或渲染缩放变化后调整画布，并把坐标系设为设计分辨率"""
+    if resolution.update():
+        renderer.invalidate()
+    resolution.apply(ctx)
+
+def screen(name, render):
+    """创建界面 Scene：render(timestamp) 之前先调用 sync_canvas"""
+    def frame(timestamp):
+        sync_canvas()
+        render(timestamp)
+    return Scene(name, frame)
 
 # ===============================
-# 各界面事件处理通用函数（使用 lambda 传递额外参数）
+# 各界面事件处理通用函数
 # ===============================
-def handle_mouse_move(event, button, base_color, hover_color):
-    rect = canvas.getBoundingClientRect()
-    pos = (event.clientX - rect.left, event.clientY - rect.top)
+def handle_mouse_move(pos, button, base_color, hover_color):
     button.color = hover_color if button.is_over(pos) else base_color
 
-def handle_mouse_click(event, button, callback):
-    rect = canvas.getBoundingClientRect()
-    pos = (event.clientX - rect.left, event.clientY - rect.top)
+def handle_mouse_click(pos, button, callback):
     if button.is_over(pos):
         callback()
 
@@ -434,352 +275,317 @@ def show_instructions():
     button_color = DARK_GREEN
     hover_color = BRIGHT_GREEN
     # 居中计算按钮位置（相对于 canvas 尺寸）
-    return_button = Button(button_color, (canvas.width - BUTTON_WIDTH) / 2,
-                           (canvas.height - BUTTON_HEIGHT) / 2 + 50,
+    return_button = Button(button_color, (DESIGN_WIDTH - BUTTON_WIDTH) / 2,
+                           (DESIGN_HEIGHT - BUTTON_HEIGHT) / 2 + 50,
                            BUTTON_WIDTH, BUTTON_HEIGHT, 'Return')
-    instruction_running = {"running": True}
-
-    help_handlers = []# 事件处理函数列表
-    def help_mouse_move(event):
-        handle_mouse_move(event, return_button, button_color, hover_color)
-    def help_mouse_click(event):
-        handle_mouse_click(event, return_button, lambda: close_instructions(instruction_running))
-    
-    help_handlers.extend([help_mouse_move, help_mouse_click])
-    document.bind("mousemove", help_mouse_move)
-    document.bind("click", help_mouse_click)
-    
+
+    def help_mouse_move(event, pos):
+        handle_mouse_move(pos, return_button, button_color, hover_color)
+    def help_mouse_click(event, pos):
+        handle_mouse_click(pos, return_button, close_instructions)
+
     def render_instructions(timestamp):
-        if not instruction_running["running"]:
-            return
         ctx.fillStyle = rgb_color(BLACK)
-        ctx.fillRect(0, 0, canvas.width, canvas.height)
+        ctx.fillRect(0, 0, DESIGN_WIDTH, DESIGN_HEIGHT)
         return_button.draw(ctx, "20px Arial", GREY)
         ctx.fillStyle = rgb_color(WHITE)
         ctx.font = FONT_MIDDLE
-        ctx.fillText("游戏规则介绍", (canvas.width - BUTTON_WIDTH) / 2, (canvas.height - BUTTON_HEIGHT) / 2 - 200)
+        ctx.fillText("游戏规则介绍", (DESIGN_WIDTH - BUTTON_WIDTH) / 2, (DESIGN_HEIGHT - BUTTON_HEIGHT) / 2 - 200)
         ctx.font = FONT_SMALL
-        ctx.fillText("红色大球代表猫，会追逐老鼠。", (canvas.width - BUTTON_WIDTH) / 2 - 50, (canvas.height - BUTTON_HEIGHT) / 2 - 150)
-        ctx.fillText("绿色小球代表老鼠，由鼠标控制，点击左键可加速。", (canvas.width - BUTTON_WIDTH) / 2 - 50, (canvas.height - BUTTON_HEIGHT) / 2 - 120)
-        ctx.fillText("黄色三角代表奶酪，老鼠吃到可以加分。", (canvas.width - BUTTON_WIDTH) / 2 - 50, (canvas.height - BUTTON_HEIGHT) / 2 - 90)
-        ctx.fillText("老鼠有三条命，请在一分钟内尽量存活。", (canvas.width - BUTTON_WIDTH) / 2 - 50, (canvas.height - BUTTON_HEIGHT) / 2 - 60)
-        window.requestAnimationFrame(render_instructions)
-    window.requestAnimationFrame(render_instructions)
-
-def close_instructions(running):
-    running["running"] = False
-    document.unbind("mousemove", help_mouse_move)
-    document.unbind("click", help_mouse_click)
+        ctx.fillText("红色大球代表猫，会追逐老鼠。", (DESIGN_WIDTH - BUTTON_WIDTH) / 2 - 50, (DESIGN_HEIGHT - BUTTON_HEIGHT) / 2 - 150)
+        ctx.fillText("绿色小球代表老鼠，由鼠标控制，点击左键可加速。", (DESIGN_WIDTH - BUTTON_WIDTH) / 2 - 50, (DESIGN_HEIGHT - BUTTON_HEIGHT) / 2 - 120)
+        ctx.fillText("黄色三角代表奶酪，老鼠吃到可以加分。", (DESIGN_WIDTH - BUTTON_WIDTH) / 2 - 50, (DESIGN_HEIGHT - BUTTON_HEIGHT) / 2 - 90)
+        ctx.fillText("老鼠有三条命，请在一分钟内尽量存活。", (DESIGN_WIDTH - BUTTON_WIDTH) / 2 - 50, (DESIGN_HEIGHT - BUTTON_HEIGHT) / 2 - 60)
+
+    # 帮助界面压在开始界面之上：开始界面暂停绘制，它的处理函数保留但暂不接收事件
+    frame_scheduler.push(screen(HELP_SCENE, render_instructions))
+    dispatcher.on(HELP_SCENE, "pointermove", help_mouse_move)
+    dispatcher.on(HELP_SCENE, "click", help_mouse_click)
+
+def close_instructions():
+    frame_scheduler.pop()
 
 def show_start_screen(callback):
     button_color = DARK_GREEN
     hover_color = BRIGHT_GREEN
-    start_button = Button(button_color, (canvas.width - BUTTON_WIDTH) / 2,
-                          (canvas.height - BUTTON_HEIGHT) / 2,
+    start_button = Button(button_color, (DESIGN_WIDTH - BUTTON_WIDTH) / 2,
+                          (DESIGN_HEIGHT - BUTTON_HEIGHT) / 2,
                           BUTTON_WIDTH, BUTTON_HEIGHT, 'Start Game')
-    help_button = Button(button_color, (canvas.width - BUTTON_WIDTH) / 2,
-                         (canvas.height - BUTTON_HEIGHT) / 2 + 100,
+    help_button = Button(button_color, (DESIGN_WIDTH - BUTTON_WIDTH) / 2,
+                         (DESIGN_HEIGHT - BUTTON_HEIGHT) / 2 + 100,
                          BUTTON_WIDTH, BUTTON_HEIGHT, 'Help')
-    exit_button = Button(button_color, (canvas.width - BUTTON_WIDTH) / 2,
-                         (canvas.height - BUTTON_HEIGHT) / 2 + 200,
+    exit_button = Button(button_color, (DESIGN_WIDTH - BUTTON_WIDTH) / 2,
+                         (DESIGN_HEIGHT - BUTTON_HEIGHT) / 2 + 200,
                          BUTTON_WIDTH, BUTTON_HEIGHT, 'Exit')
-    WINNER_SOUND.volume = 0.5
-    WINNER_SOUND.play()
-    start_screen_running = {"running": True}
+    audio.play_when_ready("winner")  # 页面刚加载时还不能发声，等第一次点击解锁后再播
 
-    def on_mouse_click(event):
-        rect = canvas.getBoundingClientRect()
-        pos = (event.clientX - rect.left, event.clientY - rect.top)
+    def on_mouse_click(event, pos):
         if start_button.is_over(pos):
-            WINNER_SOUND.pause()
-            BG_MUSIC.volume = 0.2
-            BG_MUSIC.play()
-            start_screen_running["running"] = False
-            document.unbind("click", on_mouse_click)
+            audio.stop("winner")
+            audio.play_music("bg")
             callback(True)
         elif help_button.is_over(pos):
             show_instructions()
         elif exit_button.is_over(pos):
-            start_screen_running["running"] = False
-            document.unbind("click", on_mouse_click)
             callback(False)
 
-    document.bind("click", on_mouse_click)
-
     def render_start_screen(timestamp):
-        if not start_screen_running["running"]:
-            return
         ctx.fillStyle = rgb_color(BLACK)
-        ctx.fillRect(0, 0, canvas.width, canvas.height)
+        ctx.fillRect(0, 0, DESIGN_WIDTH, DESIGN_HEIGHT)
         ctx.fillStyle = rgb_color(WHITE)
         ctx.font = "40px Arial"
-        ctx.fillText("Welcome!", canvas.width/2-100, canvas.height/2-100)
+        ctx.fillText("Welcome!", DESIGN_WIDTH/2-100, DESIGN_HEIGHT/2-100)
         start_button.draw(ctx, "20px Arial", GREY)
         help_button.draw(ctx, "20px Arial", GREY)
         exit_button.draw(ctx, "20px Arial", GREY)
-        window.requestAnimationFrame(render_start_screen)
-    window.requestAnimationFrame(render_start_screen)
+        mark_first_frame()
+
+    frame_scheduler.replace(screen(START_SCENE, render_start_screen))
+    dispatcher.on(START_SCENE, "click", on_mouse_click)
 
 def show_exit_screen(scores, lives_count, callback):
+    resolution.apply(ctx)
     ctx.fillStyle = rgb_color(BLACK)
-    ctx.fillRect(0, 0, canvas.width, canvas.height)
+    ctx.fillRect(0, 0, DESIGN_WIDTH, DESIGN_HEIGHT)
     button_color = DARK_GREEN
     hover_color = BRIGHT_GREEN
-    restart_button = Button(button_color,  (canvas.width - BUTTON_WIDTH) / 2, canvas.height/2+120, BUTTON_WIDTH, BUTTON_HEIGHT, 'Restart Game')
-    exit_button = Button(button_color, (canvas.width - BUTTON_WIDTH) / 2,canvas.height/2+200, BUTTON_WIDTH, BUTTON_HEIGHT, 'Exit')
+    restart_button = Button(button_color,  (DESIGN_WIDTH - BUTTON_WIDTH) / 2, DESIGN_HEIGHT/2+120, BUTTON_WIDTH, BUTTON_HEIGHT, 'Restart Game')
+    exit_button = Button(button_color, (DESIGN_WIDTH - BUTTON_WIDTH) / 2,DESIGN_HEIGHT/2+200, BUTTON_WIDTH, BUTTON_HEIGHT, 'Exit')
     total_score = lives_count * scores if lives_count >= 1 else scores
     ctx.fillStyle = rgb_color(WHITE)
     ctx.font = "40px Arial"
-    ctx.fillText("Game Over!",  (canvas.width - BUTTON_WIDTH) / 2, canvas.height/2-100)
+    ctx.fillText("Game Over!",  (DESIGN_WIDTH - BUTTON_WIDTH) / 2, DESIGN_HEIGHT/2-100)
     ctx.font = "20px Arial"
-    ctx.fillText("奶酪数量： {}".format(scores),  (canvas.width - BUTTON_WIDTH) / 2,canvas.height/2-50)
-    ctx.fillText("剩余生命： {}".format(lives_count),  (canvas.width - BUTTON_WIDTH) / 2, canvas.height/2)
-    ctx.fillText("最终得分：{}".format(total_score), (canvas.width - BUTTON_WIDTH) / 2, canvas.height/2+50)
-    LOSER_SOUND.volume = 0.2
-    LOSER_SOUND.play()
+    ctx.fillText("奶酪数量： {}".format(scores),  (DESIGN_WIDTH - BUTTON_WIDTH) / 2,DESIGN_HEIGHT/2-50)
+    ctx.fillText("剩余生命： {}".format(lives_count),  (DESIGN_WIDTH - BUTTON_WIDTH) / 2, DESIGN_HEIGHT/2)
+    ctx.fillText("最终得分：{}".format(total_score), (DESIGN_WIDTH - BUTTON_WIDTH) / 2, DESIGN_HEIGHT/2+50)
+    audio.stop_music()
+    audio.play("loser")
     state = {"waiting": True, "restart": None}
 
-    def on_mouse_move(event):
-        rect = canvas.getBoundingClientRect()
-        pos = (event.clientX - rect.left, event.clientY - rect.top)
+    def on_mouse_move(event, pos):
         restart_button.color = hover_color if restart_button.is_over(pos) else button_color
         exit_button.color = hover_color if exit_button.is_over(pos) else button_color
 
-    def on_mouse_click(event):
-        rect = canvas.getBoundingClientRect()
-        pos = (event.clientX - rect.left, event.clientY - rect.top)
+    def on_mouse_click(event, pos):
         if restart_button.is_over(pos):
-            LOSER_SOUND.pause()
-            BG_MUSIC.volume = 0.2
-            BG_MUSIC.play()
+            audio.stop("loser")
+            audio.play_music("bg")
             state["restart"] = True
             state["waiting"] = False
-            document.unbind("mousemove", on_mouse_move)
-            document.unbind("click", on_mouse_click)
         elif exit_button.is_over(pos):
             clean_exit()
 
-    document.bind("mousemove", on_mouse_move)
-    document.bind("click", on_mouse_click)
-
     def render_exit(timestamp):
         if not state["waiting"]:
             callback(state["restart"])
             return
         ctx.fillStyle = rgb_color(BLACK)
-        ctx.fillRect(0, 0, canvas.width, canvas.height)
+        ctx.fillRect(0, 0, DESIGN_WIDTH, DESIGN_HEIGHT)
         ctx.fillStyle = rgb_color(WHITE)
         ctx.font = "40px Arial"
-        ctx.fillText("Game Over!", canvas.width/2-100, canvas.height/2-100)
+        ctx.fillText("Game Over!", DESIGN_WIDTH/2-100, DESIGN_HEIGHT/2-100)
         ctx.font = "20px Arial"
-        ctx.fillText("奶酪数量： {}".format(scores), canvas.width/2,canvas.height/2-50)
-        ctx.fillText("剩余生命： {}".format(lives_count), canvas.width/2, canvas.height/2)
-        ctx.fillText("最终得分：{}".format(total_score),canvas.width/2, canvas.height/2+50)
+        ctx.fillText("奶酪数量： {}".format(scores), DESIGN_WIDTH/2,DESIGN_HEIGHT/2-50)
+        ctx.fillText("剩余生命： {}".format(lives_count), DESIGN_WIDTH/2, DESIGN_HEIGHT/2)
+        ctx.fillText("最终得分：{}".format(total_score),DESIGN_WIDTH/2, DESIGN_HEIGHT/2+50)
         restart_button.draw(ctx, "20px Arial", GREY)
         exit_button.draw(ctx, "20px Arial", GREY)
-        window.requestAnimationFrame(render_exit)
-    window.requestAnimationFrame(render_exit)
+
+    frame_scheduler.replace(screen(EXIT_SCENE, render_exit))
+    # 结束界面是静止画面，等它画出来之后再生成下一局的关卡（已经离开结束界面就不做了）
+    def prewarm():
+        if state["waiting"]:
+            prewarm_next_level()
+    window.setTimeout(prewarm, LEVEL_PREWARM_DELAY_MS)
+    dispatcher.on(EXIT_SCENE, "pointermove", on_mouse_move)
+    dispatcher.on(EXIT_SCENE, "click", on_mouse_click)
 
 # ===============================
 # 游戏运行事件及主循环
 # ===============================
-def on_game_click(event):
-    global rat, is_paused, game_running
+def enter_game_scene():
+    """切换到游戏界面，由帧调度器每帧调用 main_loop"""
+    frame_scheduler.replace(screen(GAME_SCENE, main_loop))
+    governor.reset()  # 菜单界面的帧不算
+    pointer.clear()  # 菜单界面的指针采样不带进游戏
+    telemetry.track("game_start", seed=world.seed, obstacles=len(world.obstacles),
+                    cheeses=len(world.cheeses))
+    dispatcher.on(GAME_SCENE, "click", on_game_click)
+    dispatcher.on(GAME_SCENE, "pointermove", on_game_mouse_move)
+
+def set_paused(paused):
+    """暂停时模拟完全停止；继续时丢弃暂停期间的时间，模拟时钟、PID 和各计时器都从暂停处接着走"""
+    global is_paused, pause_hover
+    if paused == is_paused:
+        return
+    is_paused = paused
+    pause_hover = None
+    if paused:
+        telemetry.flush_frames()
+    telemetry.track("pause" if paused else "resume", clock=round(world.clock, 2))
+    if not paused:
+        scheduler.reset()
+        governor.reset()
+        pointer.clear()
+        if profiler is not None:
+            profiler.pause()
+
+def on_game_mouse_move(event, pos):
+    global pause_hover
+    if is_paused:
+        pause_hover = pause_menu_hit(DESIGN_WIDTH, DESIGN_HEIGHT, pos)
+
+def on_game_click(event, pos):
+    global game_running
     if not game_running:
-        document.unbind("click", on_game_click)
         return
-    rect = canvas.getBoundingClientRect()# 获取画布相对于视口的位置
-    click_x = event.clientX - rect.left# 获取鼠标点击的x坐标
-    click_y = event.clientY - rect.top
+    click_x, click_y = pos
 
     # 暂停按钮区域检测
-    pause_button_x = canvas.width - 100
+    pause_button_x = DESIGN_WIDTH - 100
     pause_button_y = 10
     pause_button_width = 80
     pause_button_height = 30
     if (pause_button_x <= click_x <= pause_button_x + pause_button_width and
         pause_button_y <= click_y <= pause_button_y + pause_button_height):
-        is_paused = not is_paused# 切换暂停状态
+        set_paused(not is_paused)# 切换暂停状态
     else:
         if not is_paused:
-            if rat is not None:# 如果老鼠对象存在
-                rat.speed = min(rat.speed + 50, rat.max_speed)# 增加老鼠速度
+            if world is not None:# 如果游戏世界存在
+                pointer.press(event)# 对应时刻的模拟步进中增加老鼠速度
         else:# 如果游戏暂停
-            # 继续按钮区域
-            resume_button_x = canvas.width/2 - 100
-            resume_button_y = canvas.height/2 - 60
-            resume_button_width = 200
-            resume_button_height = 50
-            if (resume_button_x <= click_x <= resume_button_x + resume_button_width and
-                resume_button_y <= click_y <= resume_button_y + resume_button_height):
-                is_paused = False
-            
-            # 返回主菜单按钮区域
-            menu_button_x = canvas.width/2 - 100
-            menu_button_y = canvas.height/2 + 10
-            menu_button_width = 200
-            menu_button_height = 50
-            if (menu_button_x <= click_x <= menu_button_x + menu_button_width and
-                menu_button_y <= click_y <= menu_button_y + menu_button_height):# 如果点击了返回主菜单按钮
-                is_paused = False
+            button = pause_menu_hit(DESIGN_WIDTH, DESIGN_HEIGHT, pos)
+            if button == "resume":# 继续按钮
+                set_paused(False)
+            elif button == "menu":# 如果点击了返回主菜单按钮
+                set_paused(False)
                 game_running = False
-                document.unbind("click", on_game_click)  # 新增解绑
-                BG_MUSIC.pause()
+                audio.stop_music()
+                track_game_end("game_abort")
                 main()# 重新开始游戏
+
+# 会发声的模拟事件 -> 音效名
+EVENT_SOUNDS = {"eat": "eat", "hit": "hit"}
+
+def play_events(events):
+    """把模拟产生的事件转换为音效请求（只入队，帧末统一发声）"""
+    for event in events:
+        sound = EVENT_SOUNDS.get(event)
+        if sound is not None:
+            audio.request(sound)
+
+def report_events(events):
+    """把模拟事件记入遥测（只写缓冲区）"""
+    for event in events:
+        if event == "eat":
+            telemetry.track("cheese", scores=world.scores, clock=round(world.clock, 2))
+        elif event == "hit":
+            telemetry.track("catch", lives=world.lives_count, clock=round(world.clock, 2))
+
+def track_game_end(kind="game_end"):
+    telemetry.flush_frames()
+    telemetry.track(kind, seed=world.seed, scores=world.scores, lives=world.lives_count,
+                    catches=START_LIVES - world.lives_count, total_score=world.total_score,
+                    duration=round(world.clock, 2))
+
+def exit_callback(restart):
+    if restart:
+        world.reset(initial_cheeses=initial_cheeses(1), seed=take_next_seed())
+        scheduler.reset()
+        start_recording()
+        enter_game_scene()
+
 def main_loop(timestamp):
-    global last_frame_time,rat, cat, cheeses, obstacles, pid_controller, last_catch_time, start_ticks, lives_count, scores, is_paused, game_running
-    
     if not game_running:
         return
-    
-    current_time = time.time()
-    if rat and rat.invincible and (current_time - rat.invincible_start >= INVINCIBILITY_TIME):
-        rat.invincible = False
-        
-    if not is_paused:
-        # 检查游戏剩余时间，如果用完就显示退出界面
-        if update_timer(start_ticks) <= 0:
-            # 定义退出回调（例如重启或退出）
-            def exit_callback(restart):
-                global start_ticks, lives_count, scores, obstacles, cat, rat, pid_controller, cheeses
-                if restart:
-                    start_ticks = time.time()
-                    lives_count = 3
-                    scores = 0
-                    obstacles = initialize_obstacles(20)
-                    cat_x, cat_y = generate_safe_position(CAT_SIZE, obstacles)
-                    rat_x, rat_y = generate_safe_position(RAT_SIZE, obstacles)
-                    pid_controller = PID(0.9, 0.1, 0.01)
-                    cat = Cat(random.randint(60, 300), CAT_SIZE, cat_x, cat_y)
-                    rat = Rat(random.randint(60, 300), RAT_SIZE, rat_x, rat_y)
-                    cheeses.clear()
-                    cheeses.append(generate_cheese_position(obstacles))
-                    window.requestAnimationFrame(main_loop)
-            show_exit_screen(scores, lives_count, exit_callback)
-            return
-
-        # 正常的游戏更新逻辑开始
-    ctx.fillStyle = rgb_color(BLACK)
-    ctx.fillRect(0, 0, canvas.width, canvas.height)
-    target_x, target_y = mouse_x, mouse_y
-    error = read_distance_sensor(rat, cat)
-    pid_speed = max(pid_controller.control(error), 0)
-    rat.speed = max(rat.min_speed, rat.speed - 1)
-    cat.update_speed(pid_speed)
-    rat.track(target_x, target_y, obstacles=obstacles)
-    for obs in obstacles:
-        obs.draw(ctx)
-    rat.draw(ctx)
-    cat.track(rat.x, rat.y, cat.speed, obstacles=obstacles)
-    cat.draw(ctx)
-    for cheese in cheeses:
-        cheese.draw(ctx)
-    for cheese in list(cheeses):
-        if cat.rect.colliderect(cheese.rect):
-            cheeses.remove(cheese)
-        if rat.rect.colliderect(cheese.rect):
-            scores += 1
-            EAT_SOUND.volume = 0.2
-            EAT_SOUND.play()
-            cheeses.remove(cheese)
-            for _ in range(random.choice([1, 2, 3])):
-                cheeses.append(generate_cheese_position(obstacles))
-            break
-    current_time = time.time()  # 获取当前时间（秒）
-    if not rat.invincible and abs(cat.x - rat.x) < 10 and abs(cat.y - rat.y) < 10:
-        if current_time - last_catch_time >= catch_cooldown / 1000:
-            last_catch_time = current_time
-            HIT_SOUND.volume = 0.2
-            HIT_SOUND.play()
-            lives_count -= 1
-            if lives_count == 0:
-                def exit_callback(restart):
-                    global start_ticks, lives_count, scores, obstacles, cat, rat, pid_controller, cheeses
-                    if restart:
-                        start_ticks = time.time()
-                        lives_count = 3
-                        scores = 0
-                        obstacles = initialize_obstacles(20)
-                        cat_x, cat_y = generate_safe_position(CAT_SIZE, obstacles)
-                        rat_x, rat_y = generate_safe_position(RAT_SIZE, obstacles)
-                        pid_controller = PID(0.9, 0.1, 0.01)
-                        cat = Cat(random.randint(60, 300), CAT_SIZE, cat_x, cat_y)
-                        rat = Rat(random.randint(60, 300), RAT_SIZE, rat_x, rat_y)
-                        cheeses.clear()
-                        cheeses.append(generate_cheese_position(obstacles))
-                        window.requestAnimationFrame(main_loop)
-                show_exit_screen(scores, lives_count, exit_callback)
-                return
-            else:
-                # 重新生成鼠标，并进入无敌状态
-                regenerate_rat()
-    ctx.fillStyle = rgb_color(WHITE)
-    ctx.font = "20px Arial"
-    ctx.fillText("Time: {}".format(update_timer(start_ticks)),10, 30)
-    ctx.fillText("生命: {}".format(lives_count), 100, 30)
-    ctx.fillText("奶酪: {}".format(scores), 200, 30)
-     # 绘制暂停按钮
-    pause_button_text = "继续" if is_paused else "暂停"
-    ctx.fillStyle = rgb_color(DARK_GREEN)
-    ctx.fillRect(canvas.width - 100, 10, 80, 30)
-    ctx.fillStyle = rgb_color(WHITE)
-    ctx.font = "20px Arial"
-    ctx.fillText(pause_button_text, canvas.width - 90, 30)
-
-    # 绘制暂停菜单
+    # 暂停：不推进模拟，只在悬停状态变化时从快照重画暂停菜单
     if is_paused:
-        ctx.fillStyle = "rgba(0, 0, 0, 0.7)"
-        ctx.fillRect(0, 0, canvas.width, canvas.height)
-        
-        # 继续按钮
-        ctx.fillStyle = rgb_color(DARK_GREEN)
-        ctx.fillRect(canvas.width/2 - 100, canvas.height/2 - 60, 200, 50)
-        ctx.fillStyle = rgb_color(WHITE)
-        ctx.fillText("继续", canvas.width/2 - 30, canvas.height/2 - 25)
-        
-        # 返回主菜单按钮
-        ctx.fillStyle = rgb_color(DARK_GREEN)
-        ctx.fillRect(canvas.width/2 - 100, canvas.height/2 + 10, 200, 50)
-        ctx.fillStyle = rgb_color(WHITE)
-        ctx.fillText("返回主菜单", canvas.width/2 - 60, canvas.height/2 + 35)
-    window.requestAnimationFrame(main_loop)
+        renderer.draw_frame(world, scheduler.alpha, True, pause_hover)
+        return
+
+    frame_start = window.performance.now()
+    prof = profiler
+    if prof is not None:
+        prof.begin_frame(timestamp)
+    # 只用 rAF 的时间戳驱动固定步长模拟，与显示器刷新率无关
+    ticks = scheduler.advance(timestamp)
+    # 每个 tick 拿到自己时刻的指针位置和点击（不可变快照），不再共享一份可变的鼠标状态
+    camera = renderer.camera  # 指针坐标是画面坐标，加上上一帧的镜头位置才是地图坐标
+    for inp in pointer.snapshots(ticks, timestamp, scheduler.dt, scheduler.alpha, (camera.x, camera.y)):
+        if recorder is not None:
+            recorder.record(inp)
+        events = world.step(scheduler.dt, inp)
+        play_events(events)
+        report_events(events)
+        if prof is not None:
+            prof.skip()
+        if world.game_over:
+            audio.flush()
+            track_game_end()
+            if prof is not None:
+                prof.end_frame()
+                prof.pause()
+            show_exit_screen(world.scores, world.lives_count, exit_callback)
+            return
+    # 本帧所有 tick 的音效请求在模拟结束后一次性发声
+    audio.flush()
+    if prof is not None:
+        prof.lap("audio")
+    renderer.draw_frame(world, scheduler.alpha, False)
+    if prof is not None:
+        prof.lap("draw")
+        prof.counters["handlers"] = dispatcher.active_handlers
+        prof.counters["loops"] = frame_scheduler.active_loops
+        prof.counters["scale"] = round(resolution.render_scale, 2)
+        prof.end_frame()
+        renderer.draw_profiler(prof)
+    # 帧耗时超出预算时降低渲染分辨率，余量充足时再慢慢恢复（下一帧 sync_canvas 生效）
+    frame_ms = window.performance.now() - frame_start
+    telemetry.record_frame(frame_ms)
+    if governor.record(frame_ms):
+        resolution.set_render_scale(governor.scale)
 
 
 def clean_exit():
-    BG_MUSIC.pause()
-    BG_MUSIC.currentTime = 0
+    audio.stop_music()
     window.location.reload()
 
 def main():
-    global game_running, is_paused, rat, cat, cheeses, obstacles, pid_controller, lives_count, scores, start_ticks
-    game_running = False  # 停止当前游戏循环
-    # 完全重置所有游戏状态
+    global game_running, is_paused, world, pause_hover
+    # 完全重置所有游戏状态；旧的游戏循环在切换到开始界面时由帧调度器终止
     game_running = True
     is_paused = False
-    lives_count = 3
-    scores = 0
-    start_ticks = time.time()
-    # 清除旧的游戏对象
-    rat = None
-    cat = None
-    cheeses = []
-    obstacles = initialize_obstacles(20)
-    
-    cat_x, cat_y = generate_safe_position(CAT_SIZE, obstacles)
-    rat_x, rat_y = generate_safe_position(RAT_SIZE, obstacles)
-    cheeses = [generate_cheese_position(obstacles) for _ in range(3)]
-    cat = Cat(random.randint(60, 300), CAT_SIZE, cat_x, cat_y)
-    rat = Rat(random.randint(60, 300), RAT_SIZE, rat_x, rat_y)
-    pid_controller = PID(0.9, 0.1, 0.01)
-    last_catch_time = 0
-    start_ticks = time.time()
+    pause_hover = None
+    pointer.clear()
+    scheduler.reset()
+    governor.reset()
+    world = None
+    if profiler is not None:
+        profiler.pause()  # 菜单停留的时间不算掉帧
 
     def start_callback(started):
         if started:
-            document.bind("click", on_game_click)
-            window.requestAnimationFrame(main_loop)
+            prepare_world()
+            enter_game_scene()
         else:
             clean_exit()
     show_start_screen(start_callback)
+    # 生成关卡要几十毫秒：先画出开始界面，之后再生成；在此之前就点了开始时当场生成
+    window.setTimeout(prepare_world, LEVEL_PREWARM_DELAY_MS)
 
+def prepare_world():
+    """还没有这一局的 world 时创建它并开始录制（重复调用无副作用）"""
+    global world
+    if world is not None:
+        return
+    world = create_world()
+    world.profiler = profiler
+    start_recording()
+
+set_profiling(profile_requested())
+telemetry = Telemetry(window, telemetry_endpoint())
+telemetry.track("session", width=window.innerWidth, height=window.innerHeight,
+                dpr=window.devicePixelRatio)
+telemetry.start()
 main()
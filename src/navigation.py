@@ -0,0 +1,204 @@
+# ===============================
+# 导航网格与流场（猫的寻路）
+# 障碍物布局固定后，把地图划分成格子，标记猫（按其碰撞矩形膨胀）无法站立的格子。
+# 流场是从老鼠所在格子出发的 BFS 距离场，每个格子指向一个更近的邻格。
+# 老鼠换格子时不立刻算整张图：BFS 按层展开，只展开到猫查询的格子为止（猫离老鼠越近越省），
+# 每 tick 最多展开 FLOW_CELLS_PER_TICK 个格子；新的搜索追上猫之前，猫沿上一次的流场走。
+# 已经展开的格子查表是 O(1)。
+# ===============================
+import math
+
+NAV_CELL_SIZE = 20
+
+# 8 个邻居方向 (dx, dy)，前 4 个为正交方向
+NEIGHBOURS = (
+    (1, 0), (-1, 0), (0, 1), (0, -1),
+    (1, 1), (-1, 1), (1, -1), (-1, -1),
+)
+NO_DIRECTION = -1
+FLOW_CELLS_PER_TICK = 1000  # 每 tick 最多展开的格子数（标准地图一共 1200 格）
+
+class NavGrid:
+    def __init__(self, obstacles, width, height, clearance, cell_size=NAV_CELL_SIZE):
+        """clearance 为实体碰撞矩形的半边长，格子中心放下该实体会撞到障碍物时标记为阻塞"""
+        self.cell_size = cell_size
+        self.cols = int(math.ceil(width / cell_size))
+        self.rows = int(math.ceil(height / cell_size))
+        size = clearance * 2
+        self.blocked = [False] * (self.cols * self.rows)
+        for row in range(self.rows):
+            cy = (row + 0.5) * cell_size
+            for col in range(self.cols):
+                cx = (col + 0.5) * cell_size
+                for obs in obstacles.query(cx - clearance, cy - clearance, size, size):
+                    rect = obs.rect
+                    if (cx + clearance > rect.x and cx - clearance < rect.x + rect.width and
+                            cy + clearance > rect.y and cy - clearance < rect.y + rect.height):
+                        self.blocked[row * self.cols + col] = True
+                        break
+        self.neighbours = self._build_neighbours()
+        self.adjacent = [[other for other, _ in links] for links in self.neighbours]  # 只有下标，BFS 用
+
+    def _build_neighbours(self):
+        """预先算出每个空闲格子可走的邻居（斜向移动不允许切过阻塞的角）"""
+        cols, rows, blocked = self.cols, self.rows, self.blocked
+        neighbours = []
+        for index in range(cols * rows):
+            col, row = index % cols, index // cols
+            links = []
+            for direction, (dx, dy) in enumerate(NEIGHBOURS):
+                ncol, nrow = col + dx, row + dy
+                if not (0 <= ncol < cols and 0 <= nrow < rows):
+                    continue
+                if blocked[nrow * cols + ncol]:
+                    continue
+                if dx and dy and (blocked[row * cols + ncol] or blocked[nrow * cols + col]):
+                    continue
+                links.append((nrow * cols + ncol, direction))
+            neighbours.append(links)
+        return neighbours
+
+    def label_regions(self):
+        """按连通性给空闲格子编号，返回 (每个格子的区域号（阻塞格为 -1）, 区域数)"""
+        labels = [-1] * len(self.blocked)
+        count = 0
+        for start, blocked in enumerate(self.blocked):
+            if blocked or labels[start] != -1:
+                continue
+            labels[start] = count
+            stack = [start]
+            while stack:
+                for other in self.adjacent[stack.pop()]:
+                    if labels[other] == -1:
+                        labels[other] = count
+                        stack.append(other)
+            count += 1
+        return labels, count
+
+    def cell_index(self, x, y):
+        col = min(max(int(x // self.cell_size), 0), self.cols - 1)
+        row = min(max(int(y // self.cell_size), 0), self.rows - 1)
+        return row * self.cols + col
+
+class FlowSearch:
+    """朝一个目标格子的分层 BFS，可以分几次展开；展开过的格子的方向与一次算完整张图相同"""
+    __slots__ = ("grid", "target", "distance", "frontier")
+
+    def __init__(self, grid, target):
+        self.grid = grid
+        self.target = target
+        self.distance = [None] * (grid.cols * grid.rows)
+        self.distance[target] = 0
+        self.frontier = [target]
+
+    @property
+    def done(self):
+        return not self.frontier
+
+    def settled(self, index):
+        """index 的方向是否已经确定（每次展开完整的一层，已编号的层都是完整的）"""
+        distance = self.distance
+        if distance[index] is not None:
+            return True
+        if self.grid.blocked[index]:
+            for other in self.grid.adjacent[index]:
+                if distance[other] is not None:
+                    return True
+        return False
+
+    def expand_to(self, index, budget):
+        """逐层展开直到 index 的方向确定、展开完或用完 budget 个格子，返回展开的格子数"""
+        distance = self.distance
+        adjacent = self.grid.adjacent
+        frontier = self.frontier
+        used = 0
+        # BFS：邻接表是“可以走到的邻居”，对称关系保证反向扩展正确
+        while frontier and used < budget and not self.settled(index):
+            step = distance[frontier[0]] + 1  # 同一层的距离都相同
+            next_frontier = []
+            append = next_frontier.append
+            for cell in frontier:
+                for other in adjacent[cell]:
+                    if distance[other] is None:
+                        distance[other] = step
+                        append(other)
+            used += len(frontier)
+            frontier = next_frontier
+        self.frontier = frontier
+        return used
+
+    def direction(self, index):
+        """index 指向更近邻格的方向（NEIGHBOURS 的下标），没有时为 NO_DIRECTION"""
+        distance = self.distance
+        best = distance[index]
+        best_direction = NO_DIRECTION
+        if self.grid.blocked[index]:
+            # 阻塞格（猫贴着障碍物时）：指向距离最近的相邻空闲格
+            best = None
+        for other, direction in self.grid.neighbours[index]:
+            d = distance[other]
+            if d is not None and (best is None or d < best):
+                best = d
+                best_direction = direction
+        return best_direction
+
+
+class FlowField:
+    def __init__(self, grid, budget=FLOW_CELLS_PER_TICK):
+        self.grid = grid
+        self.budget = budget
+        self.target = None  # 最新的目标格子
+        self.field = None  # 已经展开到猫所在格子的搜索，路点从这里取
+        self.search = None  # 朝更新的目标、还没追上猫的搜索
+        self.remaining = budget  # 本 tick 还能展开的格子数
+        self.rebuilds = 0
+
+    def update(self, target_x, target_y):
+        """每 tick 调用一次：补足本 tick 的展开额度并记下目标所在格子，返回是否开始了新的搜索。
+
+        正在进行的搜索追上猫之前不会被新目标打断，否则老鼠一直在动时搜索永远追不上远处的猫。
+        """
+        self.remaining = self.budget
+        target = self.grid.cell_index(target_x, target_y)
+        if target == self.target:
+            return False
+        self.target = target
+        if self.search is not None:
+            return False
+        self.search = FlowSearch(self.grid, target)
+        self.rebuilds += 1
+        return True
+
+    def _expand(self, search, index):
+        self.remaining -= search.expand_to(index, self.remaining)
+
+    def waypoint_at(self, x, y):
+        """返回 (x, y) 所在格子沿流场的下一个格子中心，没有可用方向时返回 None。
+
+        朝格子中心而不是固定方向移动，能让偏离中心的实体自动回到通道中间。
+        """
+        grid = self.grid
+        index = grid.cell_index(x, y)
+        search = self.search
+        if search is not None:
+            self._expand(search, index)
+            if search.settled(index) or search.done:
+                # 新搜索追上了：换成它，目标在此期间又变了就接着搜下一个
+                self.field = search
+                self.search = None
+                if self.target != search.target:
+                    self.search = FlowSearch(grid, self.target)
+                    self.rebuilds += 1
+        field = self.field
+        if field is None:
+            return None
+        if self.search is None and not field.settled(index):
+            self._expand(field, index)  # 目标没变，接着往猫这边展开
+        if index == field.target or not field.settled(index):
+            return None  # 与目标同格时直接冲向目标（目标格可能是猫站不下的阻塞格）
+        direction = field.direction(index)
+        if direction == NO_DIRECTION:
+            return None
+        dx, dy = NEIGHBOURS[direction]
+        size = grid.cell_size
+        return ((index % grid.cols + dx + 0.5) * size, (index // grid.cols + dy + 0.5) * size)
@@ -0,0 +1,129 @@
+# ===============================
+# 指针输入：缓存的坐标变换 + 按 tick 采样
+# 页面坐标到设计坐标的变换只在窗口尺寸/滚动/画布布局变化后重新读取一次
+# getBoundingClientRect，平时的指针事件不会触发布局计算；画布被 CSS 缩放时也按实际显示尺寸换算。
+# PointerSampler 收集 pointermove 事件（包括浏览器合并掉的中间采样 getCoalescedEvents）
+# 和加速点击，main_loop 每帧按各 tick 对应的时刻切分，给每个 tick 一个不可变的 GameInput。
+# 事件回调只往缓冲区里追加，不直接修改模拟要用的状态。
+# ===============================
+from engine import GameInput
+
+MAX_PENDING_SAMPLES = 256  # 长时间没有消费（暂停、切到菜单）时最多保留的采样数
+CLOCK_SKEW_MS = 1000  # 事件时间戳比帧时间戳还晚这么多时，认为两者不是同一个时钟，不再按时间切分
+
+
+class CanvasTransform:
+    """页面坐标 -> 设计坐标；resolution 为 None 时设计坐标就是画布上的 CSS 像素"""
+
+    def __init__(self, window, canvas, resolution=None):
+        self.canvas = canvas
+        self.resolution = resolution
+        self.rect = None  # (left, top, x 缩放, y 缩放)
+        self.layout_version = None
+        self.reads = 0  # 调用 getBoundingClientRect 的次数（调试用）
+        window.bind("resize", self.invalidate)
+        window.bind("scroll", self.invalidate)
+
+    def invalidate(self, event=None):
+        self.rect = None
+
+    def _measure(self):
+        rect = self.canvas.getBoundingClientRect()
+        self.reads += 1
+        resolution = self.resolution
+        if resolution is not None and rect.width and rect.height:
+            sx = resolution.design_width / rect.width
+            sy = resolution.design_height / rect.height
+        else:
+            sx = sy = 1
+        self.rect = (rect.left, rect.top, sx, sy)
+        if resolution is not None:
+            self.layout_version = resolution.layout_version
+
+    def to_design(self, client_x, client_y):
+        if self.rect is None or (self.resolution is not None
+                                 and self.resolution.layout_version != self.layout_version):
+            self._measure()
+        left, top, sx, sy = self.rect
+        return (client_x - left) * sx, (client_y - top) * sy
+
+
+class PointerSampler:
+    def __init__(self, transform):
+        self.transform = transform
+        self.x = 0.0  # 已交给模拟的最新位置
+        self.y = 0.0
+        self.samples = []  # 尚未分配给 tick 的 (时间戳, x, y)，时间戳按到达顺序递增
+        self.presses = []  # 尚未分配给 tick 的加速点击时间戳
+        self.coalesced = 0  # 累计收到的合并采样数（调试用）
+
+    @property
+    def position(self):
+        """最新的指针位置（包括还没分配给 tick 的采样），界面悬停检测用"""
+        if self.samples:
+            _, x, y = self.samples[-1]
+            return x, y
+        return self.x, self.y
+
+    def on_move(self, event, pos):
+        """pointermove 处理函数（注册在全局作用域）"""
+        samples = self.samples
+        try:
+            events = event.getCoalescedEvents()
+        except AttributeError:
+            events = None
+        if events:
+            to_design = self.transform.to_design
+            for e in events:
+                x, y = to_design(e.clientX, e.clientY)
+                samples.append((e.timeStamp, x, y))
+            self.coalesced += len(events)
+        else:
+            samples.append((event.timeStamp, pos[0], pos[1]))
+        if len(samples) > MAX_PENDING_SAMPLES:
+            del samples[:len(samples) - MAX_PENDING_SAMPLES]
+
+    def press(self, event):
+        """记录一次加速点击"""
+        self.presses.append(event.timeStamp)
+
+    def clear(self):
+        """丢弃所有未消费的采样和点击（暂停、重新开局时调用），保留当前位置"""
+        self.x, self.y = self.position
+        self.samples = []
+        self.presses = []
+
+    def snapshots(self, ticks, timestamp, dt, alpha, origin=(0, 0)):
+        """把本帧的采样分配给 ticks 个 tick，返回每个 tick 的 GameInput 列表。
+
+        timestamp 是本帧的 rAF 时间戳（毫秒），最后一个 tick 对应 timestamp 往前 alpha 个 tick 的时刻，
+        之前的 tick 依次再往前 dt。每个 tick 使用该时刻之前的最后一个采样，以及这段时间内的加速点击；
+        晚于最后一个 tick 的采样和点击留给下一帧。坐标取整，录像中记录的就是模拟实际用到的输入。
+        origin 是画面左上角在地图中的坐标（大地图的镜头位置），加到指针坐标上得到地图坐标。
+        """
+        inputs = []
+        samples, presses = self.samples, self.presses
+        s = p = 0
+        x, y = self.x, self.y
+        step_ms = dt * 1000
+        latest = max(samples[-1][0] if samples else 0, presses[-1] if presses else 0)
+        # 事件时间戳与帧时间戳不是同一个时钟时不按时间切分，全部交给最后一个 tick
+        skewed = latest > timestamp + CLOCK_SKEW_MS
+        for i in range(ticks):
+            tick_time = timestamp - (alpha + ticks - 1 - i) * step_ms
+            if skewed and i == ticks - 1:
+                tick_time = float("inf")
+            while s < len(samples) and samples[s][0] <= tick_time:
+                _, x, y = samples[s]
+                s += 1
+            boosts = 0
+            while p < len(presses) and presses[p] <= tick_time:
+                boosts += 1
+                p += 1
+            inputs.append(GameInput(round(x + origin[0]), round(y + origin[1]), boosts))
+        self.x, self.y = x, y
+        if s:
+            del samples[:s]
+        if p:
+            del presses[:p]
+        return inputs
@@ -0,0 +1,147 @@
+# ===============================
+# 帧性能分析器（默认关闭）
+# 按阶段记录每帧耗时：main_loop 与 World.step 在阶段边界调用 lap(名称)，
+# 同一帧内多次 tick 的同名阶段会累加。每个阶段保存最近 HISTORY_SIZE 帧的耗时
+# （定长环形缓冲区，不随运行时间增长），另外维护一份累计直方图用于导出。
+# 本模块不依赖 browser，时钟由调用方传入（浏览器中为 performance.now）。
+# ===============================
+import json, time
+
+HISTORY_SIZE = 600  # 约 10 秒（60 Hz）
+TARGET_FRAME_MS = 1000 / 60
+DROPPED_FRAME_FACTOR = 1.5  # 两次 rAF 间隔超过目标帧时长的 1.5 倍记为掉帧
+HISTOGRAM_BIN_MS = 0.25
+HISTOGRAM_BINS = 200  # 覆盖 0~50ms，更长的计入最后一格
+SUMMARY_INTERVAL = 30  # 每隔多少帧重新计算一次百分位（排序有开销，不必每帧做）
+
+# 阶段名，按在一帧中出现的顺序排列
+PHASES = ("pid", "move", "cheese", "catch", "audio", "draw", "frame", "interval")
+
+
+def _default_clock():
+    return time.perf_counter() * 1000
+
+
+class RingBuffer:
+    """定长浮点环形缓冲区"""
+
+    def __init__(self, size=HISTORY_SIZE):
+        self.values = [0.0] * size
+        self.size = size
+        self.index = 0
+        self.count = 0
+
+    def push(self, value):
+        self.values[self.index] = value
+        self.index = (self.index + 1) % self.size
+        if self.count < self.size:
+            self.count += 1
+
+    def samples(self):
+        if self.count < self.size:
+            return self.values[:self.count]
+        return list(self.values)
+
+
+def percentile(sorted_values, fraction):
+    """已排序序列的最近秩百分位，空序列返回 0"""
+    if not sorted_values:
+        return 0.0
+    index = min(int(fraction * len(sorted_values)), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+class FrameProfiler:
+    def __init__(self, clock=_default_clock, history=HISTORY_SIZE):
+        self.clock = clock
+        self.history = history
+        self.reset()
+
+    def reset(self):
+        self.buffers = {name: RingBuffer(self.history) for name in PHASES}
+        self.histograms = {name: [0] * HISTOGRAM_BINS for name in PHASES}
+        self.frames = 0
+        self.dropped_frames = 0
+        self.current = {name: 0.0 for name in PHASES}
+        self.frame_start = None
+        self.last_mark = None
+        self.last_timestamp = None
+        self.summary = {}
+        self.counters = {}  # 调用方写入的调试计数（如活动的事件处理函数个数），随叠加层一起显示
+
+    # -------------------------------
+    # 采集
+    # -------------------------------
+    def begin_frame(self, timestamp):
+        """在 main_loop 开头调用，timestamp 为 rAF 时间戳（毫秒）"""
+        if self.last_timestamp is not None:
+            interval = timestamp - self.last_timestamp
+            self.current["interval"] = interval
+            if interval > TARGET_FRAME_MS * DROPPED_FRAME_FACTOR:
+                self.dropped_frames += 1
+        self.last_timestamp = timestamp
+        self.frame_start = self.last_mark = self.clock()
+
+    def lap(self, phase):
+        """把上一次打点到现在的耗时计入 phase"""
+        if self.last_mark is None:
+            return
+        now = self.clock()
+        self.current[phase] += now - self.last_mark
+        self.last_mark = now
+
+    def skip(self):
+        """丢弃上一次打点到现在的耗时（不属于任何阶段的部分）"""
+        if self.last_mark is not None:
+            self.last_mark = self.clock()
+
+    def end_frame(self):
+        if self.frame_start is None:
+            return
+        current = self.current
+        current["frame"] = self.clock() - self.frame_start
+        for name in PHASES:
+            if name == "interval" and self.frames == 0:
+                continue
+            value = current[name]
+            self.buffers[name].push(value)
+            self.histograms[name][min(int(value / HISTOGRAM_BIN_MS), HISTOGRAM_BINS - 1)] += 1
+            current[name] = 0.0
+        self.frames += 1
+        self.frame_start = self.last_mark = None
+        if self.frames % SUMMARY_INTERVAL == 1:
+            self.summary = self.compute_summary()
+
+    def pause(self):
+        """暂停、切换界面时调用，避免把等待时间计为一次超长间隔"""
+        self.last_timestamp = None
+
+    # -------------------------------
+    # 统计与导出
+    # -------------------------------
+    def compute_summary(self):
+        """{阶段: (p50, p95, p99)}，基于环形缓冲区中最近的帧"""
+        summary = {}
+        for name in PHASES:
+            values = sorted(self.buffers[name].samples())
+            summary[name] = (percentile(values, 0.50), percentile(values, 0.95), percentile(values, 0.99))
+        return summary
+
+    def export(self):
+        """返回可离线分析的 JSON 字符串：最近帧的原始样本、百分位与累计直方图"""
+        summary = self.compute_summary()
+        return json.dumps({
+            "frames": self.frames,
+            "dropped_frames": self.dropped_frames,
+            "counters": self.counters,
+            "target_frame_ms": TARGET_FRAME_MS,
+            "histogram_bin_ms": HISTOGRAM_BIN_MS,
+            "phases": {
+                name: {
+                    "percentiles": dict(zip(("p50", "p95", "p99"), summary[name])),
+                    "recent": self.buffers[name].samples(),
+                    "histogram": self.histograms[name],
+                }
+                for name in PHASES
+            },
+        })
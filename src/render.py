@@ -0,0 +1,404 @@
+import math
+from browser import document
+from engine import interpolated_position
+from profiler import PHASES
+
+# ===============================
+# 绘制：颜色、实体绘制与分层渲染
+# ===============================
+# 颜色（RGB 格式）
+WHITE       = (255, 255, 255)
+BLACK       = (0, 0, 0)
+DARK_GREEN  = (0, 100, 0)
+BRIGHT_GREEN= (0, 155, 0)
+GREY        = (128, 128, 128)
+YELLOW      = (255, 255, 0)
+
+HUD_HEIGHT = 50  # HUD 图层高度，覆盖计时/生命/奶酪文字和暂停按钮
+HUD_FONT = "20px Arial"
+PROFILER_FONT = "12px monospace"
+PROFILER_LINE_HEIGHT = 14
+PROFILER_WIDTH = 260
+MAX_LEVEL_BITMAPS = 2  # 同时保留障碍物位图的关卡数（当前一局 + 预热的下一局）
+INVINCIBLE_RING_WIDTH = 10  # 无敌老鼠外圈的线宽
+SPRITE_PADDING = 2  # 图集中精灵之间的空隙（像素），抗锯齿的边缘不会渗到相邻的精灵里
+
+def rgb_color(color):
+    """将RGB元组转换为 CSS 格式字符串"""
+    return "rgb({}, {}, {})".format(color[0], color[1], color[2])
+
+def create_layer(width, height):
+    """创建一个不挂到页面上的离屏 canvas"""
+    layer = document.createElement("canvas")
+    layer.width = width
+    layer.height = height
+    return layer
+
+# -------------------------------
+# 实体形状（原点为锚点：圆为圆心，奶酪为顶点），只在生成精灵图集时绘制
+# -------------------------------
+def paint_circle(ctx, r, color, ring_color=None):
+    ctx.beginPath()
+    ctx.arc(0, 0, r, 0, 2 * math.pi)
+    if ring_color is not None:
+        ctx.strokeStyle = rgb_color(ring_color)
+        ctx.lineWidth = INVINCIBLE_RING_WIDTH
+        ctx.stroke()
+    ctx.fillStyle = rgb_color(color)
+    ctx.fill()
+
+def paint_cheese(ctx, size):
+    ctx.beginPath()
+    ctx.moveTo(0, 0)
+    ctx.lineTo(size / 2, size)
+    ctx.lineTo(-size / 2, size)
+    ctx.closePath()
+    ctx.fillStyle = rgb_color(YELLOW)
+    ctx.fill()
+
+class SpriteAtlas:
+    """老鼠（普通/无敌）、猫和奶酪按当前缩放预先画在一张离屏 canvas 上。
+
+    绘制时在后备缓冲区像素坐标下用 drawImage 一比一贴图，不再每帧构造路径、格式化颜色字符串；
+    缩放、颜色或尺寸变化时才重新生成。
+    """
+
+    def __init__(self):
+        self.canvas = None
+        self.key = None
+        self.scale = 1  # 后备缓冲区像素 / 设计单位
+        self.sprites = {}  # 名称 -> (图集中的 x, y, 宽, 高, 锚点 x, 锚点 y)，单位为像素
+        self.builds = 0
+
+    def ensure(self, scale, rat, cat, cheese_size):
+        """需要时重新生成图集，重新生成了返回 True（之前贴过的图层需要重画）"""
+        key = (scale, rat.r, rat.color, cat.r, cat.color, cheese_size, YELLOW)
+        if key == self.key:
+            return False
+        self._build(key)
+        return True
+
+    def _build(self, key):
+        k, rat_r, rat_color, cat_r, cat_color, cheese_size, _ = key
+        ring_r = rat_r + INVINCIBLE_RING_WIDTH / 2  # 描边以圆周为中线，向外伸出半个线宽
+        # (名称, 设计单位下锚点左/上/右/下的范围, 绘制函数)
+        specs = (
+            ("rat", (rat_r, rat_r, rat_r, rat_r), lambda c: paint_circle(c, rat_r, rat_color)),
+            ("rat_invincible", (ring_r, ring_r, ring_r, ring_r),
+             lambda c: paint_circle(c, rat_r, rat_color, YELLOW)),
+            ("cat", (cat_r, cat_r, cat_r, cat_r), lambda c: paint_circle(c, cat_r, cat_color)),
+            ("cheese", (cheese_size / 2, 0, cheese_size / 2, cheese_size), lambda c: paint_cheese(c, cheese_size)),
+        )
+        pad = SPRITE_PADDING
+        layout = []
+        x = pad
+        height = 0
+        for name, (left, top, right, bottom), paint in specs:
+            # 锚点落在整像素上，贴图时只需把实体位置取整
+            ax, ay = math.ceil(left * k) + 1, math.ceil(top * k) + 1
+            w, h = ax + math.ceil(right * k) + 1, ay + math.ceil(bottom * k) + 1
+            layout.append((name, x, w, h, ax, ay, paint))
+            x += w + pad
+            height = max(height, h)
+        self.canvas = canvas = create_layer(x, height + pad * 2)
+        atlas_ctx = canvas.getContext("2d")
+        self.sprites = {}
+        for name, sx, w, h, ax, ay, paint in layout:
+            atlas_ctx.setTransform(k, 0, 0, k, sx + ax, pad + ay)
+            paint(atlas_ctx)
+            self.sprites[name] = (sx, pad, w, h, ax, ay)
+        self.key = key
+        self.scale = k
+        self.builds += 1
+
+    def draw(self, ctx, name, x, y, ox=0, oy=0):
+        """把精灵画在设计坐标 (x, y)；ctx 需处于像素坐标（单位变换），(ox, oy) 是视口左上角的像素坐标"""
+        sx, sy, w, h, ax, ay = self.sprites[name]
+        k = self.scale
+        ctx.drawImage(self.canvas, sx, sy, w, h, round(x * k) - ax - ox, round(y * k) - ay - oy, w, h)
+
+    def draw_cheeses(self, ctx, cheeses, ox=0, oy=0):
+        """批量贴出所有奶酪"""
+        sx, sy, w, h, ax, ay = self.sprites["cheese"]
+        k, canvas, draw_image = self.scale, self.canvas, ctx.drawImage
+        ax += ox
+        ay += oy
+        for cheese in cheeses:
+            draw_image(canvas, sx, sy, w, h, round(cheese.x * k) - ax, round(cheese.y * k) - ay, w, h)
+
+def draw_obstacle(ctx, obs, style=None):
+    ctx.fillStyle = style if style is not None else rgb_color(obs.color)
+    ctx.fillRect(obs.x, obs.y, obs.length, obs.width)
+
+def pause_menu_buttons(width, height):
+    """暂停菜单按钮区域 {名称: (x, y, 宽, 高)}，绘制与点击检测共用"""
+    return {
+        "resume": (width/2 - 100, height/2 - 60, 200, 50),
+        "menu": (width/2 - 100, height/2 + 10, 200, 50),
+    }
+
+def pause_menu_hit(width, height, pos):
+    """pos 落在哪个暂停菜单按钮上，都不在时返回 None"""
+    px, py = pos
+    for name, (x, y, w, h) in pause_menu_buttons(width, height).items():
+        if x <= px <= x + w and y <= py <= y + h:
+            return name
+    return None
+
+def draw_pause_menu(ctx, width, height, hover=None):
+    ctx.fillStyle = "rgba(0, 0, 0, 0.7)"
+    ctx.fillRect(0, 0, width, height)
+    ctx.font = HUD_FONT
+    buttons = pause_menu_buttons(width, height)
+
+    # 继续按钮
+    x, y, w, h = buttons["resume"]
+    ctx.fillStyle = rgb_color(BRIGHT_GREEN if hover == "resume" else DARK_GREEN)
+    ctx.fillRect(x, y, w, h)
+    ctx.fillStyle = rgb_color(WHITE)
+    ctx.fillText("继续", width/2 - 30, height/2 - 25)
+
+    # 返回主菜单按钮
+    x, y, w, h = buttons["menu"]
+    ctx.fillStyle = rgb_color(BRIGHT_GREEN if hover == "menu" else DARK_GREEN)
+    ctx.fillRect(x, y, w, h)
+    ctx.fillStyle = rgb_color(WHITE)
+    ctx.fillText("返回主菜单", width/2 - 60, height/2 + 35)
+
+# -------------------------------
+# 分层渲染
+# -------------------------------
+class Camera:
+    """大地图的视口：左上角在地图中的设计坐标，跟随老鼠，不超出地图边界"""
+
+    def __init__(self):
+        self.x = 0
+        self.y = 0
+
+    def follow(self, x, y, view_width, view_height, world_width, world_height):
+        self.x = min(max(x - view_width / 2, 0), max(world_width - view_width, 0))
+        self.y = min(max(y - view_height / 2, 0), max(world_height - view_height, 0))
+
+class GameRenderer:
+    """游戏画面由三层合成：
+
+    - 背景层：关卡位图 + 奶酪，只在换关卡或奶酪增删时重画；关卡位图（黑色底 + 全部障碍物）
+      挂在 engine.Level 上，同一个关卡只画一次，重新开局时直接复用；
+    - 实体层：老鼠、猫，每帧直接画在主 canvas 上；
+    - HUD 层：计时、生命、奶酪数和暂停按钮，只在数值变化时重画；
+    - 性能层（可选）：profiler 的百分位统计，只在统计刷新时重画。
+
+    暂停时只在第一帧完整绘制一次并截图到快照层，之后只有暂停菜单的悬停状态变化时
+    才用快照 + 菜单重画，其余帧什么都不画。
+
+    老鼠、猫和奶酪都从精灵图集（SpriteAtlas）贴图，不构造路径。
+
+    分块加载的大地图（arena.ArenaWorld）不使用背景层：镜头（camera）跟随老鼠，
+    每帧只画视口内已加载块的障碍物和视口内的奶酪，绘制量与地图大小无关。
+
+    传入 resolution.ResolutionManager 时所有绘制都使用设计坐标，各图层与主画布的
+    后备缓冲区同样大小，合成时按像素一比一贴图；否则设计坐标就是画布像素。
+    """
+
+    def __init__(self, canvas, resolution=None):
+        self.canvas = canvas
+        self.ctx = canvas.getContext("2d")
+        self.resolution = resolution
+        self.background = None
+        self.background_level = None
+        self.background_cheeses = None  # (奶酪存储, 版本号)
+        self.level_bitmaps = []  # 持有位图的关卡，最近画的在后
+        self.atlas = SpriteAtlas()
+        self.camera = Camera()
+        self.hud = None
+        self.hud_state = None
+        self.profiler_layer = None
+        self.profiler_summary = None
+        self.snapshot = None
+        self.frozen = False  # 快照层是否保存着当前暂停画面
+        self.frozen_hover = None
+
+    def invalidate(self):
+        """强制下一帧重画所有缓存图层（例如画布尺寸变化后）"""
+        self.background_level = None
+        self.hud_state = None
+        self.profiler_summary = None
+        self.frozen = False
+
+    @property
+    def width(self):
+        """设计坐标下的画面宽度"""
+        return self.resolution.design_width if self.resolution is not None else self.canvas.width
+
+    @property
+    def height(self):
+        return self.resolution.design_height if self.resolution is not None else self.canvas.height
+
+    def _scale(self, ctx):
+        """把 ctx 的坐标系设为设计坐标"""
+        k = self.resolution.pixel_ratio if self.resolution is not None else 1
+        ctx.setTransform(k, 0, 0, k, 0, 0)
+
+    def _pixels(self, ctx):
+        """恢复为后备缓冲区像素坐标（图层之间一比一合成）"""
+        ctx.setTransform(1, 0, 0, 1, 0, 0)
+
+    def _ensure_layers(self):
+        width, height = self.canvas.width, self.canvas.height
+        if self.background is None or self.background.width != width or self.background.height != height:
+            k = self.resolution.pixel_ratio if self.resolution is not None else 1
+            self.background = create_layer(width, height)
+            self.hud = create_layer(width, math.ceil(HUD_HEIGHT * k))
+            self.snapshot = create_layer(width, height)
+            self.invalidate()
+
+    def prerender_level(self, level):
+        """把关卡的障碍物画到 level.bitmap 上（与后备缓冲区同样大小），尺寸没变时直接返回已有的位图"""
+        width, height = self.canvas.width, self.canvas.height
+        bitmap = level.bitmap
+        if bitmap is not None and bitmap.width == width and bitmap.height == height:
+            return bitmap
+        bitmap = create_layer(width, height)
+        layer_ctx = bitmap.getContext("2d")
+        self._scale(layer_ctx)
+        layer_ctx.fillStyle = rgb_color(BLACK)
+        layer_ctx.fillRect(0, 0, self.width, self.height)
+        for obs, style in zip(level.obstacles, level.styles):
+            draw_obstacle(layer_ctx, obs, style)
+        level.bitmap = bitmap
+        # 位图和画布一样大，只给最近的几个关卡保留
+        bitmaps = self.level_bitmaps
+        if level in bitmaps:
+            bitmaps.remove(level)
+        bitmaps.append(level)
+        while len(bitmaps) > MAX_LEVEL_BITMAPS:
+            bitmaps.pop(0).bitmap = None
+        return bitmap
+
+    def _render_background(self, level, cheeses):
+        layer_ctx = self.background.getContext("2d")
+        self._pixels(layer_ctx)
+        layer_ctx.drawImage(self.prerender_level(level), 0, 0)
+        self.atlas.draw_cheeses(layer_ctx, cheeses)
+        self.background_level = level
+        self.background_cheeses = (cheeses, cheeses.version)
+
+    def _render_view(self, world):
+        """分块地图：直接在主画布上画出镜头范围内的障碍物和奶酪"""
+        ctx, camera = self.ctx, self.camera
+        width, height = self.width, self.height
+        k = self.resolution.pixel_ratio if self.resolution is not None else 1
+        ox, oy = round(camera.x * k), round(camera.y * k)
+        self._pixels(ctx)
+        ctx.fillStyle = rgb_color(BLACK)
+        ctx.fillRect(0, 0, self.canvas.width, self.canvas.height)
+        ctx.setTransform(k, 0, 0, k, -ox, -oy)
+        # 只取已加载的块：绘制不应该改变模拟状态（加载块会放出奶酪）
+        for chunk in world.obstacles.chunks_in(camera.x, camera.y, width, height, load=False):
+            for obs, style in zip(chunk.obstacles, chunk.styles):
+                draw_obstacle(ctx, obs, style)
+        self._pixels(ctx)
+        size = world.cheeses.size
+        visible = world.cheeses.in_area(camera.x - size, camera.y - size, width + size * 2, height + size * 2)
+        self.atlas.draw_cheeses(ctx, visible, ox, oy)
+        return ox, oy
+
+    def _render_hud(self, state):
+        time_left, lives_count, scores, paused = state
+        width = self.width
+        hud_ctx = self.hud.getContext("2d")
+        self._scale(hud_ctx)
+        hud_ctx.clearRect(0, 0, width, HUD_HEIGHT)
+        hud_ctx.fillStyle = rgb_color(WHITE)
+        hud_ctx.font = HUD_FONT
+        hud_ctx.fillText("Time: {}".format(time_left), 10, 30)
+        hud_ctx.fillText("生命: {}".format(lives_count), 100, 30)
+        hud_ctx.fillText("奶酪: {}".format(scores), 200, 30)
+        # 绘制暂停按钮
+        hud_ctx.fillStyle = rgb_color(DARK_GREEN)
+        hud_ctx.fillRect(width - 100, 10, 80, 30)
+        hud_ctx.fillStyle = rgb_color(WHITE)
+        hud_ctx.fillText("继续" if paused else "暂停", width - 90, 30)
+        self.hud_state = state
+
+    def _render_profiler(self, profiler):
+        lines = ["phase      p50    p95    p99 ms"]
+        for name in PHASES:
+            p50, p95, p99 = profiler.summary.get(name, (0.0, 0.0, 0.0))
+            lines.append("{:8s}{:7.2f}{:7.2f}{:7.2f}".format(name, p50, p95, p99))
+        lines.append("frames {}  dropped {}".format(profiler.frames, profiler.dropped_frames))
+        if profiler.counters:
+            lines.append("  ".join("{} {}".format(k, v) for k, v in sorted(profiler.counters.items())))
+        height = PROFILER_LINE_HEIGHT * len(lines) + 8
+        if self.profiler_layer is None or self.profiler_layer.height != height:
+            self.profiler_layer = create_layer(PROFILER_WIDTH, height)
+        layer_ctx = self.profiler_layer.getContext("2d")
+        layer_ctx.clearRect(0, 0, PROFILER_WIDTH, height)
+        layer_ctx.fillStyle = "rgba(0, 0, 0, 0.7)"
+        layer_ctx.fillRect(0, 0, PROFILER_WIDTH, height)
+        layer_ctx.fillStyle = rgb_color(WHITE)
+        layer_ctx.font = PROFILER_FONT
+        for i, line in enumerate(lines):
+            layer_ctx.fillText(line, 6, PROFILER_LINE_HEIGHT * (i + 1))
+        self.profiler_summary = profiler.summary
+
+    def draw_profiler(self, profiler):
+        """在右下角叠加性能统计"""
+        if profiler.summary is not self.profiler_summary:
+            self._render_profiler(profiler)
+        layer = self.profiler_layer
+        self._scale(self.ctx)
+        self.ctx.drawImage(layer, self.width - layer.width - 10, self.height - layer.height - 10)
+
+    def draw_frame(self, world, alpha, paused, pause_hover=None):
+        """绘制一帧；暂停期间画面没有变化时直接返回 False"""
+        self._ensure_layers()
+        ctx = self.ctx
+        if not paused:
+            self.frozen = False
+        elif self.frozen:
+            if pause_hover == self.frozen_hover:
+                return False
+            self._pixels(ctx)
+            ctx.drawImage(self.snapshot, 0, 0)
+            self._scale(ctx)
+            draw_pause_menu(ctx, self.width, self.height, pause_hover)
+            self.frozen_hover = pause_hover
+            return True
+        cheeses = world.cheeses
+        rat, cat = world.rat, world.cat
+        atlas = self.atlas
+        if atlas.ensure(self.resolution.pixel_ratio if self.resolution is not None else 1, rat, cat, cheeses.size):
+            self.background_level = None
+        rat_x, rat_y = interpolated_position(rat, alpha)
+        if world.level.streamed:
+            self.camera.follow(rat_x, rat_y, self.width, self.height, world.width, world.height)
+            ox, oy = self._render_view(world)
+        else:
+            self.camera.x = self.camera.y = ox = oy = 0
+            if (world.level is not self.background_level or self.background_cheeses is None
+                    or self.background_cheeses[0] is not cheeses or self.background_cheeses[1] != cheeses.version):
+                self._render_background(world.level, cheeses)
+            self._pixels(ctx)
+            ctx.drawImage(self.background, 0, 0)
+
+        atlas.draw(ctx, "rat_invincible" if rat.invincible else "rat", rat_x, rat_y, ox, oy)
+        x, y = interpolated_position(cat, alpha)
+        atlas.draw(ctx, "cat", x, y, ox, oy)
+
+        hud_state = (world.time_left(), world.lives_count, world.scores, paused)
+        if hud_state != self.hud_state:
+            self._render_hud(hud_state)
+        self._pixels(ctx)
+        ctx.drawImage(self.hud, 0, 0)
+
+        # 暂停的第一帧：截下不含菜单的画面，之后都从快照重画
+        if paused:
+            snapshot_ctx = self.snapshot.getContext("2d")
+            snapshot_ctx.drawImage(self.canvas, 0, 0)
+            self.frozen = True
+            self.frozen_hover = pause_hover
+            self._scale(ctx)
+            draw_pause_menu(ctx, self.width, self.height, pause_hover)
+        self._scale(ctx)
+        return True
@@ -0,0 +1,200 @@
+# ===============================
+# 输入录制与确定性回放
+# 一局游戏完全由 World 的随机种子和每个 tick 的 GameInput 决定，
+# 所以只需记录这两样：回放时用同样的种子重建 World，逐 tick 喂回输入，
+# 不绘制、不等待，最后用 World.state_hash 核对终局状态。
+#
+# 文件格式（小端）：
+#   头部  HEADER（见下），末尾是 tick 总数和终局摘要
+#   正文  每个 tick 一条记录，坐标相对上一 tick 做差分：
+#         0x80 | (n - 1)       之后 n 个 tick 与上一 tick 完全相同且没有加速点击（n ≤ 128）
+#         标志字节 + 变长整数  bit0 有 dx，bit1 有 dy，bit2 有加速次数；
+#                              dx / dy 为 zigzag 编码的 varint，加速次数为 varint
+# ===============================
+import struct, sys, time
+from engine import World, GameInput
+from levels import LevelCache
+
+# CRR5：老鼠和猫的位移分段走、与步长无关，猫按时间窗判断卡住；
+# CRR4 起初始奶酪数为 4 字节、障碍物间隙放宽到猫能通过、猫卡住时会脱困；
+# CRR3 起为互不重叠的关卡布局，CRR2 起为连续碰撞检测。旧录像在新规则下无法复现
+MAGIC = b"CRR5"
+# magic, 种子, 宽, 高, 障碍物数（要求布置的数量，实际数量由关卡生成决定）, 缩放, tick 频率, 初始奶酪数, 猫导航, tick 总数, 终局摘要
+HEADER = struct.Struct("<4sIHHHdHIBII")
+MAX_RUN = 128
+
+FLAG_DX = 1
+FLAG_DY = 2
+FLAG_BOOST = 4
+FLAG_RUN = 0x80
+
+
+def _write_varint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data, pos):
+    value = shift = 0
+    while True:
+        if pos >= len(data):
+            raise ValueError("录像数据不完整")
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def _zigzag(n):
+    return n * 2 if n >= 0 else -n * 2 - 1
+
+
+def _unzigzag(n):
+    return n >> 1 if not n & 1 else -((n + 1) >> 1)
+
+
+class InputRecorder:
+    """记录一局中每个 tick 的输入。坐标必须是整数（main_loop 会先取整）"""
+
+    def __init__(self, world, tick_rate):
+        self.seed = world.seed
+        self.width = world.width
+        self.height = world.height
+        self.num_obstacles = world.num_obstacles
+        self.scale_factor = world.scale_factor
+        self.tick_rate = tick_rate
+        self.initial_cheeses = world.initial_cheeses
+        self.cat_navigation = world.cat_navigation
+        self.body = bytearray()
+        self.ticks = 0
+        self.run = 0
+        self.last_x = 0
+        self.last_y = 0
+
+    def record(self, inp):
+        x, y, boosts = inp.target_x, inp.target_y, inp.boosts
+        self.ticks += 1
+        if x == self.last_x and y == self.last_y and boosts == 0:
+            self.run += 1
+            if self.run == MAX_RUN:
+                self._flush_run()
+            return
+        self._flush_run()
+        body = self.body
+        dx, dy = x - self.last_x, y - self.last_y
+        flags = 0
+        if dx:
+            flags |= FLAG_DX
+        if dy:
+            flags |= FLAG_DY
+        if boosts:
+            flags |= FLAG_BOOST
+        body.append(flags)
+        if dx:
+            _write_varint(body, _zigzag(dx))
+        if dy:
+            _write_varint(body, _zigzag(dy))
+        if boosts:
+            _write_varint(body, boosts)
+        self.last_x, self.last_y = x, y
+
+    def _flush_run(self):
+        if self.run:
+            self.body.append(FLAG_RUN | (self.run - 1))
+            self.run = 0
+
+    def to_bytes(self, world):
+        """以 world 的当前状态作为终局，返回完整录像；不影响之后继续录制"""
+        header = HEADER.pack(MAGIC, self.seed, self.width, self.height, self.num_obstacles, self.scale_factor,
+                             self.tick_rate, self.initial_cheeses, int(self.cat_navigation),
+                             self.ticks, world.state_hash())
+        tail = bytes([FLAG_RUN | (self.run - 1)]) if self.run else b""
+        return header + bytes(self.body) + tail
+
+
+class Recording:
+    """解析后的录像：头部字段 + 逐 tick 输入迭代"""
+
+    def __init__(self, data):
+        if len(data) < HEADER.size or data[:4] != MAGIC:
+            raise ValueError("不是有效的录像文件")
+        (_, self.seed, self.width, self.height, self.num_obstacles, self.scale_factor, self.tick_rate,
+         self.initial_cheeses, cat_navigation, self.ticks, self.final_hash) = HEADER.unpack_from(data)
+        self.cat_navigation = bool(cat_navigation)
+        self.body = data[HEADER.size:]
+
+    def inputs(self):
+        """依次产生每个 tick 的 GameInput；相同的连续 tick 复用同一个对象"""
+        body = self.body
+        pos, end = 0, len(body)
+        x = y = 0
+        inp = GameInput(0, 0)
+        while pos < end:
+            flags = body[pos]
+            pos += 1
+            if flags & FLAG_RUN:
+                if inp.boosts:
+                    inp = GameInput(x, y, 0)
+                for _ in range((flags & 0x7f) + 1):
+                    yield inp
+                continue
+            if flags & FLAG_DX:
+                dx, pos = _read_varint(body, pos)
+                x += _unzigzag(dx)
+            if flags & FLAG_DY:
+                dy, pos = _read_varint(body, pos)
+                y += _unzigzag(dy)
+            boosts = 0
+            if flags & FLAG_BOOST:
+                boosts, pos = _read_varint(body, pos)
+            inp = GameInput(x, y, boosts)
+            yield inp
+
+    def new_world(self, levels=None):
+        return World(self.width, self.height, self.scale_factor, self.num_obstacles,
+                     cat_navigation=self.cat_navigation, seed=self.seed, initial_cheeses=self.initial_cheeses,
+                     levels=levels)
+
+
+def replay(data, levels=None):
+    """全速回放录像，返回 (world, 是否与录制时的终局一致)。
+
+    levels 为共享的 LevelCache 时，同一关卡的多份录像只生成一次关卡（批量核对时关卡生成占了大头）。
+    """
+    recording = Recording(data)
+    world = recording.new_world(levels)
+    dt = 1 / recording.tick_rate
+    ticks = 0
+    for inp in recording.inputs():
+        world.step(dt, inp)
+        ticks += 1
+    return world, ticks == recording.ticks and world.state_hash() == recording.final_hash
+
+
+def main(argv):
+    """命令行：python src/replay.py 录像文件..."""
+    if not argv:
+        print("用法: python src/replay.py 录像文件...")
+        return 2
+    failures = 0
+    levels = LevelCache()
+    for path in argv:
+        with open(path, "rb") as f:
+            data = f.read()
+        start = time.perf_counter()
+        world, ok = replay(data, levels)
+        elapsed = time.perf_counter() - start
+        recording = Recording(data)
+        print("{}: {} ticks ({:.1f}s 游戏时间) 用时 {:.1f}ms，障碍物 {}/{}，得分 {} 生命 {}，摘要 {:08x} {}".format(
+            path, recording.ticks, recording.ticks / recording.tick_rate, elapsed * 1000,
+            len(world.obstacles), recording.num_obstacles, world.scores, world.lives_count, world.state_hash(), "一致" if ok else "不一致（期望 {:08x}）".format(recording.final_hash)))
+        failures += not ok
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,118 @@
+# ===============================
+# 分辨率管理
+# 游戏的一切坐标（世界、界面、鼠标）都在设计分辨率 DESIGN_WIDTH x DESIGN_HEIGHT 中，
+# 画布按比例缩放到窗口内居中显示（四周留边）。画布的后备缓冲区（canvas.width/height）
+# = 显示尺寸（CSS 像素）x devicePixelRatio x 动态缩放，绘制前用 setTransform 把设计坐标映射过去：
+# 高 DPI 屏幕上不再模糊，帧时间超出预算时降低动态缩放，少填充一些像素。
+# ===============================
+from engine import DESIGN_WIDTH, DESIGN_HEIGHT
+
+MIN_RENDER_SCALE = 0.5  # 动态缩放的下限（相对于 devicePixelRatio 下的原生分辨率）
+MAX_RENDER_SCALE = 1.0
+MAX_BACKING_PIXELS = 3840 * 2160  # 后备缓冲区像素数上限，超出时直接按比例缩小
+GOVERNOR_WINDOW = 30  # 调速器每隔多少帧评估一次平均帧耗时
+SCALE_DOWN_FACTOR = 0.85  # 超出预算时缩放乘以该系数
+SCALE_UP_STEP = 0.05  # 余量充足时每次增加的缩放
+HEADROOM_RATIO = 0.6  # 平均帧耗时低于预算的这个比例才算余量充足
+RECOVER_WINDOWS = 3  # 连续多少个评估周期都有余量才提高缩放（避免在两档之间来回跳）
+
+
+class ScaleGovernor:
+    """根据每帧的工作耗时（模拟 + 绘制，毫秒）调整动态缩放"""
+
+    def __init__(self, budget_ms, scale=MAX_RENDER_SCALE, min_scale=MIN_RENDER_SCALE, max_scale=MAX_RENDER_SCALE):
+        self.budget_ms = budget_ms
+        self.scale = scale
+        self.min_scale = min_scale
+        self.max_scale = max_scale
+        self.total = 0.0
+        self.count = 0
+        self.calm = 0  # 连续有余量的评估周期数
+        self.changes = 0
+
+    def reset(self):
+        """丢弃还没评估的样本（暂停、切换界面之后调用）"""
+        self.total = 0.0
+        self.count = 0
+        self.calm = 0
+
+    def record(self, frame_ms):
+        """记录一帧的耗时，缩放有变化时返回 True"""
+        self.total += frame_ms
+        self.count += 1
+        if self.count < GOVERNOR_WINDOW:
+            return False
+        average = self.total / self.count
+        self.total = 0.0
+        self.count = 0
+        scale = self.scale
+        if average > self.budget_ms:
+            scale = max(self.min_scale, scale * SCALE_DOWN_FACTOR)
+            self.calm = 0
+        elif average < self.budget_ms * HEADROOM_RATIO:
+            self.calm += 1
+            if self.calm >= RECOVER_WINDOWS:
+                scale = min(self.max_scale, scale + SCALE_UP_STEP)
+                self.calm = 0
+        else:
+            self.calm = 0
+        if scale == self.scale:
+            return False
+        self.scale = scale
+        self.changes += 1
+        return True
+
+
+class ResolutionManager:
+    def __init__(self, window, canvas, design_width=DESIGN_WIDTH, design_height=DESIGN_HEIGHT):
+        self.window = window
+        self.canvas = canvas
+        self.design_width = design_width
+        self.design_height = design_height
+        self.render_scale = MAX_RENDER_SCALE
+        self.pixel_ratio = 1.0  # 后备缓冲区像素 / 设计单位，即绘制时的变换系数
+        self.display_width = design_width  # 画布的显示尺寸（CSS 像素）
+        self.display_height = design_height
+        self.dirty = True
+        self.layout_version = 0  # 画布显示尺寸每变化一次加一（pointer.CanvasTransform 据此重新测量）
+        window.bind("resize", self._on_resize)
+
+    def _on_resize(self, event):
+        self.dirty = True
+
+    def set_render_scale(self, scale):
+        if scale != self.render_scale:
+            self.render_scale = scale
+            self.dirty = True
+
+    def update(self):
+        """窗口尺寸或动态缩放变化后重新计算画布尺寸；后备缓冲区尺寸变了时返回 True（缓存图层需要重建）"""
+        if not self.dirty:
+            return False
+        self.dirty = False
+        window = self.window
+        fit = min(window.innerWidth / self.design_width, window.innerHeight / self.design_height)
+        self.display_width = self.design_width * fit
+        self.display_height = self.design_height * fit
+        dpr = window.devicePixelRatio or 1
+        ratio = fit * dpr * self.render_scale
+        pixels = self.design_width * self.design_height * ratio * ratio
+        if pixels > MAX_BACKING_PIXELS:
+            ratio *= (MAX_BACKING_PIXELS / pixels) ** 0.5
+        width = max(1, round(self.design_width * ratio))
+        height = max(1, round(self.design_height * ratio))
+        canvas = self.canvas
+        canvas.style.width = "{}px".format(round(self.display_width))
+        canvas.style.height = "{}px".format(round(self.display_height))
+        self.layout_version += 1
+        self.pixel_ratio = width / self.design_width
+        if canvas.width == width and canvas.height == height:
+            return False
+        canvas.width = width  # 赋值会清空画布，所以只在尺寸真的变化时才做
+        canvas.height = height
+        return True
+
+    def apply(self, ctx):
+        """把 ctx 的坐标系设为设计分辨率"""
+        k = self.pixel_ratio
+        ctx.setTransform(k, 0, 0, k, 0, 0)
@@ -0,0 +1,100 @@
+# ===============================
+# 界面栈与唯一的帧调度器
+# 整个页面只有 FrameScheduler 调用 requestAnimationFrame，任何时刻最多一个待执行的回调，
+# 每帧只驱动栈顶界面的 frame(timestamp)。切换界面时代数（generation）加一并取消旧回调，
+# 回调里带着申请时的代数，过期的回调即使被执行也会直接丢弃，旧循环不可能在切换后继续运行。
+# 界面出栈时，它在 InputDispatcher 中注册的事件处理函数也一并注销。
+# ===============================
+
+class Scene:
+    """一个界面：name 同时是它在 InputDispatcher 中的作用域名，frame(timestamp) 每帧调用一次"""
+    def __init__(self, name, frame):
+        self.name = name
+        self.frame = frame
+
+class FrameScheduler:
+    def __init__(self, window, dispatcher=None):
+        self.window = window
+        self.dispatcher = dispatcher
+        self.stack = []
+        self.generation = 0
+        self.handle = None
+        self.pending = 0  # 已申请、尚未执行或取消的 rAF 回调数，正常情况下只会是 0 或 1
+        self.frames = 0
+        self.stale_frames = 0  # 被丢弃的过期回调数
+
+    @property
+    def top(self):
+        return self.stack[-1] if self.stack else None
+
+    @property
+    def active_loops(self):
+        return self.pending
+
+    # -------------------------------
+    # 界面栈操作
+    # -------------------------------
+    def push(self, scene):
+        """在当前界面之上打开 scene（下面的界面暂停绘制，事件处理函数保留但不接收事件）"""
+        self.stack.append(scene)
+        self._transition()
+        return scene
+
+    def pop(self):
+        """关闭栈顶界面，回到下面的界面"""
+        if self.stack:
+            self._exit(self.stack.pop())
+        self._transition()
+
+    def replace(self, scene):
+        """关闭所有界面，只保留 scene"""
+        while self.stack:
+            self._exit(self.stack.pop())
+        return self.push(scene)
+
+    def clear(self):
+        while self.stack:
+            self._exit(self.stack.pop())
+        self._transition()
+
+    def _exit(self, scene):
+        if self.dispatcher is not None:
+            self.dispatcher.release(scene.name)
+
+    # -------------------------------
+    # 帧循环
+    # -------------------------------
+    def _transition(self):
+        self.generation += 1
+        if self.handle is not None:
+            self.window.cancelAnimationFrame(self.handle)
+            self.handle = None
+            self.pending -= 1
+        top = self.top
+        if self.dispatcher is not None and top is not None:
+            self.dispatcher.activate(top.name)
+        if top is not None:
+            self._request()
+
+    def _request(self):
+        token = self.generation
+        def callback(timestamp):
+            self._on_frame(token, timestamp)
+        self.pending += 1
+        assert self.pending == 1, "同时存在多个帧循环"
+        self.handle = self.window.requestAnimationFrame(callback)
+
+    def _on_frame(self, token, timestamp):
+        if token != self.generation:
+            self.stale_frames += 1
+            return
+        self.handle = None
+        self.pending -= 1
+        scene = self.top
+        if scene is None:
+            return
+        self.frames += 1
+        scene.frame(timestamp)
+        # frame 内部可能已经切换了界面（切换时会申请新的回调）
+        if self.handle is None and token == self.generation:
+            self._request()
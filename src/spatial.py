@@ -0,0 +1,74 @@
+# ===============================
+# 障碍物空间索引（均匀网格）
+# 障碍物在一局内不会移动，所以网格只在布置障碍物时构建一次，
+# 之后所有碰撞查询只检查附近格子里的障碍物。
+# ===============================
+
+GRID_CELL_SIZE = 100  # 与最大障碍物边长同量级，每个障碍物最多落在 4 个格子里
+
+_EMPTY = ()
+
+class ObstacleGrid:
+    def __init__(self, obstacles, cell_size=GRID_CELL_SIZE):
+        self.obstacles = list(obstacles)
+        self.cell_size = cell_size
+        self.cells = {}
+        self._found = []  # query 复用的结果列表
+        for obs in self.obstacles:
+            self._insert(obs)
+
+    def add(self, obs):
+        """布置障碍物时逐个加入（加入后即可参与 collides 查询）"""
+        self.obstacles.append(obs)
+        self._insert(obs)
+
+    def _insert(self, obs):
+        cs = self.cell_size
+        rect = obs.rect
+        for cx in range(int(rect.x // cs), int((rect.x + rect.width) // cs) + 1):
+            for cy in range(int(rect.y // cs), int((rect.y + rect.height) // cs) + 1):
+                cell = self.cells.get((cx, cy))
+                if cell is None:
+                    self.cells[(cx, cy)] = [obs]
+                else:
+                    cell.append(obs)
+
+    def __iter__(self):
+        return iter(self.obstacles)
+
+    def __len__(self):
+        return len(self.obstacles)
+
+    def __getitem__(self, index):
+        return self.obstacles[index]
+
+    def query(self, x, y, width, height):
+        """返回与给定矩形区域所在格子重叠的障碍物（不重复，可能包含不相交的）。
+
+        返回的序列会被下一次 query 复用，调用方需在再次查询前用完。
+        """
+        cs = self.cell_size
+        x0 = int(x // cs)
+        x1 = int((x + width) // cs)
+        y0 = int(y // cs)
+        y1 = int((y + height) // cs)
+        if x0 == x1 and y0 == y1:
+            return self.cells.get((x0, y0), _EMPTY)
+        found = self._found
+        found.clear()
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                cell = self.cells.get((cx, cy))
+                if cell is None:
+                    continue
+                for obs in cell:
+                    if obs not in found:
+                        found.append(obs)
+        return found
+
+    def collides(self, rect):
+        """矩形是否与任一障碍物相交"""
+        for obs in self.query(rect.x, rect.y, rect.width, rect.height):
+            if rect.colliderect(obs.rect):
+                return True
+        return False
@@ -0,0 +1,262 @@
+# ===============================
+# 难度参数扫描（仅 CPython，多进程）
+# 对 PID 增益、猫的速度参数、初始速度范围、障碍物数量和无敌时间做网格或随机搜索：
+# 每个 (参数组合, 老鼠策略, 种子) 是一局独立的 engine.World 游戏，
+# 交给进程池并行跑完，结果逐局追加写入 CSV 或 JSONL 文件。
+# 各局之间没有共享状态，任务与结果都只是几个数字，吞吐随核数线性增长。
+#
+# 用法：
+#   python src/sweep.py --param kp=0.5,0.9,1.3 --param cat_decay_rate=0.5,0.6,0.7 --games 20 --out sweep.csv
+#   python src/sweep.py --samples 500 --param kp=0.3:1.5 --param num_obstacles=10:60 --out sweep.jsonl
+#   python src/sweep.py --games 200 --tick-rate 15 --out coarse.csv   # 粗步长快速模拟，结果应与 60 Hz 一致
+# 网格模式下参数值用逗号分隔；随机模式（--samples）还可以写 低:高 的均匀分布区间。
+# ===============================
+import argparse, csv, itertools, json, math, multiprocessing, os, random, sys, time
+
+from engine import (World, GameInput, Difficulty, PID_GAINS, CAT_DECAY_RATE, CAT_MAX_SPEED, CAT_MIN_SPEED,
+                    START_SPEED_RANGE, OBSTACLE_COUNT, INVINCIBILITY_TIME, GAME_DURATION,
+                    DESIGN_WIDTH, DESIGN_HEIGHT)
+from timestep import TICK_RATE
+from levels import LevelCache
+
+# 可扫描的参数及默认值
+DEFAULT_PARAMS = {
+    "kp": PID_GAINS[0],
+    "ki": PID_GAINS[1],
+    "kd": PID_GAINS[2],
+    "cat_decay_rate": CAT_DECAY_RATE,
+    "cat_max_speed": CAT_MAX_SPEED,
+    "cat_min_speed": CAT_MIN_SPEED,
+    "start_speed_low": START_SPEED_RANGE[0],
+    "start_speed_high": START_SPEED_RANGE[1],
+    "num_obstacles": OBSTACLE_COUNT,
+    "invincibility_time": INVINCIBILITY_TIME,
+}
+PARAM_NAMES = tuple(DEFAULT_PARAMS)
+# obstacles 是实际放下的障碍物数，地图放不下时少于参数 num_obstacles
+RESULT_FIELDS = ("policy", "seed", "tick_rate", "obstacles", "survival_time", "catches", "cheese", "lives",
+                 "total_score", "ticks", "ticks_per_sec")
+FLEE_DISTANCE = 100
+DANGER_DISTANCE = 120  # 猫进入这个距离时策略开始逃跑/加速
+BOOST_PERIOD = 1 / 3  # 逃跑时每隔多少秒点击一次加速（与 tick 频率无关）
+DECISION_RATE = 10  # 策略每秒做几次决定，两次决定之间沿用上一次的目标点（与 tick 频率无关）
+
+
+# -------------------------------
+# 脚本化老鼠策略（与 batch.py 中的同名策略对应，这里逐局作用于 World）
+# 签名：policy(world, tick, tick_rate) -> GameInput，tick 为决定的序号、tick_rate 为决定频率
+# -------------------------------
+def _away_from_cat(world, distance=FLEE_DISTANCE):
+    rat, cat = world.rat, world.cat
+    dx, dy = rat.x - cat.x, rat.y - cat.y
+    length = max(math.hypot(dx, dy), 0.001)
+    return rat.x + dx / length * distance, rat.y + dy / length * distance, length
+
+def _boosts(gap, tick, tick_rate):
+    interval = max(1, round(BOOST_PERIOD * tick_rate))
+    return 1 if gap < DANGER_DISTANCE and tick % interval == 0 else 0
+
+def flee_policy(world, tick, tick_rate=DECISION_RATE):
+    """一直朝远离猫的方向跑，猫靠近时连续点击加速"""
+    x, y, gap = _away_from_cat(world)
+    return GameInput(round(x), round(y), _boosts(gap, tick, tick_rate))
+
+def cheese_policy(world, tick, tick_rate=DECISION_RATE):
+    """去吃最近的奶酪，猫靠近时改为逃跑"""
+    x, y, gap = _away_from_cat(world)
+    if gap < DANGER_DISTANCE or not world.cheeses:
+        return GameInput(round(x), round(y), _boosts(gap, tick, tick_rate))
+    rat = world.rat
+    cheese = min(world.cheeses, key=lambda c: (c.x - rat.x) ** 2 + (c.y - rat.y) ** 2)
+    return GameInput(cheese.x, cheese.y + cheese.size // 2)
+
+def idle_policy(world, tick, tick_rate=DECISION_RATE):
+    """原地不动"""
+    return GameInput(round(world.rat.x), round(world.rat.y))
+
+POLICIES = {"flee": flee_policy, "cheese": cheese_policy, "idle": idle_policy}
+
+
+# -------------------------------
+# 单局
+# -------------------------------
+# 每个工作进程一份：同一个种子在不同参数组合、不同策略下是同一个关卡，只生成一次
+_levels = LevelCache()
+
+def make_world(params, seed, width=DESIGN_WIDTH, height=DESIGN_HEIGHT):
+    difficulty = Difficulty(
+        pid_gains=(params["kp"], params["ki"], params["kd"]),
+        cat_decay_rate=params["cat_decay_rate"],
+        cat_max_speed=params["cat_max_speed"],
+        cat_min_speed=params["cat_min_speed"],
+        start_speed_range=(int(params["start_speed_low"]), int(params["start_speed_high"])),
+        invincibility_time=params["invincibility_time"],
+    )
+    return World(width, height, num_obstacles=int(params["num_obstacles"]), seed=seed, difficulty=difficulty,
+                 levels=_levels)
+
+def play_game(task):
+    """进程池中执行的任务：task = (参数字典, 策略名, 种子, tick 频率)，返回一行结果"""
+    params, policy_name, seed, tick_rate = task
+    policy = POLICIES[policy_name]
+    world = make_world(params, seed)
+    dt = 1 / tick_rate
+    start = time.perf_counter()
+    catches = ticks = decisions = 0
+    # 策略按 DECISION_RATE 做决定，不同 tick 频率下老鼠的反应速度相同，比较的只是模拟本身；
+    # 两次决定之间目标点不变，加速点击只在做决定的那个 tick 生效
+    while not world.game_over:
+        if ticks * DECISION_RATE >= decisions * tick_rate:
+            inp = policy(world, decisions, DECISION_RATE)
+            decisions += 1
+        elif inp.boosts:
+            inp = GameInput(inp.target_x, inp.target_y)
+        catches += world.step(dt, inp).count("hit")
+        ticks += 1
+    elapsed = time.perf_counter() - start
+    row = dict(params)
+    row.update(policy=policy_name, seed=seed, tick_rate=tick_rate, obstacles=len(world.obstacles),
+               survival_time=round(min(world.clock, GAME_DURATION), 4), catches=catches,
+               cheese=world.scores, lives=world.lives_count, total_score=world.total_score,
+               ticks=ticks, ticks_per_sec=round(ticks / elapsed if elapsed > 0 else 0.0, 1))
+    return row
+
+
+# -------------------------------
+# 参数空间
+# -------------------------------
+def _number(text):
+    value = float(text)
+    return int(value) if value.is_integer() and "." not in text else value
+
+def parse_param(spec):
+    """name=v1,v2,... 返回 (name, [值...])；name=lo:hi 返回 (name, (lo, hi))"""
+    name, _, values = spec.partition("=")
+    if name not in DEFAULT_PARAMS:
+        raise argparse.ArgumentTypeError("未知参数 {}，可选：{}".format(name, ", ".join(PARAM_NAMES)))
+    if ":" in values:
+        low, _, high = values.partition(":")
+        return name, (_number(low), _number(high))
+    return name, [_number(v) for v in values.split(",") if v]
+
+def grid_configs(space):
+    names = list(space)
+    for name in names:
+        if isinstance(space[name], tuple):
+            raise ValueError("网格模式不支持区间参数 {}，请使用 --samples".format(name))
+    for values in itertools.product(*(space[name] for name in names)):
+        params = dict(DEFAULT_PARAMS)
+        params.update(zip(names, values))
+        yield params
+
+def random_configs(space, samples, rng):
+    for _ in range(samples):
+        params = dict(DEFAULT_PARAMS)
+        for name, choice in space.items():
+            if isinstance(choice, tuple):
+                low, high = choice
+                if isinstance(low, int) and isinstance(high, int):
+                    params[name] = rng.randint(low, high)
+                else:
+                    params[name] = round(rng.uniform(low, high), 6)
+            else:
+                params[name] = rng.choice(choice)
+        yield params
+
+def make_tasks(configs, policies, games, base_seed, tick_rate=TICK_RATE):
+    """每个参数组合在同一批种子上比较，减少不同组合之间的随机差异"""
+    for params in configs:
+        for policy in policies:
+            for game in range(games):
+                yield params, policy, base_seed + game, tick_rate
+
+
+# -------------------------------
+# 结果输出（追加写入，每局写完立即落盘）
+# -------------------------------
+class ResultWriter:
+    def __init__(self, path):
+        self.path = path
+        self.jsonl = path.endswith(".jsonl")
+        is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self.file = open(path, "a", newline="")
+        self.csv = None
+        if not self.jsonl:
+            self.csv = csv.DictWriter(self.file, fieldnames=PARAM_NAMES + RESULT_FIELDS)
+            if is_new:
+                self.csv.writeheader()
+
+    def write(self, row):
+        if self.jsonl:
+            self.file.write(json.dumps(row) + "\n")
+        else:
+            self.csv.writerow(row)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def run_sweep(tasks, writer, workers, progress=True):
+    """把任务分发到进程池，边完成边写结果；返回完成的局数"""
+    done = 0
+    start = time.perf_counter()
+    if workers == 1:
+        results = map(play_game, tasks)
+        pool = None
+    else:
+        pool = multiprocessing.Pool(workers)
+        results = pool.imap_unordered(play_game, tasks, chunksize=1)
+    try:
+        for row in results:
+            writer.write(row)
+            done += 1
+            if progress and done % 10 == 0:
+                elapsed = time.perf_counter() - start
+                print("\r已完成 {} 局，{:.1f} 局/秒".format(done, done / elapsed), end="", file=sys.stderr, flush=True)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    if progress:
+        elapsed = time.perf_counter() - start
+        print("\r已完成 {} 局，用时 {:.1f}s（{:.1f} 局/秒）".format(done, elapsed, done / max(elapsed, 1e-9)),
+              file=sys.stderr)
+    return done
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="猫捉老鼠难度参数扫描")
+    parser.add_argument("--param", action="append", type=parse_param, default=[],
+                        help="name=v1,v2,...（网格）或 name=lo:hi（随机区间）")
+    parser.add_argument("--samples", type=int, default=0, help="随机搜索的参数组合数，0 表示网格搜索")
+    parser.add_argument("--games", type=int, default=10, help="每个参数组合、每个策略跑多少局")
+    parser.add_argument("--policy", default="flee", help="老鼠策略，逗号分隔：" + ",".join(POLICIES))
+    parser.add_argument("--seed", type=int, default=0, help="第一局的种子，也是随机搜索的种子")
+    parser.add_argument("--tick-rate", type=int, default=TICK_RATE, help="每秒模拟次数，降低它可以更快地跑完一局")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--out", default="sweep.csv", help="结果文件，.jsonl 结尾写 JSONL，否则写 CSV")
+    args = parser.parse_args(argv)
+
+    space = dict(args.param)
+    policies = [p for p in args.policy.split(",") if p]
+    for policy in policies:
+        if policy not in POLICIES:
+            parser.error("未知策略 {}".format(policy))
+    if args.samples:
+        configs = random_configs(space, args.samples, random.Random(args.seed))
+    else:
+        try:
+            configs = list(grid_configs(space))
+        except ValueError as e:
+            parser.error(str(e))
+    writer = ResultWriter(args.out)
+    try:
+        run_sweep(make_tasks(configs, policies, args.games, args.seed, args.tick_rate), writer, max(args.workers, 1))
+    finally:
+        writer.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
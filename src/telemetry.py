@@ -0,0 +1,231 @@
+# ===============================
+# 遥测（默认关闭，地址带 ?telemetry=收集地址 时开启）
+# 游戏中的结构化事件（开局/结束、吃到奶酪、被抓、暂停、帧耗时摘要）先记入定长的环形缓冲区，
+# 记录只是写一个槽位，不做编码也不发请求。定时器（不在 rAF 回调里）每隔 FLUSH_INTERVAL_MS
+# 取出一批，JSON 编码后用 CompressionStream 压缩成 gzip，再 fetch 到收集地址；
+# 失败时按指数退避重试，期间新事件继续写入缓冲区，写满时丢弃最旧的（丢弃数随批次上报）。
+# 页面关闭时用 navigator.sendBeacon 把剩下的事件不压缩地发出去。
+# 本地收集器见 tools/collector.py。
+# ===============================
+import json, random
+
+TELEMETRY_CAPACITY = 512  # 环形缓冲区能保存的事件数
+BATCH_SIZE = 128  # 每批最多发送的事件数
+FLUSH_INTERVAL_MS = 10000
+BACKOFF_MIN_MS = 2000  # 第一次失败后的重试间隔，之后每次加倍
+BACKOFF_MAX_MS = 120000
+REQUEST_TIMEOUT_MS = 15000  # 请求超过这么久没有结果按失败处理
+FRAME_SUMMARY_FRAMES = 600  # 每多少帧上报一次帧耗时摘要（60 Hz 下约 10 秒）
+FRAME_BUCKETS_MS = (4, 8, 1000 / 60, 1000 / 30, 50)  # 帧耗时直方图的分界，最后一格是更长的帧
+CONTENT_TYPE = "text/plain"  # 简单请求，不触发 CORS 预检；收集器按 gzip 头判断是否压缩
+
+
+class EventRing:
+    """定长事件环形缓冲区。每个事件有递增的序号，发送成功后按序号确认（ack），
+    发送期间写满丢弃的最旧事件不会被重复确认。"""
+
+    def __init__(self, capacity=TELEMETRY_CAPACITY):
+        self.slots = [None] * capacity
+        self.capacity = capacity
+        self.head = 0  # 最旧事件所在的槽位
+        self.size = 0
+        self.first_seq = 0  # 最旧事件的序号
+        self.dropped = 0  # 累计因写满丢弃的事件数
+
+    def __len__(self):
+        return self.size
+
+    def push(self, event):
+        capacity = self.capacity
+        if self.size == capacity:
+            # 写满：覆盖最旧的事件
+            self.slots[self.head] = event
+            self.head = (self.head + 1) % capacity
+            self.first_seq += 1
+            self.dropped += 1
+        else:
+            self.slots[(self.head + self.size) % capacity] = event
+            self.size += 1
+
+    def peek(self, limit):
+        """返回 (第一个事件的序号, 最旧的至多 limit 个事件)，不移出缓冲区"""
+        count = min(limit, self.size)
+        slots, head, capacity = self.slots, self.head, self.capacity
+        return self.first_seq, [slots[(head + i) % capacity] for i in range(count)]
+
+    def ack(self, end_seq):
+        """移出序号小于 end_seq 的事件（已经因写满丢弃的不再计算）"""
+        count = min(max(end_seq - self.first_seq, 0), self.size)
+        for i in range(count):
+            self.slots[(self.head + i) % self.capacity] = None
+        self.head = (self.head + count) % self.capacity
+        self.size -= count
+        self.first_seq += count
+
+
+class FrameStats:
+    """累计帧耗时，每 FRAME_SUMMARY_FRAMES 帧产生一份摘要"""
+
+    def __init__(self, buckets=FRAME_BUCKETS_MS):
+        self.buckets = buckets
+        self.reset()
+
+    def reset(self):
+        self.frames = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.histogram = [0] * (len(self.buckets) + 1)
+
+    def add(self, ms):
+        self.frames += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+        index = 0
+        for bound in self.buckets:
+            if ms < bound:
+                break
+            index += 1
+        self.histogram[index] += 1
+
+    def summary(self):
+        return {"frames": self.frames, "mean_ms": round(self.total / self.frames, 2) if self.frames else 0.0,
+                "max_ms": round(self.max, 2), "histogram": self.histogram}
+
+
+class Telemetry:
+    def __init__(self, window, endpoint=None, capacity=TELEMETRY_CAPACITY):
+        self.window = window
+        self.endpoint = endpoint  # None 时所有接口都是空操作
+        self.ring = EventRing(capacity)
+        self.frame_stats = FrameStats()
+        self.session = "{:016x}".format(random.getrandbits(64))
+        self.in_flight = None  # 正在发送的批次 (请求编号, 结束序号, 发出时间)
+        self.requests = 0
+        self.failures = 0  # 连续失败次数
+        self.retry_at = 0.0
+        self.sent_batches = 0
+        self.timer = None
+
+    @property
+    def enabled(self):
+        return self.endpoint is not None
+
+    def start(self):
+        """开始定时发送，并在页面隐藏/关闭时把剩下的事件用 sendBeacon 发出"""
+        if not self.enabled or self.timer is not None:
+            return
+        self.timer = self.window.setInterval(self.flush, FLUSH_INTERVAL_MS)
+        self.window.bind("pagehide", self._on_hide)
+        self.window.bind("visibilitychange", self._on_hide)  # 从 document 冒泡到 window
+
+    def _now(self):
+        return self.window.performance.now()
+
+    # -------------------------------
+    # 记录（在游戏循环中调用，只写缓冲区）
+    # -------------------------------
+    def track(self, kind, **fields):
+        if self.endpoint is None:
+            return
+        fields["type"] = kind
+        fields["t"] = round(self._now())
+        self.ring.push(fields)
+
+    def record_frame(self, ms):
+        """记录一帧的工作耗时，攒够 FRAME_SUMMARY_FRAMES 帧时记一条摘要事件"""
+        if self.endpoint is None:
+            return
+        stats = self.frame_stats
+        stats.add(ms)
+        if stats.frames >= FRAME_SUMMARY_FRAMES:
+            self.flush_frames()
+
+    def flush_frames(self):
+        """把不足一个周期的帧耗时也记下来（一局结束、暂停时调用）"""
+        stats = self.frame_stats
+        if self.endpoint is None or not stats.frames:
+            return
+        self.track("frames", **stats.summary())
+        stats.reset()
+
+    # -------------------------------
+    # 发送（定时器中调用）
+    # -------------------------------
+    def _payload(self, first_seq, events):
+        return json.dumps({"session": self.session, "seq": first_seq, "dropped": self.ring.dropped,
+                           "sent": self.window.Date.now(), "events": events}, separators=(",", ":"))
+
+    def flush(self):
+        if self.endpoint is None or not self.ring.size:
+            return
+        now = self._now()
+        if self.in_flight is not None:
+            if now - self.in_flight[2] < REQUEST_TIMEOUT_MS:
+                return
+            self._failed(self.in_flight[0])  # 超时：之后再到的响应会被忽略
+        if now < self.retry_at:
+            return
+        first_seq, events = self.ring.peek(BATCH_SIZE)
+        self.requests += 1
+        request = self.requests
+        self.in_flight = (request, first_seq + len(events), now)
+        body = self._payload(first_seq, events)
+
+        def sent(response):
+            if response.ok:
+                self._succeeded(request)
+            else:
+                self._failed(request)
+
+        def failed(error):
+            self._failed(request)
+
+        def post(blob):
+            options = {"method": "POST", "body": blob, "keepalive": True, "headers": {"Content-Type": CONTENT_TYPE}}
+            self.window.fetch(self.endpoint, options).then(sent, failed)
+
+        blob = self.window.Blob.new([body], {"type": CONTENT_TYPE})
+        try:
+            gzip = self.window.CompressionStream.new("gzip")
+        except AttributeError:
+            post(blob)  # 浏览器不支持 CompressionStream 时不压缩
+            return
+        self.window.Response.new(blob.stream().pipeThrough(gzip)).blob().then(post, failed)
+
+    def _succeeded(self, request):
+        if self.in_flight is None or self.in_flight[0] != request:
+            return
+        self.ring.ack(self.in_flight[1])
+        self.in_flight = None
+        self.failures = 0
+        self.retry_at = 0.0
+        self.sent_batches += 1
+        if self.ring.size >= BATCH_SIZE:
+            self.window.setTimeout(self.flush, 0)  # 积压较多时不等下一个周期
+
+    def _failed(self, request):
+        if self.in_flight is None or self.in_flight[0] != request:
+            return
+        self.in_flight = None
+        self.failures += 1
+        # 指数退避并加随机抖动，避免大量终端同时重试
+        delay = min(BACKOFF_MIN_MS * 2 ** (self.failures - 1), BACKOFF_MAX_MS)
+        self.retry_at = self._now() + delay * random.uniform(0.5, 1.0)
+
+    def _on_hide(self, event):
+        if event.type == "visibilitychange" and self.window.document.visibilityState != "hidden":
+            return
+        self.flush_frames()
+        self.beacon()
+
+    def beacon(self):
+        """页面即将关闭：不等响应，用 sendBeacon 发出缓冲区中的全部事件"""
+        if self.endpoint is None:
+            return
+        ring = self.ring
+        while ring.size:
+            first_seq, events = ring.peek(BATCH_SIZE)
+            if not self.window.navigator.sendBeacon(self.endpoint, self._payload(first_seq, events)):
+                break  # 浏览器拒绝排队（超出 beacon 配额），剩下的留在缓冲区
+            ring.ack(first_seq + len(events))
@@ -0,0 +1,45 @@
+# ===============================
+# 固定步长调度器
+# 渲染频率由 requestAnimationFrame 决定（60/120/144 Hz 都可能），
+# 模拟则始终以固定的 tick 频率推进：每帧把真实经过的时间放进累加器，
+# 按整 tick 取出执行，剩余的不足一个 tick 的部分用于渲染插值。
+# ===============================
+
+TICK_RATE = 60  # 每秒模拟次数
+MAX_CATCH_UP_STEPS = 5  # 单帧最多补跑的 tick 数，超出的时间直接丢弃
+
+class FixedStepScheduler:
+    def __init__(self, tick_rate=TICK_RATE, max_steps=MAX_CATCH_UP_STEPS):
+        self.tick_rate = tick_rate
+        self.dt = 1 / tick_rate
+        self.max_steps = max_steps
+        self.reset()
+
+    def reset(self):
+        """丢弃累计的时间，下一帧重新以该帧时间戳为起点"""
+        self.accumulator = 0.0
+        self.last_timestamp = None
+        self.dropped_time = 0.0
+
+    def advance(self, timestamp):
+        """传入 rAF 时间戳（毫秒），返回本帧需要执行的 tick 数"""
+        if self.last_timestamp is None:
+            elapsed = 0.0
+        else:
+            elapsed = max(timestamp - self.last_timestamp, 0) / 1000
+        self.last_timestamp = timestamp
+        self.accumulator += elapsed
+        steps = int(self.accumulator / self.dt)
+        if steps > self.max_steps:
+            # 负载过高或标签页刚切回来：只补跑 max_steps 次，避免越跑越慢
+            self.dropped_time += (steps - self.max_steps) * self.dt
+            steps = self.max_steps
+            self.accumulator -= (self.accumulator // self.dt) * self.dt
+        else:
+            self.accumulator -= steps * self.dt
+        return steps
+
+    @property
+    def alpha(self):
+        """渲染插值系数：当前时刻处于上一 tick 与下一 tick 之间的位置（0~1）"""
+        return min(self.accumulator / self.dt, 1.0)
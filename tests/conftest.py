@@ -0,0 +1,4 @@
+import os, sys
+
+# 游戏模块在 src/ 下，按 dev.html 的 pythonpath 直接按模块名导入
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
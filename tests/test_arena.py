@@ -0,0 +1,37 @@
+from arena import ArenaWorld, CHUNK_SIZE
+
+
+def cheese_positions(world):
+    return sorted((cheese.x, cheese.y) for cheese in world.cheeses)
+
+
+def saved_count(world):
+    return sum(len(spots) for spots in world.saved_cheeses.values())
+
+
+def move_both(world, x, y):
+    world.rat.move_to(x, y)
+    world.cat.move_to(x + 20, y)
+    world.stream()
+
+
+def test_evicted_chunks_keep_their_cheeses():
+    world = ArenaWorld(CHUNK_SIZE * 30, CHUNK_SIZE * 20, seed=4)
+    chunks = world.obstacles
+    home = (world.rat.x, world.rat.y)
+    before = cheese_positions(world)
+    assert before and not world.saved_cheeses
+
+    # 跑到地图另一头：出发时的块全部被淘汰，块上的奶酪记下来而不是丢掉
+    move_both(world, CHUNK_SIZE * 29, CHUNK_SIZE * 19)
+    assert chunks.evicted > 0
+    far = cheese_positions(world)
+    assert not set(before) & set(far)
+    assert saved_count(world) == len(before)
+
+    # 回来时块重新生成，奶酪恢复到原来的位置，远处的块又被淘汰
+    generated = chunks.generated
+    move_both(world, *home)
+    assert chunks.generated > generated
+    assert cheese_positions(world) == before
+    assert saved_count(world) == len(far)
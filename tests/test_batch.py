@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from batch import BatchSimulation, _FAR
+from engine import World, GameInput, OBSTACLE_COUNT, OBSTACLE_GAP
+
+
+def scripted_targets(tick, tick_rate, count):
+    """每 40 帧（按 60 Hz 计）换一次目标点，不同对局的目标错开"""
+    phase = tick * 60 // tick_rate // 40
+    tx = np.array([200 + (phase * 97 + 31 * i) % 400 for i in range(count)], dtype=np.float64)
+    ty = np.array([150 + (phase * 53 + 17 * i) % 300 for i in range(count)], dtype=np.float64)
+    return tx, ty
+
+
+@pytest.mark.parametrize("tick_rate, cheeses", [(60, 0), (10, 3)])
+def test_batch_matches_world_step(tick_rate, cheeses):
+    # 同样的初始状态和输入：到每局第一次出事件（吃到奶酪、被抓）为止，位置和速度与 World.step 一致，
+    # 出事件的那一帧比分和命数也一致（之后两边的随机数序列不同，不再比较）
+    worlds = [World(seed=seed, cat_navigation=False, initial_cheeses=cheeses) for seed in range(12)]
+    sim = BatchSimulation.from_worlds(worlds, seed=0)
+    dt = 1 / tick_rate
+    synced = np.ones(len(worlds), dtype=bool)
+    compared = escaping = 0
+    for tick in range(40 * tick_rate):
+        tx, ty = scripted_targets(tick, tick_rate, len(worlds))
+        events = [world.step(dt, GameInput(int(tx[i]), int(ty[i]))) for i, world in enumerate(worlds)]
+        sim.step(dt, tx, ty)
+        escaping += sim.cat_escaping[synced].sum()
+        for i in np.nonzero(synced)[0]:
+            world = worlds[i]
+            assert (sim.scores[i], sim.lives[i], sim.done[i]) == (world.scores, world.lives_count, world.game_over)
+            if events[i]:
+                synced[i] = False
+                continue
+            expected = (world.rat.x, world.rat.y, world.rat.speed, world.cat.x, world.cat.y, world.cat.speed)
+            actual = (sim.rat_x[i], sim.rat_y[i], sim.rat_speed[i], sim.cat_x[i], sim.cat_y[i], sim.cat_speed[i])
+            assert actual == pytest.approx(expected, abs=1e-6)
+            compared += 1
+        if not synced.any():
+            break
+    # 比较了足够多的帧，并且覆盖了猫卡住后脱困的分支
+    assert compared >= 100 * len(worlds) // (60 // tick_rate)
+    assert escaping > 0
+
+
+def test_obstacle_layout_keeps_the_gap():
+    sim = BatchSimulation(200, seed=1)
+    assert (sim.obstacles >= OBSTACLE_COUNT - 2).all()
+    left, top, right, bottom = (sim.obstacle_rects[..., i] for i in range(4))
+    placed = left > _FAR
+    # 两两之间沿最佳轴的间隙
+    gap = np.maximum(np.maximum(left[:, :, None] - right[:, None, :], left[:, None, :] - right[:, :, None]),
+                     np.maximum(top[:, :, None] - bottom[:, None, :], top[:, None, :] - bottom[:, :, None]))
+    pairs = placed[:, :, None] & placed[:, None, :] & ~np.eye(OBSTACLE_COUNT, dtype=bool)
+    assert (gap[pairs] >= OBSTACLE_GAP).all()
@@ -0,0 +1,77 @@
+import pytest
+
+from collision import sweep_box, first_contact, move_and_slide, segment_hits_box, SKIN
+from engine import Obstacle
+from geometry import Rect
+from spatial import ObstacleGrid
+
+
+def grid(*rects):
+    return ObstacleGrid([Obstacle(x, y, width, height, (0, 0, 0)) for x, y, width, height in rects])
+
+
+def test_sweep_box_finds_thin_wall_on_a_long_step():
+    # 终点已经越过墙，只检测终点时会穿过去
+    hit = sweep_box(0, 0, 10, 10, 200, 0, Rect(100, -20, 2, 50))
+    assert hit == pytest.approx((0.45, -1, 0))
+
+
+def test_sweep_box_ignores_misses_and_touching():
+    assert sweep_box(0, 0, 10, 10, 200, 0, Rect(100, 20, 2, 50)) is None
+    assert sweep_box(0, 0, 10, 10, 50, 0, Rect(100, -20, 2, 50)) is None
+    # 贴着边缘滑过不算接触
+    assert sweep_box(0, 0, 10, 10, 0, 100, Rect(10, -50, 20, 200)) is None
+    # 起点已经重叠时允许移出
+    assert sweep_box(0, 0, 10, 10, -5, 0, Rect(5, 0, 10, 10)) is None
+
+
+def test_first_contact_takes_the_earliest_obstacle():
+    obstacles = grid((300, -20, 2, 50), (150, -20, 2, 50))
+    t, nx, ny = first_contact(0, 0, 10, 10, 400, 0, obstacles)
+    assert (t, nx, ny) == pytest.approx(((150 - 10) / 400, -1, 0))
+
+
+def test_move_and_slide_does_not_tunnel():
+    rect = Rect(0, 0, 10, 10)
+    move_and_slide(rect, 500, 0, grid((100, -20, 2, 50)))
+    assert rect.x == pytest.approx(90 - SKIN)
+    assert rect.y == 0
+
+
+def test_move_and_slide_keeps_the_tangential_part():
+    rect = Rect(0, 0, 10, 10)
+    move_and_slide(rect, 40, 40, grid((20, -100, 10, 300)))
+    assert rect.x == pytest.approx(10 - SKIN)
+    assert rect.y == pytest.approx(40)
+
+
+def test_move_and_slide_stops_in_an_inside_corner():
+    # 右边和下边各一堵墙，斜着冲进墙角：两次接触后停在角里
+    obstacles = grid((30, -100, 10, 300), (-100, 30, 130, 10))
+    rect = Rect(0, 0, 10, 10)
+    move_and_slide(rect, 100, 100, obstacles)
+    assert rect.x == pytest.approx(20 - SKIN)
+    assert rect.y == pytest.approx(20 - SKIN)
+    assert not obstacles.collides(rect)
+
+
+def test_move_and_slide_past_an_outside_corner():
+    # 正对障碍物的角斜着撞上去：不会卡进角里，也不会穿过去
+    obstacles = grid((20, 20, 20, 20))
+    rect = Rect(0, 0, 10, 10)
+    move_and_slide(rect, 30, 30, obstacles)
+    assert not obstacles.collides(rect)
+    assert rect.x > 0 or rect.y > 0
+
+
+@pytest.mark.parametrize("start, end, expected", [
+    ((-50, 0), (50, 0), True),  # 两端都在框外，中间穿过
+    ((-50, 20), (50, 20), False),
+    ((-50, -50), (50, 50), True),
+    ((-50, 50), (50, -30), True),
+    ((10, 10), (30, 30), False),
+    ((0, 0), (0, 0), True),
+    ((10, 0), (10, 0), False),  # 刚好在边上不算
+])
+def test_segment_hits_box(start, end, expected):
+    assert segment_hits_box(start[0], start[1], end[0], end[1], 10) is expected
@@ -0,0 +1,38 @@
+import random
+
+from engine import (World, initialize_obstacles, OBSTACLE_COUNT, BASE_OBSTACLE_SIZE_LOW, BASE_OBSTACLE_SIZE_HIGH,
+                    DESIGN_WIDTH, DESIGN_HEIGHT)
+from levels import LevelCache
+
+
+def test_standard_map_fits_obstacle_count():
+    placed = [len(initialize_obstacles(OBSTACLE_COUNT, DESIGN_WIDTH, DESIGN_HEIGHT, BASE_OBSTACLE_SIZE_LOW,
+                                       BASE_OBSTACLE_SIZE_HIGH, random.Random(seed)))
+              for seed in range(100)]
+    assert max(placed) == OBSTACLE_COUNT
+    assert sum(count == OBSTACLE_COUNT for count in placed) >= 80
+    assert min(placed) >= OBSTACLE_COUNT - 2
+
+
+def test_world_reports_requested_and_placed_counts():
+    world = World(seed=3, num_obstacles=40)
+    assert world.num_obstacles == 40
+    assert len(world.obstacles) < 40
+
+
+def test_level_cache_evicts_the_least_recently_used():
+    world = World(seed=0, num_obstacles=5)
+    a, b, c = (world.level_key(seed) for seed in (1, 2, 3))
+    cache = LevelCache(capacity=2)
+    level_a = cache.get(a)
+    cache.get(b)
+    assert cache.get(a) is level_a  # a 变成最近使用的
+    cache.get(c)
+    assert a in cache and c in cache and b not in cache
+    assert (cache.hits, cache.misses, cache.evictions) == (1, 3, 1)
+    # prewarm 只更新使用顺序，不计入命中统计
+    cache.prewarm(a)
+    cache.prewarm(b)
+    assert a in cache and b in cache and c not in cache
+    assert (cache.hits, cache.misses, cache.evictions) == (1, 3, 2)
+    assert len(cache) == 2
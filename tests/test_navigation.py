@@ -0,0 +1,86 @@
+import random
+
+import pytest
+
+from engine import World
+from navigation import FlowField, FlowSearch, NavGrid, NO_DIRECTION
+
+
+def full_rebuild(grid, target):
+    """参照实现：一次算完整张图的 BFS 距离场和每个格子的方向"""
+    distance = [None] * (grid.cols * grid.rows)
+    distance[target] = 0
+    frontier = [target]
+    while frontier:
+        next_frontier = []
+        for index in frontier:
+            for other, _ in grid.neighbours[index]:
+                if distance[other] is None:
+                    distance[other] = distance[index] + 1
+                    next_frontier.append(other)
+        frontier = next_frontier
+    flow = []
+    for index in range(len(distance)):
+        best = None if grid.blocked[index] else distance[index]
+        best_direction = NO_DIRECTION
+        for other, direction in grid.neighbours[index]:
+            d = distance[other]
+            if d is not None and (best is None or d < best):
+                best, best_direction = d, direction
+        flow.append(best_direction)
+    return flow
+
+
+def level_grid(seed, width=800, height=600, obstacles=20):
+    return World(width, height, num_obstacles=obstacles, seed=seed).level.nav_grid
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_partial_search_matches_full_rebuild(seed):
+    grid = level_grid(seed)
+    rng = random.Random(seed)
+    target = rng.randrange(grid.cols * grid.rows)
+    expected = full_rebuild(grid, target)
+    search = FlowSearch(grid, target)
+    # 按随机顺序查询，每次只展开到查询的格子
+    cells = list(range(grid.cols * grid.rows))
+    rng.shuffle(cells)
+    for index in cells:
+        search.expand_to(index, 1 << 30)
+        if search.settled(index):
+            assert search.direction(index) == expected[index]
+        else:
+            assert search.done and expected[index] == NO_DIRECTION
+
+
+def test_budgeted_field_catches_up_with_moving_target():
+    grid = level_grid(3, 2000, 1500, 60)
+    field = FlowField(grid, budget=50)
+    rng = random.Random(3)
+    free = [i for i, blocked in enumerate(grid.blocked) if not blocked]
+    size = grid.cell_size
+    cat = free[0]
+    for tick in range(400):
+        if tick % 7 == 0:
+            rat = rng.choice(free)
+        field.update((rat % grid.cols + 0.5) * size, (rat // grid.cols + 0.5) * size)
+        field.waypoint_at((cat % grid.cols + 0.5) * size, (cat // grid.cols + 0.5) * size)
+    # 目标不再变化后，若干 tick 内追上并与完整重建一致
+    for _ in range(grid.cols * grid.rows // 50 + 2):
+        field.update((rat % grid.cols + 0.5) * size, (rat // grid.cols + 0.5) * size)
+        field.waypoint_at((cat % grid.cols + 0.5) * size, (cat // grid.cols + 0.5) * size)
+    assert field.search is None and field.field.target == rat
+    expected = full_rebuild(grid, rat)
+    assert field.field.settled(cat)
+    assert field.field.direction(cat) == expected[cat]
+    for index in range(grid.cols * grid.rows):
+        if field.field.settled(index):
+            assert field.field.direction(index) == expected[index]
+
+
+def test_update_only_restarts_when_target_changes_cell():
+    grid = level_grid(0)
+    field = FlowField(grid)
+    assert field.update(10, 10)
+    assert not field.update(12, 15)
+    assert field.rebuilds == 1
@@ -0,0 +1,83 @@
+import pytest
+
+from engine import World, GameInput, FRAME_TIME
+from levels import LevelCache
+from replay import InputRecorder, Recording, replay, _write_varint, _read_varint, _zigzag, _unzigzag
+
+
+def record_game(seed, cat_navigation=True, initial_cheeses=3, ticks=None, **kwargs):
+    """老鼠绕着地图中心跑、不时加速，返回 (录像, 录制时的 world)"""
+    world = World(seed=seed, cat_navigation=cat_navigation, initial_cheeses=initial_cheeses, **kwargs)
+    recorder = InputRecorder(world, 60)
+    tick = 0
+    while not world.game_over and (ticks is None or tick < ticks):
+        # 隔一段时间才换目标，录像里会出现游程
+        phase = tick // 30
+        inp = GameInput(200 + (phase * 97) % 400, 150 + (phase * 53) % 300, 2 if tick % 45 == 0 else 0)
+        recorder.record(inp)
+        world.step(FRAME_TIME, inp)
+        tick += 1
+    return recorder.to_bytes(world), world
+
+
+@pytest.mark.parametrize("cat_navigation", [True, False])
+def test_round_trip(cat_navigation):
+    data, recorded = record_game(5, cat_navigation)
+    world, ok = replay(data)
+    assert ok
+    assert world.state_hash() == recorded.state_hash()
+    assert (world.scores, world.lives_count, world.clock) == (recorded.scores, recorded.lives_count, recorded.clock)
+
+
+def test_round_trip_with_shared_level_cache():
+    levels = LevelCache()
+    data, _ = record_game(9, ticks=300)
+    assert replay(data, levels)[1]
+    assert replay(data, levels)[1]
+    assert levels.hits == 1 and levels.misses == 1
+
+
+def test_header_fields_survive_serialisation():
+    data, recorded = record_game(2, cat_navigation=False, initial_cheeses=300, ticks=60, width=2000, height=1500)
+    recording = Recording(data)
+    assert (recording.seed, recording.width, recording.height) == (2, 2000, 1500)
+    assert recording.initial_cheeses == 300
+    assert not recording.cat_navigation
+    assert recording.ticks == 60
+    assert sum(1 for _ in recording.inputs()) == 60
+    assert replay(data)[1]
+
+
+def test_tampered_input_is_detected():
+    data, _ = record_game(1, ticks=600)
+    body_start = len(data) - len(Recording(data).body)
+    tampered = bytearray(data)
+    # 第一条记录是标志字节 + dx 的 varint，改掉 dx 的最低位
+    tampered[body_start + 1] ^= 0x02
+    assert not replay(bytes(tampered))[1]
+
+
+def test_rejects_foreign_data():
+    with pytest.raises(ValueError):
+        Recording(b"not a recording")
+
+
+@pytest.mark.parametrize("value, size", [(0, 1), (127, 1), (128, 2), (16383, 2), (16384, 3), (2 ** 40 + 5, 6)])
+def test_varint_round_trip(value, size):
+    out = bytearray(b"x")
+    _write_varint(out, value)
+    assert len(out) == 1 + size
+    assert _read_varint(bytes(out), 1) == (value, 1 + size)
+
+
+def test_truncated_varint_is_rejected():
+    out = bytearray()
+    _write_varint(out, 300)
+    with pytest.raises(ValueError):
+        _read_varint(bytes(out[:-1]), 0)
+
+
+@pytest.mark.parametrize("value, encoded", [(0, 0), (-1, 1), (1, 2), (-2, 3), (2, 4), (-800, 1599), (800, 1600)])
+def test_zigzag(value, encoded):
+    assert _zigzag(value) == encoded
+    assert _unzigzag(encoded) == value
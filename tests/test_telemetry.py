@@ -0,0 +1,41 @@
+from telemetry import EventRing
+
+
+def test_ring_keeps_the_newest_events_when_full():
+    ring = EventRing(4)
+    for i in range(10):
+        ring.push(i)
+    assert len(ring) == 4
+    assert ring.dropped == 6
+    assert ring.peek(10) == (6, [6, 7, 8, 9])
+    assert ring.peek(2) == (6, [6, 7])
+
+
+def test_ack_after_overflow_during_a_send():
+    ring = EventRing(4)
+    for i in range(3):
+        ring.push(i)
+    first_seq, batch = ring.peek(3)
+    assert (first_seq, batch) == (0, [0, 1, 2])
+    # 请求还在路上时又写入 5 个事件，已经发出去的 0..2 全部被挤掉
+    for i in range(3, 8):
+        ring.push(i)
+    ring.ack(first_seq + len(batch))
+    # 确认不能把还没发送的事件一起移走
+    assert ring.peek(10) == (4, [4, 5, 6, 7])
+    assert ring.dropped == 4
+
+
+def test_ack_removes_only_the_sent_prefix():
+    ring = EventRing(4)
+    for i in range(6):
+        ring.push(i)
+    ring.ack(4)
+    assert ring.peek(10) == (4, [4, 5])
+    ring.push(6)
+    ring.push(7)
+    ring.push(8)
+    assert ring.peek(10) == (5, [5, 6, 7, 8])
+    ring.ack(100)
+    assert len(ring) == 0
+    assert ring.peek(10) == (9, [])
@@ -0,0 +1,49 @@
+import pytest
+
+from engine import GameInput, Rat, rat_travel_speed, RAT_SPEED_DECAY
+from sweep import make_world, POLICIES, DEFAULT_PARAMS, DECISION_RATE
+
+TICK_RATES = (10, 30, 60)
+
+
+def catch_times(policy_name, seed, tick_rate):
+    """按 sweep.play_game 的方式跑一局，返回每次被抓的时刻"""
+    policy = POLICIES[policy_name]
+    world = make_world(dict(DEFAULT_PARAMS), seed)
+    dt = 1 / tick_rate
+    ticks = decisions = 0
+    times = []
+    while not world.game_over:
+        if ticks * DECISION_RATE >= decisions * tick_rate:
+            inp = policy(world, decisions, DECISION_RATE)
+            decisions += 1
+        elif inp.boosts:
+            inp = GameInput(inp.target_x, inp.target_y)
+        if "hit" in world.step(dt, inp):
+            times.append(world.clock)
+        ticks += 1
+    return times
+
+
+@pytest.mark.parametrize("policy_name, seed", [("idle", 2), ("idle", 7), ("flee", 1), ("flee", 5)])
+def test_outcome_does_not_depend_on_tick_rate(policy_name, seed):
+    reference = catch_times(policy_name, seed, TICK_RATES[-1])
+    assert reference
+    for tick_rate in TICK_RATES[:-1]:
+        times = catch_times(policy_name, seed, tick_rate)
+        assert len(times) == len(reference)
+        # 抓捕时刻只能对齐到 tick，10 Hz 下本身就有 0.1 秒的量化误差
+        assert times == pytest.approx(reference, abs=0.5)
+
+
+@pytest.mark.parametrize("speed", [300, 70, 20])
+def test_rat_covers_the_same_distance_at_any_step(speed):
+    def run(tick_rate):
+        rat = Rat(speed, 5, 0, 0)
+        dt = 1 / tick_rate
+        for _ in range(tick_rate * 2):
+            rat.track(10000, 0, rat_travel_speed(rat.speed, rat.min_speed, dt), delta_time=dt)
+            rat.speed = max(rat.min_speed, rat.speed - RAT_SPEED_DECAY * dt)
+        return rat.x
+
+    assert run(10) == pytest.approx(run(60), abs=1e-6)
@@ -0,0 +1,234 @@
+"""离线打包：生成不依赖 CDN、可直接部署的 dist/ 目录。
+
+用法：
+    python tools/build.py                                   # 使用已缓存或 pip 安装的 Brython，缺失时从 CDN 下载一次
+    python tools/build.py --brython path/to/brython/data    # 指定 brython.js / brython_stdlib.js 所在目录（离线构建）
+    python tools/build.py --out dist --include re           # 额外打包某些标准库模块
+
+生成的 dist/ 包含：
+    brython.js            Brython 运行时（本地副本）
+    brython_modules.js    裁剪后的虚拟文件系统：游戏自身的模块 + 它们用到的标准库模块（传递闭包）
+    index.html            入口页：仓库根目录的 index.html，脚本路径改为同目录下的上面两个文件
+    resources/ 等静态资源
+
+游戏模块放进虚拟文件系统后，浏览器不再逐个请求 src/*.py；Brython 第一次运行时把
+虚拟文件系统中的模块编译成 JS 并存入 indexedDB，之后的加载直接使用编译结果
+（每次构建更新 VFS_timestamp，缓存随之失效）。构建时还会先用 CPython 编译一遍全部模块，
+有语法错误时直接失败，而不是等到浏览器里才发现。
+"""
+import argparse, ast, json, os, shutil, sys, time, urllib.request
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(TOOLS_DIR)
+SRC_DIR = os.path.join(ROOT, "src")
+INDEX_PATH = os.path.join(ROOT, "index.html")  # 部署入口页（开发用的 dev.html 从 CDN 加载，不参与打包）
+STATIC_ITEMS = ("resources", "logo.png")  # 原样复制到输出目录
+DEFAULT_OUT = os.path.join(ROOT, "dist")
+
+BRYTHON_VERSION = "3.10.5"  # 与 dev.html 中 CDN 地址的版本一致
+BRYTHON_FILES = ("brython.js", "brython_stdlib.js")
+CDN_URL = "https://cdn.jsdelivr.net/npm/brython@{version}/{name}"
+CACHE_DIR = os.path.join(ROOT, "vendor", "brython-" + BRYTHON_VERSION)
+ENTRY_MODULE = "main"
+
+# index.html 从仓库根目录加载 dist/ 下的脚本，复制到 dist/ 时改为同目录
+ROOT_SCRIPTS = ('<script src="dist/brython.js"></script>', '<script src="dist/brython_modules.js"></script>')
+LOCAL_SCRIPTS = ('<script src="brython.js"></script>', '<script src="brython_modules.js"></script>')
+
+
+# ===============================
+# Brython 运行时
+# ===============================
+def _has_brython(directory):
+    return directory and all(os.path.exists(os.path.join(directory, name)) for name in BRYTHON_FILES)
+
+def find_brython(directory=None, offline=False):
+    """返回 brython.js / brython_stdlib.js 所在目录：命令行指定 > pip 安装的 brython 包 > 本地缓存 > CDN 下载"""
+    if directory is not None:
+        if not _has_brython(directory):
+            raise SystemExit("{} 中没有 {}".format(directory, " / ".join(BRYTHON_FILES)))
+        return directory
+    try:
+        import brython
+        installed = os.path.join(os.path.dirname(brython.__file__), "data")
+        if _has_brython(installed):
+            return installed
+    except ImportError:
+        pass
+    if _has_brython(CACHE_DIR):
+        return CACHE_DIR
+    if offline:
+        raise SystemExit("找不到 Brython，请用 --brython 指定目录或先联网构建一次")
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    for name in BRYTHON_FILES:
+        url = CDN_URL.format(version=BRYTHON_VERSION, name=name)
+        print("下载", url)
+        with urllib.request.urlopen(url) as response, open(os.path.join(CACHE_DIR, name), "wb") as out:
+            shutil.copyfileobj(response, out)
+    return CACHE_DIR
+
+def load_stdlib(path):
+    """解析 brython_stdlib.js，返回 {模块名: [扩展名, 源码, 依赖列表(, 是否为包)]}"""
+    with open(path, encoding="utf-8") as f:
+        content = f.read()
+    start = content.index("{")
+    end = content.index("__BRYTHON__.update_VFS(")
+    vfs = json.loads(content[start:end].strip().rstrip(";"))
+    vfs.pop("$timestamp", None)
+    return vfs
+
+
+# ===============================
+# 依赖分析
+# ===============================
+def imports_of(source, filename, package=None):
+    """模块导入时就会执行的绝对导入（模块顶层、if/try/类定义中的导入）。
+
+    函数内部的延迟导入不算：标准库里大量这样的导入在游戏中永远不会执行，
+    全部带上会把闭包扩大到上百个模块。package 用于解析包内的相对导入。
+    """
+    names = set()
+    pending = list(ast.parse(source, filename).body)
+    while pending:
+        node = pending.pop()
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)):
+            continue
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            if node.level == 0:
+                base = node.module
+            elif package:
+                parts = package.split(".")
+                parts = parts[:len(parts) - node.level + 1]
+                base = ".".join(parts + ([node.module] if node.module else []))
+            else:
+                base = None
+            if base:
+                names.add(base)
+                # from 包 import 子模块
+                names.update(base + "." + alias.name for alias in node.names if alias.name != "*")
+        pending.extend(ast.iter_child_nodes(node))
+    return names
+
+def game_modules(src_dir, entry=ENTRY_MODULE):
+    """从入口模块出发找出前端实际用到的 src/ 模块（离线工具如 sweep.py 不会被带上）。
+
+    返回 ({模块名: (源码, 依赖)}, 外部依赖集合)。
+    """
+    modules, external = {}, set()
+    pending = [entry]
+    while pending:
+        name = pending.pop()
+        if name in modules:
+            continue
+        path = os.path.join(src_dir, name + ".py")
+        with open(path, encoding="utf-8") as f:
+            source = f.read()
+        compile(source, path, "exec")  # 预编译检查，语法错误在构建时就暴露
+        deps = imports_of(source, path)
+        modules[name] = (source, deps)
+        for dep in deps:
+            if os.path.exists(os.path.join(src_dir, dep.split(".")[0] + ".py")):
+                pending.append(dep.split(".")[0])
+            else:
+                external.add(dep)
+    return modules, external
+
+def stdlib_closure(stdlib, roots):
+    """roots 在 Brython 标准库中的传递闭包（含上级包）；返回 (模块名集合, 找不到的模块集合)"""
+    found, missing = set(), set()
+    pending = list(roots)
+    while pending:
+        name = pending.pop()
+        if name in found or name in missing:
+            continue
+        if name not in stdlib:
+            parent = name.rpartition(".")[0]
+            if parent not in stdlib and parent not in missing:
+                missing.add(name)  # brython.js 内置的模块（如 javascript、_sys）也会落到这里
+            continue  # 否则是 from 包 import 名称 中的普通名称，不是子模块
+        found.add(name)
+        entry = stdlib[name]
+        if entry[0] == ".py":
+            package = name if len(entry) > 3 else name.rpartition(".")[0]
+            pending.extend(imports_of(entry[1], name, package))
+        parts = name.split(".")
+        pending.extend(".".join(parts[:i]) for i in range(1, len(parts)))
+    return found, missing
+
+
+# ===============================
+# 输出
+# ===============================
+def write_modules(path, stdlib, stdlib_names, modules):
+    timestamp = int(time.time() * 1000)
+    vfs = {"$timestamp": timestamp}
+    for name in sorted(stdlib_names):
+        vfs[name] = stdlib[name]
+    for name, (source, deps) in sorted(modules.items()):
+        vfs[name] = [".py", source, sorted(deps)]
+    with open(path, "w", encoding="utf-8") as out:
+        out.write("__BRYTHON__.VFS_timestamp = {}\n".format(timestamp))
+        out.write("__BRYTHON__.use_VFS = true\nvar scripts = ")
+        json.dump(vfs, out, ensure_ascii=False)
+        out.write("\n__BRYTHON__.update_VFS(scripts)\n")
+
+def write_index(path):
+    with open(INDEX_PATH, encoding="utf-8") as f:
+        html = f.read()
+    for old, new in zip(ROOT_SCRIPTS, LOCAL_SCRIPTS):
+        if old not in html:
+            raise SystemExit("index.html 中找不到 {}，请同步更新 tools/build.py".format(old))
+        html = html.replace(old, new)
+    with open(path, "w", encoding="utf-8") as out:
+        out.write(html)
+
+def copy_static(out_dir):
+    for item in STATIC_ITEMS:
+        src = os.path.join(ROOT, item)
+        dst = os.path.join(out_dir, item)
+        if os.path.isdir(src):
+            shutil.copytree(src, dst, dirs_exist_ok=True)
+        elif os.path.exists(src):
+            shutil.copy2(src, dst)
+
+def _kb(path):
+    return os.path.getsize(path) / 1024
+
+
+def build(out_dir, brython_dir=None, offline=False, include=()):
+    brython_dir = find_brython(brython_dir, offline)
+    stdlib_path = os.path.join(brython_dir, "brython_stdlib.js")
+    stdlib = load_stdlib(stdlib_path)
+    modules, external = game_modules(SRC_DIR)
+    stdlib_names, missing = stdlib_closure(stdlib, external | set(include))
+
+    os.makedirs(out_dir, exist_ok=True)
+    shutil.copy2(os.path.join(brython_dir, "brython.js"), os.path.join(out_dir, "brython.js"))
+    modules_path = os.path.join(out_dir, "brython_modules.js")
+    write_modules(modules_path, stdlib, stdlib_names, modules)
+    write_index(os.path.join(out_dir, "index.html"))
+    copy_static(out_dir)
+
+    print("游戏模块 {} 个：{}".format(len(modules), ", ".join(sorted(modules))))
+    print("标准库模块 {} / {} 个：{}".format(len(stdlib_names), len(stdlib), ", ".join(sorted(stdlib_names))))
+    if missing:
+        print("未在标准库中找到（按 brython.js 内置处理）：{}".format(", ".join(sorted(missing))))
+    print("brython_stdlib.js {:.0f} KB -> brython_modules.js {:.0f} KB".format(_kb(stdlib_path), _kb(modules_path)))
+    print("输出目录：{}".format(out_dir))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="猫捉老鼠游戏离线打包")
+    parser.add_argument("--out", default=DEFAULT_OUT, help="输出目录")
+    parser.add_argument("--brython", help="brython.js 与 brython_stdlib.js 所在目录")
+    parser.add_argument("--offline", action="store_true", help="找不到本地 Brython 时直接失败，不联网下载")
+    parser.add_argument("--include", action="append", default=[], help="额外打包的标准库模块（可重复）")
+    args = parser.parse_args(argv)
+    build(args.out, args.brython, args.offline, args.include)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+"""本地遥测收集器：接收 src/telemetry.py 发来的批次，逐条追加到 JSON Lines 文件。
+
+用法：
+    python tools/collector.py                                 # 监听 127.0.0.1:8765，写入 telemetry.jsonl
+    python tools/collector.py --port 9000 --out /tmp/t.jsonl
+    python tools/collector.py --fail-rate 0.5                 # 随机拒收一半请求，检验客户端的退避重试
+
+游戏地址加上 ?telemetry=http://127.0.0.1:8765/events 即可把遥测发到这里。
+批次可能是 gzip 压缩的（fetch）或未压缩的（sendBeacon），按内容头部判断。
+重试或 sendBeacon 可能重复发送同一批事件，按 (会话, 序号) 去重后再写入。
+每行是一个事件，附带 session、seq 和收到时间 received（毫秒）。
+"""
+import argparse, gzip, json, random, sys, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_OUT = "telemetry.jsonl"
+ENDPOINT_PATH = "/events"
+MAX_BODY_BYTES = 1 << 20
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+def decode_batch(body):
+    """请求正文 -> 批次字典；格式不对时抛出 ValueError"""
+    if body[:2] == GZIP_MAGIC:
+        body = gzip.decompress(body)
+    batch = json.loads(body.decode("utf-8"))
+    if not isinstance(batch, dict) or not isinstance(batch.get("events"), list):
+        raise ValueError("缺少 events 列表")
+    return batch
+
+
+class Collector:
+    def __init__(self, out_path, fail_rate=0.0):
+        self.out = open(out_path, "a", encoding="utf-8")
+        self.fail_rate = fail_rate
+        self.lock = threading.Lock()
+        self.seen = {}  # 会话 -> 已写入的最大序号 + 1
+        self.events = 0
+        self.duplicates = 0
+
+    def accept(self, batch):
+        """写入批次中没有见过的事件，返回 (写入数, 重复数)"""
+        session = str(batch.get("session"))
+        first_seq = int(batch.get("seq", 0))
+        received = int(time.time() * 1000)
+        with self.lock:
+            next_seq = self.seen.get(session, 0)
+            written = duplicates = 0
+            for i, event in enumerate(batch["events"]):
+                seq = first_seq + i
+                if seq < next_seq:
+                    duplicates += 1
+                    continue
+                record = dict(event, session=session, seq=seq, received=received)
+                self.out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                written += 1
+                next_seq = seq + 1
+            self.out.flush()
+            self.seen[session] = next_seq
+            self.events += written
+            self.duplicates += duplicates
+        return written, duplicates
+
+
+def make_handler(collector):
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self, status):
+            self.send_response(status)
+            self.send_header("Access-Control-Allow-Origin", "*")
+            self.send_header("Access-Control-Allow-Methods", "POST, OPTIONS")
+            self.send_header("Access-Control-Allow-Headers", "Content-Type")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def do_OPTIONS(self):
+            self._reply(204)
+
+        def do_POST(self):
+            if self.path.split("?")[0] != ENDPOINT_PATH:
+                self._reply(404)
+                return
+            length = int(self.headers.get("Content-Length") or 0)
+            if length <= 0 or length > MAX_BODY_BYTES:
+                self._reply(413 if length > MAX_BODY_BYTES else 400)
+                return
+            body = self.rfile.read(length)
+            if collector.fail_rate and random.random() < collector.fail_rate:
+                self._reply(503)
+                return
+            try:
+                batch = decode_batch(body)
+            except (ValueError, OSError, EOFError) as error:
+                print("无法解析的批次：{}".format(error), file=sys.stderr)
+                self._reply(400)
+                return
+            written, duplicates = collector.accept(batch)
+            self._reply(204)
+            kinds = sorted({event.get("type") for event in batch["events"] if isinstance(event, dict)})
+            print("{} seq {} +{} 条（重复 {}，客户端丢弃累计 {}，{} 字节{}）：{}".format(
+                batch.get("session"), batch.get("seq"), written, duplicates, batch.get("dropped", 0),
+                length, "，gzip" if body[:2] == GZIP_MAGIC else "", ", ".join(map(str, kinds))), flush=True)
+
+        def log_message(self, format, *args):
+            pass  # 每个批次已经打印了摘要
+
+    return Handler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="猫捉老鼠游戏本地遥测收集器")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--out", default=DEFAULT_OUT, help="追加写入的 JSON Lines 文件")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="随机拒收（503）的请求比例，用于测试重试")
+    args = parser.parse_args(argv)
+    collector = Collector(args.out, args.fail_rate)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(collector))
+    print("收集地址 http://{}:{}{} -> {}".format(args.host, args.port, ENDPOINT_PATH, args.out), flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        collector.out.close()
+        print("共写入 {} 条事件，丢弃重复 {} 条".format(collector.events, collector.duplicates))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())